@@ -0,0 +1,78 @@
+import re
+from datetime import datetime
+from typing import List, Type
+
+from pydantic import BaseModel, ValidationError
+
+from models import BulkItemResult, BulkOperation, BulkResult
+from storage import Repository
+
+# Client-supplied ids end up in URLs and, through static_export.py, in file names
+SAFE_ID = re.compile(r"[A-Za-z0-9_-]{1,128}")
+
+
+def _update_request(document_id: str, update: BaseModel) -> tuple:
+    # bulk_write reports no per-operation match counts, so versions are not checked here
+    update_data = update.dict(exclude_unset=True, exclude={"version"})
+    update_data["updatedAt"] = datetime.utcnow()
+    return ("update", document_id, update_data)
+
+
+async def run_bulk(
+    repository: Repository,
+    operations: List[BulkOperation],
+    create_model: Type[BaseModel],
+    update_model: Type[BaseModel],
+    document_model: Type[BaseModel],
+) -> BulkResult:
+    """Run a batch of upsert/update/delete operations as a single unordered bulk_write.
+
+    Existing ids are resolved with one query up front so every operation can be validated
+    against the right model and reported individually.
+    """
+    existing = await repository.existing_ids(operation.id for operation in operations if operation.id)
+
+    results: List[BulkItemResult] = []
+    requests = []
+    positions = []  # index into `results` for each entry in `requests`
+    for index, operation in enumerate(operations):
+        result = BulkItemResult(index=index, op=operation.op, id=operation.id, status="invalid")
+        results.append(result)
+        try:
+            if operation.op == "delete" or operation.op == "update" or operation.id in existing:
+                if not operation.id:
+                    result.error = "id is required"
+                    continue
+                if operation.id not in existing:
+                    result.status = "not_found"
+                    continue
+                if operation.op == "delete":
+                    request, result.status = ("delete", operation.id), "deleted"
+                else:
+                    request, result.status = _update_request(operation.id, update_model(**operation.data)), "updated"
+            else:
+                fields = create_model(**operation.data).dict()
+                if operation.id:
+                    if not SAFE_ID.fullmatch(operation.id):
+                        result.error = "id may only contain letters, digits, '-' and '_' (at most 128)"
+                        continue
+                    fields["id"] = operation.id
+                document = document_model(**fields)
+                result.id = document.id
+                request, result.status = ("insert", document.dict()), "created"
+        except ValidationError as e:
+            result.error = str(e)
+            continue
+        requests.append(request)
+        positions.append(len(results) - 1)
+
+    if requests:
+        errors = await repository.bulk_write(requests)
+        for position, message in errors.items():
+            failed = results[positions[position]]
+            failed.status, failed.error = "failed", message
+    return BulkResult(results=results)
+
+
+def reorder_operations(items) -> List[BulkOperation]:
+    return [BulkOperation(op="update", id=item.id, data={"order": item.order}) for item in items]
@@ -0,0 +1,102 @@
+import asyncio
+import hashlib
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """Small in-process read-through cache with per-entry expiry and hit/miss counters."""
+
+    def __init__(self, ttl: float = 300.0, max_entries: Optional[int] = None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._entries.pop(key, None)
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        if self.max_entries is not None and len(self._entries) > self.max_entries:
+            # Entries are kept in insertion order, so the first one is the oldest
+            del self._entries[next(iter(self._entries))]
+
+    def invalidate(self, *keys: Hashable) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "ttl": self.ttl,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRatio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+class SingleFlight:
+    """Coalesces concurrent identical reads: callers with the same key await one in-flight call.
+
+    Keys are tuples whose first element names what was read (a collection or "bootstrap"),
+    so writes can `forget` it and later callers start a fresh read instead of joining one
+    that may have started before the write.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.coalesced = 0
+        self._flights: Dict[Tuple[Hashable, ...], asyncio.Future] = {}
+
+    async def do(self, key: Tuple[Hashable, ...], operation: Callable[[], Awaitable[Any]]) -> Any:
+        flight = self._flights.get(key)
+        if flight is None:
+            self.calls += 1
+            flight = asyncio.ensure_future(operation())
+            self._flights[key] = flight
+            flight.add_done_callback(lambda done: self._land(key, done))
+        else:
+            self.coalesced += 1
+        # Shielded so one caller disconnecting does not cancel the read for everyone else
+        return await asyncio.shield(flight)
+
+    def _land(self, key: Tuple[Hashable, ...], flight: asyncio.Future) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if not flight.cancelled():
+            flight.exception()  # retrieved here in case every caller went away
+
+    def forget(self, *names: Hashable) -> None:
+        for key in [key for key in self._flights if key[0] in names]:
+            del self._flights[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "inFlight": len(self._flights),
+        }
+
+
+def version_stamp(*documents: Optional[Dict[str, Any]]) -> str:
+    """Combined version of a set of documents, derived from their ids and updatedAt."""
+    digest = hashlib.sha1()
+    for document in documents:
+        if document is None:
+            continue
+        digest.update(str(document.get("id")).encode())
+        digest.update(str(document.get("updatedAt")).encode())
+    return digest.hexdigest()[:16]
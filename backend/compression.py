@@ -0,0 +1,175 @@
+import gzip
+import zlib
+from typing import Dict, Optional
+
+from fastapi import Response
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from conditional import etag_for_encoding
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+MINIMUM_SIZE = 500
+
+# Server preference when the client weighs encodings equally
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick the best supported content-coding from an Accept-Encoding header."""
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[name.strip().lower()] = quality
+
+    wildcard = weights.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for encoding in ENCODINGS:
+        quality = weights.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+# Settings per use: 'fast' for one-off responses, 'cached' for bodies compressed once per
+# revision while a request waits on the event loop, and 'maximum' for files written ahead of
+# time by static_export.py (brotli 11 takes seconds on a large body)
+LEVELS = {
+    "fast": {"br": 4, "gzip": 6},
+    "cached": {"br": 5, "gzip": 6},
+    "maximum": {"br": 11, "gzip": 9},
+}
+
+
+def compress(body: bytes, encoding: str, level: str = "fast") -> bytes:
+    """Compress a whole body with the settings of `level` (see LEVELS)."""
+    if encoding == "br":
+        return brotli.compress(body, quality=LEVELS[level]["br"])
+    return gzip.compress(body, compresslevel=LEVELS[level]["gzip"], mtime=0)
+
+
+class CompressedBody:
+    """An encoded JSON body that compresses itself once per content-coding, on first use."""
+
+    __slots__ = ("raw", "_encoded")
+
+    def __init__(self, raw: bytes):
+        self.raw = raw
+        self._encoded: Dict[str, bytes] = {}
+
+    def encoded(self, encoding: str) -> bytes:
+        body = self._encoded.get(encoding)
+        if body is None:
+            body = self._encoded[encoding] = compress(self.raw, encoding, "cached")
+        return body
+
+    def response(self, accept_encoding: Optional[str], headers: Dict[str, str]) -> Response:
+        encoding = negotiate(accept_encoding) if len(self.raw) >= MINIMUM_SIZE else None
+        body = self.raw if encoding is None else self.encoded(encoding)
+        response = Response(content=body, media_type="application/json", headers=headers)
+        response.headers.add_vary_header("Accept-Encoding")
+        if encoding is not None:
+            response.headers["Content-Encoding"] = encoding
+            if "etag" in response.headers:
+                response.headers["ETag"] = etag_for_encoding(response.headers["etag"], encoding)
+        return response
+
+
+class _StreamCompressor:
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=LEVELS["fast"]["br"])
+        else:
+            self._compressor = zlib.compressobj(LEVELS["fast"]["gzip"], zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def chunk(self, data: bytes) -> bytes:
+        # Flush after every chunk so streamed rows reach the client as they are produced
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.flush()
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+class CompressionMiddleware:
+    """Negotiates brotli/gzip for responses that are not already encoded."""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = MINIMUM_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        compressor: Optional[_StreamCompressor] = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            if passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                headers = MutableHeaders(raw=start["headers"])
+                # Event streams stay uncompressed: a compressor per idle connection costs far more than its events
+                if ("content-encoding" in headers or start["status"] in (204, 304)
+                        or headers.get("content-type", "").startswith("text/event-stream")
+                        or (not more_body and len(body) < self.minimum_size)):
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+
+                headers.add_vary_header("Accept-Encoding")
+                headers["Content-Encoding"] = encoding
+                if "etag" in headers:
+                    headers["ETag"] = etag_for_encoding(headers["etag"], encoding)
+                if not more_body:
+                    body = compress(body, encoding)
+                    headers["Content-Length"] = str(len(body))
+                    await send(start)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                del headers["Content-Length"]
+                compressor = _StreamCompressor(encoding)
+                await send(start)
+
+            chunk = compressor.chunk(body)
+            if not more_body:
+                chunk += compressor.finish()
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
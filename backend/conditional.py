@@ -0,0 +1,89 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Iterable, Optional
+
+from fastapi import Request, Response
+
+from cache import version_stamp
+
+
+def entity_tag(documents: Iterable[Dict[str, Any]], variant: str = "") -> str:
+    stamp = version_stamp(*documents)
+    return f'"{stamp}-{variant}"' if variant else f'"{stamp}"'
+
+
+def last_modified(documents: Iterable[Dict[str, Any]], deleted: Iterable[Dict[str, Any]] = ()) -> Optional[datetime]:
+    """The newest updatedAt of `documents`, or deletedAt of the tombstones in `deleted`."""
+    stamps = [document["updatedAt"] for document in documents if document.get("updatedAt")]
+    stamps += [tombstone["deletedAt"] for tombstone in deleted]
+    if not stamps:
+        return None
+    return max(stamps).replace(tzinfo=timezone.utc, microsecond=0)
+
+
+# Compressed representations carry the content-coding as an ETag suffix
+ENCODING_SUFFIXES = ("-br", "-gzip")
+
+
+def etag_for_encoding(etag: str, encoding: str) -> str:
+    weak = etag.startswith("W/")
+    tag = etag.removeprefix("W/")
+    return f'{"W/" if weak else ""}{tag[:-1]}-{encoding}"'
+
+
+def _strip_encoding(tag: str) -> str:
+    tag = tag.removeprefix("W/")
+    for suffix in ENCODING_SUFFIXES:
+        if tag.endswith(suffix + '"'):
+            return tag[:-len(suffix) - 1] + '"'
+    return tag
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return any(_strip_encoding(candidate) == etag for candidate in candidates)
+
+
+def is_not_modified(request: Request, etag: str, modified: Optional[datetime]) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return modified <= since
+    return False
+
+
+def validator_headers(etag: str, modified: Optional[datetime]) -> Dict[str, str]:
+    headers = {"ETag": etag}
+    if modified is not None:
+        headers["Last-Modified"] = format_datetime(modified, usegmt=True)
+    return headers
+
+
+def conditional_response(request: Request, response: Response, documents: Iterable[Dict[str, Any]],
+                         variant: str = "", dated: bool = True) -> Optional[Response]:
+    """Set ETag/Last-Modified on `response`, or return a 304 if the client's copy is current.
+
+    Only the raw documents are inspected, so a revalidation never builds or serializes a model.
+    `variant` distinguishes representations of the same documents, such as sparse fieldsets.
+    Lists are not `dated`: a document that leaves one (deleted, filtered out or moved to another
+    page) leaves the newest updatedAt behind, so only the ETag can tell their versions apart.
+    """
+    documents = list(documents)
+    etag = entity_tag(documents, variant)
+    modified = last_modified(documents) if dated else None
+    headers = validator_headers(etag, modified)
+    if is_not_modified(request, etag, modified):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,57 @@
+import logging
+import os
+from typing import Any, Dict, Iterable, Optional, Sequence, Type
+
+from fastapi import Response
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is listed in requirements.txt
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+def fast_json_enabled() -> bool:
+    requested = os.environ.get("FAST_JSON_RESPONSES", "").lower() in ("1", "true", "yes")
+    if requested and orjson is None:
+        logger.warning("FAST_JSON_RESPONSES is set but orjson is not installed; using the standard encoder")
+    return requested and orjson is not None
+
+
+FAST_JSON = fast_json_enabled()
+
+
+def project_document(model: Type[BaseModel], document: Dict[str, Any], fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """Reduce a stored document to the model's fields, in schema order, without validating it.
+
+    Missing fields fall back to the model defaults, and storage-only keys such as `_id`
+    are dropped, so the encoded output matches what `response_model` would produce.
+    `fields` restricts the output to a sparse fieldset.
+    """
+    projected = {}
+    for name, field in model.model_fields.items():
+        if fields is not None and name not in fields:
+            continue
+        if name in document:
+            projected[name] = document[name]
+        elif not field.is_required():
+            projected[name] = field.get_default(call_default_factory=True)
+    return projected
+
+
+def encode_documents(model: Type[BaseModel], documents: Iterable[Dict[str, Any]], fields: Optional[Sequence[str]] = None) -> bytes:
+    return orjson.dumps([project_document(model, document, fields) for document in documents])
+
+
+def encode_document(model: Type[BaseModel], document: Dict[str, Any], fields: Optional[Sequence[str]] = None) -> bytes:
+    return orjson.dumps(project_document(model, document, fields))
+
+
+def json_response(body: bytes, response: Optional[Response] = None) -> Response:
+    """Wrap pre-encoded JSON, keeping headers already set on the injected `response`."""
+    headers = {}
+    if response is not None:
+        headers = {key: value for key, value in response.headers.items() if key != "content-length"}
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,126 @@
+import asyncio
+import json
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Set, Tuple
+
+# Sent instead of the queued events when a subscriber falls behind, or resumes from an id
+# that is no longer buffered or was issued by another process: the client should refetch
+# (e.g. via /api/changes)
+RESYNC = b"event: resync\ndata: {}\n\n"
+HEARTBEAT = b": heartbeat\n\n"
+RETRY = b"retry: 3000\n\n"  # reconnection delay for EventSource clients, in milliseconds
+
+
+def _frame(event_id: str, data: Dict[str, Any]) -> bytes:
+    payload = json.dumps(data, separators=(",", ":"), default=datetime.isoformat)
+    return f"id: {event_id}\nevent: change\ndata: {payload}\n\n".encode()
+
+
+class Subscriber:
+    __slots__ = ("queue", "lagged")
+
+    def __init__(self, queue_size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.lagged = False
+
+    def offer(self, frame: bytes) -> bool:
+        """Queue a frame; a full queue is replaced by a single resync. Returns False when dropping."""
+        if self.lagged:
+            return False
+        try:
+            self.queue.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+            self.lagged = True
+            return False
+
+
+class EventBroker:
+    """Fans change events out to Server-Sent Events subscribers.
+
+    Each event is encoded once and queued per subscriber; an idle connection costs one
+    small queue and one suspended generator. A subscriber whose queue fills (a slow or
+    stalled client) loses its backlog and gets a resync event instead, so one slow client
+    never holds memory for, or slows, the others. Recent events are kept for
+    `Last-Event-ID` resumption after a reconnect.
+
+    Event ids are "<epoch>:<n>", where the epoch is new for every broker. Numbers restart
+    with each process and differ between workers, so an id from another epoch (the client
+    reconnected after a restart, or to another worker) says nothing about what it missed
+    and is answered with a resync.
+    """
+
+    def __init__(self, queue_size: int = 100, history: int = 1000, heartbeat: float = 15.0,
+                 max_subscribers: int = 10000):
+        self.queue_size = queue_size
+        self.heartbeat = heartbeat
+        self.max_subscribers = max_subscribers
+        self.published = 0
+        self.dropped = 0
+        self._subscribers: Set[Subscriber] = set()
+        self._history: Deque[Tuple[int, bytes]] = deque(maxlen=history)
+        self.epoch = uuid.uuid4().hex[:12]
+        self._last_id = 0
+
+    @property
+    def full(self) -> bool:
+        return len(self._subscribers) >= self.max_subscribers
+
+    def publish(self, data: Dict[str, Any]) -> None:
+        self._last_id += 1
+        frame = _frame(f"{self.epoch}:{self._last_id}", data)
+        self._history.append((self._last_id, frame))
+        self.published += 1
+        for subscriber in self._subscribers:
+            if not subscriber.offer(frame):
+                self.dropped += 1
+
+    def _replay(self, subscriber: Subscriber, last_event_id: Optional[str]) -> None:
+        if not last_event_id:
+            return
+        epoch, _, number = last_event_id.partition(":")
+        try:
+            after = int(number)
+        except ValueError:
+            after = -1
+        if epoch != self.epoch or not 0 <= after <= self._last_id:
+            subscriber.offer(RESYNC)
+            return
+        if after == self._last_id:
+            return
+        if not self._history or self._history[0][0] > after + 1:
+            subscriber.offer(RESYNC)
+            return
+        for event_id, frame in self._history:
+            if event_id > after:
+                subscriber.offer(frame)
+
+    async def stream(self, last_event_id: Optional[str] = None) -> AsyncIterator[bytes]:
+        subscriber = Subscriber(self.queue_size)
+        self._subscribers.add(subscriber)
+        try:
+            self._replay(subscriber, last_event_id)
+            yield RETRY
+            while True:
+                try:
+                    frame = await asyncio.wait_for(subscriber.queue.get(), self.heartbeat)
+                except asyncio.TimeoutError:
+                    frame = HEARTBEAT
+                if frame is RESYNC:
+                    subscriber.lagged = False
+                yield frame
+        finally:
+            self._subscribers.discard(subscriber)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "dropped": self.dropped,
+            "lastEventId": f"{self.epoch}:{self._last_id}",
+        }
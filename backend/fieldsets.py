@@ -0,0 +1,74 @@
+import hashlib
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+
+from fastapi import HTTPException
+from pydantic import BaseModel, TypeAdapter, create_model
+
+from encoding import FAST_JSON, encode_document, encode_documents
+
+
+def parse_fields(model: Type[BaseModel], fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Parse a `fields=a,b,c` query parameter into model field names, in schema order.
+
+    `id` is always included so clients can address what they receive.
+    """
+    if not fields:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - set(model.model_fields)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}. Valid fields: {', '.join(model.model_fields)}",
+        )
+    requested.add("id")
+    return tuple(name for name in model.model_fields if name in requested)
+
+
+def fieldset_tag(selected: Optional[Tuple[str, ...]]) -> str:
+    """Short ETag suffix identifying a fieldset."""
+    if selected is None:
+        return ""
+    return hashlib.sha1(",".join(selected).encode()).hexdigest()[:8]
+
+
+def storage_fields(selected: Optional[Tuple[str, ...]], order: Sequence[Tuple[str, int]] = ()) -> Optional[Tuple[str, ...]]:
+    """Fields to load from storage: the selection plus what validators and cursors need."""
+    if selected is None:
+        return None
+    required = ("id", "updatedAt") + tuple(key for key, _ in order)
+    return selected + tuple(name for name in required if name not in selected)
+
+
+@lru_cache(maxsize=256)
+def trimmed_model(model: Type[BaseModel], selected: Tuple[str, ...]) -> Type[BaseModel]:
+    """A response model with only the selected fields of `model`."""
+    definitions = {
+        name: (field.annotation, field)
+        for name, field in model.model_fields.items()
+        if name in selected
+    }
+    return create_model(f"{model.__name__}Fields", **definitions)
+
+
+@lru_cache(maxsize=256)
+def _list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+
+def render_documents(model: Type[BaseModel], documents: List[Dict[str, Any]],
+                     selected: Optional[Tuple[str, ...]] = None) -> bytes:
+    """Encode documents as the JSON list `response_model` would produce, trimmed to `selected`."""
+    if FAST_JSON:
+        return encode_documents(model, documents, selected)
+    target = trimmed_model(model, selected) if selected else model
+    return _list_adapter(target).dump_json([target(**document) for document in documents])
+
+
+def render_document(model: Type[BaseModel], document: Dict[str, Any],
+                    selected: Optional[Tuple[str, ...]] = None) -> bytes:
+    if FAST_JSON:
+        return encode_document(model, document, selected)
+    target = trimmed_model(model, selected) if selected else model
+    return target(**document).model_dump_json().encode()
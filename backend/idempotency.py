@@ -0,0 +1,66 @@
+import hashlib
+import re
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from storage import DuplicateDocument, Storage
+
+
+class ExpiringClaims:
+    """Keys claimed by the first request that uses them, until they expire.
+
+    A claim is a document whose `id` is the key, so the unique id index decides which of
+    several concurrent requests wins. Expired claims are removed through the TTL index on
+    `expiresAt` (emulated by MemoryStorage); until that gets to them they are taken over
+    with a version-checked update, so exactly one request wins those too.
+    """
+
+    def __init__(self, storage: Storage, collection: str, ttl: timedelta):
+        self.storage = storage
+        self.collection = collection
+        self.ttl = ttl
+
+    async def claim(self, key: str, fields: Dict[str, Any], ttl: Optional[timedelta] = None) -> Optional[Dict[str, Any]]:
+        """Claim `key`; returns None when claimed, or the live claim held by an earlier request."""
+        repository = self.storage[self.collection]
+        while True:
+            now = datetime.utcnow()
+            claim = dict(fields, createdAt=now, expiresAt=now + (ttl or self.ttl))
+            try:
+                await repository.insert_one(dict(claim, id=key, version=0))
+                return None
+            except DuplicateDocument:
+                pass
+            existing = await repository.find_one({"id": key})
+            if existing is None:
+                continue  # released in the meantime
+            if existing["expiresAt"] > now:
+                return existing
+            if await repository.update_one({"id": key}, claim, existing.get("version", 0)) is not None:
+                return None
+
+    async def update(self, key: str, fields: Dict[str, Any]) -> None:
+        now = datetime.utcnow()
+        await self.storage[self.collection].update_one({"id": key}, dict(fields, expiresAt=now + self.ttl))
+
+    async def release(self, key: str) -> None:
+        await self.storage[self.collection].delete_one({"id": key})
+
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _normalize(text: str) -> str:
+    return _WHITESPACE.sub(" ", text).strip().lower()
+
+
+def contact_fingerprint(email: str, subject: str, message: str) -> str:
+    """Hash of a submission's content, ignoring case and whitespace differences."""
+    content = "\x1f".join(_normalize(part) for part in (email, subject, message))
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def request_fingerprint(body: Dict[str, Any]) -> str:
+    """Hash of a request body, to tell a retry from a different request reusing its key."""
+    content = "\x1f".join(f"{name}={body[name]}" for name in sorted(body))
+    return hashlib.sha256(content.encode()).hexdigest()
@@ -0,0 +1,121 @@
+import asyncio
+import logging
+import os
+from typing import Dict, List, Tuple
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+# Deletions are reported by /api/changes for this long; older `since` values get a full resync.
+# Changing it on an existing database needs a collMod on tombstones.deletedAt_ttl (see the startup warning)
+TOMBSTONE_RETENTION_DAYS = int(os.environ.get("TOMBSTONE_RETENTION_DAYS", "30"))
+
+# Rate limit buckets untouched for this long are full again and can be dropped
+RATE_LIMIT_BUCKET_TTL_SECONDS = 3600
+
+# Every index the API relies on, declared in one place
+INDEXES: Dict[str, List[IndexModel]] = {
+    "profiles": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+    ],
+    "projects": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("order", ASCENDING), ("id", ASCENDING)], name="order_id"),
+        IndexModel([("featured", ASCENDING), ("order", ASCENDING), ("id", ASCENDING)], name="featured_order_id"),
+        # Multikey: one entry per tool, serving ?tool= filters in listing order
+        IndexModel([("tools", ASCENDING), ("order", ASCENDING), ("id", ASCENDING)], name="tools_order_id"),
+        IndexModel([("updatedAt", DESCENDING)], name="updatedAt_desc"),
+    ],
+    "skills": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("order", ASCENDING), ("id", ASCENDING)], name="order_id"),
+        IndexModel([("updatedAt", DESCENDING)], name="updatedAt_desc"),
+    ],
+    "about": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+    ],
+    "contacts": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("createdAt", DESCENDING), ("id", DESCENDING)], name="createdAt_id_desc"),
+        IndexModel([("status", ASCENDING), ("createdAt", DESCENDING)], name="status_createdAt"),
+        IndexModel([("updatedAt", DESCENDING)], name="updatedAt_desc"),
+    ],
+    "settings": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+    ],
+    "tombstones": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("deletedAt", ASCENDING)], name="deletedAt_ttl",
+                   expireAfterSeconds=TOMBSTONE_RETENTION_DAYS * 24 * 3600),
+    ],
+    "idempotency_keys": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("expiresAt", ASCENDING)], name="expiresAt_ttl", expireAfterSeconds=0),
+    ],
+    "contact_fingerprints": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("expiresAt", ASCENDING)], name="expiresAt_ttl", expireAfterSeconds=0),
+    ],
+    "rate_limits": [
+        IndexModel([("at", ASCENDING)], name="at_ttl", expireAfterSeconds=RATE_LIMIT_BUCKET_TTL_SECONDS),
+    ],
+}
+
+
+def ttl_fields(collection: str) -> List[Tuple[str, int]]:
+    """(field, expireAfterSeconds) of each TTL index declared on `collection`."""
+    return [
+        (next(iter(model.document["key"])), model.document["expireAfterSeconds"])
+        for model in INDEXES.get(collection, ())
+        if "expireAfterSeconds" in model.document
+    ]
+
+
+def _signature(spec: dict) -> dict:
+    """What an index does: its keys and the options that change its behaviour, such as a TTL."""
+    keys = spec["key"]
+    if isinstance(keys, dict):
+        keys = keys.items()
+    return {
+        "key": [(field, direction) for field, direction in keys],
+        "unique": bool(spec.get("unique", False)),
+        "sparse": bool(spec.get("sparse", False)),
+        "expireAfterSeconds": int(spec["expireAfterSeconds"]) if "expireAfterSeconds" in spec else None,
+        "partialFilterExpression": dict(spec["partialFilterExpression"]) if "partialFilterExpression" in spec else None,
+    }
+
+
+async def ensure_collection_indexes(db, name: str, declared: List[IndexModel]) -> None:
+    collection = db[name]
+    existing = await collection.index_information()
+
+    missing = []
+    for model in declared:
+        spec = model.document
+        current = existing.get(spec["name"])
+        if current is None:
+            missing.append(model)
+        elif _signature(current) != _signature(spec):
+            # Not rebuilt automatically: that can take long on a large collection. A TTL is changed in place with collMod
+            logger.warning("Index %s.%s differs from its declaration and is left as is: existing %s, declared %s",
+                           name, spec["name"], _signature(current), _signature(spec))
+
+    declared_names = {model.document["name"] for model in declared}
+    for index_name in existing:
+        if index_name != "_id_" and index_name not in declared_names:
+            logger.warning("Index %s.%s exists but is not declared", name, index_name)
+
+    if missing:
+        try:
+            await collection.create_indexes(missing)
+            logger.info("Created indexes on %s: %s", name, ", ".join(m.document["name"] for m in missing))
+        except OperationFailure as e:
+            logger.error("Could not create indexes on %s: %s", name, e)
+
+
+async def ensure_indexes(db) -> None:
+    await asyncio.gather(*(
+        ensure_collection_indexes(db, name, declared) for name, declared in INDEXES.items()
+    ))
@@ -0,0 +1,257 @@
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from storage import Storage
+
+logger = logging.getLogger(__name__)
+
+# When a submission is acknowledged:
+#   'stored'  - after the batch holding it is in the database (the default; same guarantee as insert_one)
+#   'spooled' - after it is fsync'd to the local spool file; the database write follows
+#   'queued'  - as soon as it is queued; lost if the process dies before the next flush
+ACK_MODES = ("stored", "spooled", "queued")
+
+Pending = Tuple[Dict[str, Any], Optional[asyncio.Future]]
+
+
+class IngestOverloaded(Exception):
+    """The write-behind queue is full, or closed for shutdown."""
+
+
+def _decode(line: str) -> Dict[str, Any]:
+    document = json.loads(line)
+    for field in ("createdAt", "updatedAt"):
+        if isinstance(document.get(field), str):
+            document[field] = datetime.fromisoformat(document[field])
+    return document
+
+
+class Spool:
+    """Append-only JSON lines file of accepted, not yet stored documents.
+
+    Appends are group-committed: everything appended while a write is in progress goes out
+    in the next write with a single fsync, so the fsync cost is shared by concurrent requests.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.fsyncs = 0
+        self._lock = asyncio.Lock()
+        self._waiting: List[Tuple[bytes, asyncio.Future]] = []
+        self._writing: Optional[asyncio.Task] = None
+
+    def read(self) -> List[Dict[str, Any]]:
+        if not self.path.exists():
+            return []
+        documents = []
+        for number, line in enumerate(self.path.read_text().splitlines(), 1):
+            try:
+                documents.append(_decode(line))
+            except ValueError:
+                # A torn final line is a write that was never acknowledged
+                logger.warning("Skipping unreadable line %d of %s", number, self.path)
+        return documents
+
+    async def append(self, document: Dict[str, Any]) -> None:
+        line = json.dumps(document, default=datetime.isoformat).encode() + b"\n"
+        future = asyncio.get_running_loop().create_future()
+        self._waiting.append((line, future))
+        if self._writing is None or self._writing.done():
+            self._writing = asyncio.create_task(self._write_waiting())
+        await future
+
+    async def _write_waiting(self) -> None:
+        while self._waiting:
+            waiting, self._waiting = self._waiting, []
+            try:
+                async with self._lock:
+                    await asyncio.to_thread(self._write, b"".join(line for line, _ in waiting))
+                self.fsyncs += 1
+            except OSError as e:
+                for _, future in waiting:
+                    future.set_exception(e)
+            else:
+                for _, future in waiting:
+                    future.set_result(None)
+
+    def _write(self, data: bytes) -> None:
+        with self.path.open("ab") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+
+    async def truncate(self, is_idle: Callable[[], bool]) -> None:
+        """Empty the spool if `is_idle()` still holds once no append is being written."""
+        async with self._lock:
+            if is_idle() and not self._waiting:
+                await asyncio.to_thread(self.path.write_bytes, b"")
+
+
+class WriteBehindQueue:
+    """Accepts documents for one collection and stores them in batches with `insert_many`.
+
+    A batch is written when it reaches `max_batch` documents or when `window` seconds have
+    passed since its first document, whichever comes first, so a burst of submissions costs
+    a handful of database round trips instead of one each. At most `max_pending` documents
+    may be accepted and not yet stored; past that `submit` raises `IngestOverloaded`.
+
+    With ack='stored' a failed batch fails its requests, as a failed insert_one would. In the
+    other modes the requests have already been answered, so the batch is retried until it is
+    stored; documents a partly applied attempt already wrote are skipped on retry.
+    """
+
+    def __init__(self, storage: Storage, collection: str, ack: str = "stored", max_batch: int = 100,
+                 window: float = 0.01, max_pending: int = 10000, spool_path: Optional[str] = None,
+                 retry_interval: float = 1.0, on_stored: Optional[Callable[[List[Dict[str, Any]]], Any]] = None):
+        if ack not in ACK_MODES:
+            raise ValueError(f"Unsupported acknowledgement mode {ack!r}, expected one of {ACK_MODES}")
+        if ack == "spooled" and not spool_path:
+            raise ValueError("ack='spooled' needs a spool file")
+        self.storage = storage
+        self.collection = collection
+        self.ack = ack
+        self.max_batch = max_batch
+        self.window = window
+        self.max_pending = max_pending
+        self.retry_interval = retry_interval
+        self.on_stored = on_stored
+        self.spool = Spool(spool_path) if ack == "spooled" else None
+        self.accepted = 0
+        self.stored = 0
+        self.batches = 0
+        self.failures = 0
+        self.rejected = 0
+        self._pending = 0
+        self._queue: "asyncio.Queue[Pending]" = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    def recover(self) -> int:
+        """Queue whatever a previous process spooled but did not get to store; they stay spooled until stored."""
+        if self.spool is None:
+            return 0
+        documents = self.spool.read()
+        for document in documents:
+            self._enqueue(document, None)
+        if documents:
+            logger.info("Recovered %d spooled %s", len(documents), self.collection)
+        return len(documents)
+
+    def _enqueue(self, document: Dict[str, Any], future: Optional[asyncio.Future]) -> None:
+        self._pending += 1
+        self._queue.put_nowait((document, future))
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def submit(self, document: Dict[str, Any]) -> None:
+        if self._closed or self._pending >= self.max_pending:
+            self.rejected += 1
+            raise IngestOverloaded(f"{self.collection} ingestion queue is {'closed' if self._closed else 'full'}")
+        # Counted as pending while spooling, so the spool is not emptied under it
+        self._pending += 1
+        try:
+            if self.spool is not None:
+                await self.spool.append(document)
+        finally:
+            self._pending -= 1
+        self.accepted += 1
+        future = asyncio.get_running_loop().create_future() if self.ack == "stored" else None
+        self._enqueue(document, future)
+        if future is not None:
+            await future
+
+    async def _next_batch(self) -> List[Pending]:
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.window
+        while len(batch) < self.max_batch:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0 or self._closed:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            documents = [document for document, _ in batch]
+            futures = [future for _, future in batch if future is not None]
+            try:
+                await self._store(documents, retry=not futures)
+            except Exception as e:
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for future in futures:
+                    if not future.done():
+                        future.set_result(None)
+            finally:
+                self._pending -= len(batch)
+            if self.spool is not None and self._pending == 0:
+                await self.spool.truncate(lambda: self._pending == 0)
+
+    async def _store(self, documents: List[Dict[str, Any]], retry: bool) -> None:
+        repository = self.storage[self.collection]
+        attempt = documents
+        while True:
+            try:
+                await repository.insert_many(attempt)
+                break
+            except Exception as e:
+                self.failures += 1
+                if not retry:
+                    logger.error("Storing a batch of %d %s failed: %s", len(attempt), self.collection, e)
+                    raise
+                logger.warning("Storing a batch of %d %s failed, retrying in %.1fs: %s",
+                               len(attempt), self.collection, self.retry_interval, e)
+                await asyncio.sleep(self.retry_interval)
+                try:
+                    stored = await repository.existing_ids(document["id"] for document in documents)
+                except Exception:
+                    stored = set()
+                attempt = [document for document in documents if document["id"] not in stored]
+                if not attempt:
+                    break
+        # Documents a failed attempt already wrote are stored too, and announced with the rest
+        self.batches += 1
+        self.stored += len(documents)
+        if self.on_stored is not None:
+            self.on_stored(documents)
+
+    async def close(self, timeout: float = 10.0) -> None:
+        """Stop accepting documents and wait up to `timeout` seconds for the accepted ones to be stored."""
+        self._closed = True
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while self._pending > 0 and self._task is not None and not self._task.done() and loop.time() < deadline:
+            await asyncio.sleep(0.01)
+        if self._pending > 0:
+            where = f"kept in {self.spool.path} for the next start" if self.spool is not None else "lost"
+            logger.error("Shut down with %d %s not stored, %s", self._pending, self.collection, where)
+        if self._task is not None:
+            self._task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "ack": self.ack,
+            "pending": self._pending,
+            "accepted": self.accepted,
+            "stored": self.stored,
+            "batches": self.batches,
+            "averageBatch": round(self.stored / self.batches, 2) if self.batches else 0.0,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "fsyncs": self.spool.fsyncs if self.spool is not None else 0,
+        }
@@ -0,0 +1,275 @@
+import asyncio
+import ipaddress
+import logging
+import math
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from fastapi.responses import JSONResponse
+from pymongo import ReturnDocument
+from pymongo.errors import PyMongoError
+from starlette.routing import Match
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from storage import MongoStorage, Storage
+
+logger = logging.getLogger(__name__)
+
+UNMATCHED = "<unmatched>"  # every path without a route shares one bucket per client
+
+
+class Limit:
+    """A token bucket: `burst` requests at once, refilled at `rate` requests per second."""
+
+    __slots__ = ("rate", "burst")
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+
+
+class MemoryBuckets:
+    """Buckets held by this process. With several workers each enforces the limits on its own share of traffic."""
+
+    name = "memory"
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key: str, limit: Limit) -> float:
+        """Take a token; returns 0 when allowed, else the seconds until one is available."""
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (limit.burst, now))
+        tokens = min(limit.burst, tokens + (now - updated) * limit.rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / limit.rate
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class MongoBuckets:
+    """Buckets shared by every worker, one document per key updated atomically in a single round trip.
+
+    If the database cannot be reached requests are let through: the limiter protects the
+    database, so it should not become another way for a database outage to fail reads.
+    """
+
+    name = "mongo"
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.failing = False
+
+    async def take(self, key: str, limit: Limit) -> float:
+        now = datetime.utcnow()
+        elapsed = {"$divide": [{"$max": [0, {"$subtract": [now, {"$ifNull": ["$at", now]}]}]}, 1000]}
+        refilled = {"$add": [{"$ifNull": ["$tokens", limit.burst]}, {"$multiply": [elapsed, limit.rate]}]}
+        try:
+            bucket = await self.collection.find_one_and_update(
+                {"_id": key},
+                [
+                    {"$set": {"tokens": {"$min": [limit.burst, refilled]}, "at": now}},
+                    {"$set": {"allowed": {"$gte": ["$tokens", 1]}}},
+                    {"$set": {"tokens": {"$cond": ["$allowed", {"$subtract": ["$tokens", 1]}, "$tokens"]}}},
+                ],
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+        except PyMongoError as e:
+            if not self.failing:
+                logger.warning("Rate limit store unavailable, not limiting: %s", e)
+            self.failing = True
+            return 0.0
+        self.failing = False
+        return 0.0 if bucket["allowed"] else (1 - bucket["tokens"]) / limit.rate
+
+
+def create_bucket_store(storage: Storage):
+    """Build the store selected by RATE_LIMIT_STORE: 'memory' (the default) or 'mongo'."""
+    kind = os.environ.get("RATE_LIMIT_STORE", "memory")
+    if kind == "memory":
+        return MemoryBuckets()
+    if kind == "mongo" and isinstance(storage, MongoStorage):
+        return MongoBuckets(storage.db["rate_limits"])
+    raise ValueError(f"Unsupported RATE_LIMIT_STORE={kind} for {type(storage).__name__}")
+
+
+Network = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+def parse_networks(value: str) -> List[Network]:
+    """Parse a comma-separated list of addresses and CIDR ranges, e.g. '10.0.0.0/8,127.0.0.1'."""
+    return [ipaddress.ip_network(part.strip(), strict=False) for part in value.split(",") if part.strip()]
+
+
+def _trusted(address: str, proxies: List[Network]) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in proxies)
+
+
+def client_address(scope: Scope, proxies: List[Network] = ()) -> str:
+    """The address of the client a request came from.
+
+    That is the connection's peer, unless the peer is a trusted proxy: then it is the last
+    X-Forwarded-For entry not added by a trusted proxy. Entries further left were written by
+    the client itself and could be anything, so they are never used.
+    """
+    client = scope.get("client")
+    address = client[0] if client else "-"
+    if not proxies or not _trusted(address, proxies):
+        return address
+    forwarded = [value.decode("latin-1") for name, value in scope["headers"] if name == b"x-forwarded-for"]
+    hops = [hop.strip() for hop in ",".join(forwarded).split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not _trusted(hop, proxies):
+            return hop
+    return hops[0] if hops else address
+
+
+def route_template(scope: Scope) -> str:
+    """The path template of the route a request will be dispatched to, e.g. /api/projects/{project_id}."""
+    for route in scope["app"].router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return UNMATCHED
+
+
+class RateLimiter:
+    """Per-client token buckets, one per client address and route.
+
+    `limits` overrides the read/write defaults for specific (method, route template) pairs.
+    Behind a reverse proxy every connection comes from the proxy, so its addresses must be
+    listed in `proxies` for clients to be told apart (see `client_address`).
+    """
+
+    def __init__(self, store, reads: Limit, writes: Limit, limits: Optional[Dict[Tuple[str, str], Limit]] = None,
+                 proxies: Iterable[Network] = ()):
+        self.store = store
+        self.reads = reads
+        self.writes = writes
+        self.limits = limits or {}
+        self.proxies = list(proxies)
+        self.checked = 0
+        self.limited = 0
+
+    async def check(self, scope: Scope) -> float:
+        method = scope["method"]
+        template = route_template(scope)
+        limit = self.limits.get((method, template)) or (self.reads if method in ("GET", "HEAD") else self.writes)
+        key = f"{client_address(scope, self.proxies)} {method} {template}"
+        self.checked += 1
+        wait = await self.store.take(key, limit)
+        if wait > 0:
+            self.limited += 1
+        return wait
+
+    def stats(self) -> Dict[str, Any]:
+        buckets = len(self.store) if isinstance(self.store, MemoryBuckets) else None
+        return {"store": self.store.name, "buckets": buckets, "checked": self.checked, "limited": self.limited}
+
+
+class AdmissionController:
+    """Sheds requests once too many are in flight or the event loop is falling behind.
+
+    Event loop lag is how late a periodic timer fires; it rises when the process has more
+    work than it can schedule, before in-flight counts or latencies show it. Lag is tracked
+    with a fast rise and a slow decay, so shedding starts at once and stops gradually.
+    """
+
+    def __init__(self, max_in_flight: int = 512, max_lag: float = 0.2, interval: float = 0.1,
+                 exempt: Iterable[str] = ()):
+        self.max_in_flight = max_in_flight
+        self.max_lag = max_lag
+        self.interval = interval
+        self.exempt = frozenset(exempt)
+        self.in_flight = 0
+        self.lag = 0.0
+        self.shed = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._monitor())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _monitor(self) -> None:
+        loop = asyncio.get_running_loop()
+        # The first tick also waits for whatever startup work follows; it says nothing about load
+        await asyncio.sleep(self.interval)
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - started - self.interval)
+            self.lag = lag if lag > self.lag else self.lag * 0.8 + lag * 0.2
+
+    def admit(self) -> bool:
+        if self.in_flight >= self.max_in_flight or self.lag > self.max_lag:
+            self.shed += 1
+            return False
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "inFlight": self.in_flight,
+            "maxInFlight": self.max_in_flight,
+            "lagMs": round(self.lag * 1000, 1),
+            "maxLagMs": self.max_lag * 1000,
+            "shed": self.shed,
+        }
+
+
+def _reject(status_code: int, detail: str, retry_after: float) -> JSONResponse:
+    return JSONResponse({"detail": detail}, status_code=status_code,
+                        headers={"Retry-After": str(max(1, math.ceil(retry_after)))})
+
+
+class LoadSheddingMiddleware:
+    """Answers 429 to clients over their rate limit and 503 while the admission controller sheds load."""
+
+    def __init__(self, app: ASGIApp, limiter: Optional[RateLimiter], admission: AdmissionController):
+        self.app = app
+        self.limiter = limiter
+        self.admission = admission
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        if self.limiter is not None:
+            wait = await self.limiter.check(scope)
+            if wait > 0:
+                await _reject(429, "Too many requests", wait)(scope, receive, send)
+                return
+
+        # Long-lived streams have their own cap and would otherwise hold in-flight slots indefinitely
+        if scope["path"] in self.admission.exempt:
+            await self.app(scope, receive, send)
+            return
+        if not self.admission.admit():
+            await _reject(503, "Server is overloaded", 1)(scope, receive, send)
+            return
+        self.admission.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.admission.in_flight -= 1
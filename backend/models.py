@@ -1,7 +1,23 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from pydantic import BaseModel, Field, model_validator
+from typing import Any, ClassVar, Dict, List, Literal, Optional, Tuple
 from datetime import datetime
 import uuid
+from cache import version_stamp
+
+# Partial updates: an omitted field is left as stored, and only the fields listed in `nullable`
+# (or the expected `version`) may be sent as null, so an update cannot clear a required field
+class PartialUpdate(BaseModel):
+    nullable: ClassVar[Tuple[str, ...]] = ()
+
+    @model_validator(mode="before")
+    @classmethod
+    def reject_nulls(cls, data: Any) -> Any:
+        if isinstance(data, dict):
+            cleared = [name for name, value in data.items()
+                       if value is None and name in cls.model_fields and name not in cls.nullable + ("version",)]
+            if cleared:
+                raise ValueError(f"{', '.join(cleared)} cannot be null")
+        return data
 
 # Profile Models
 class Profile(BaseModel):
@@ -13,6 +29,7 @@ class Profile(BaseModel):
     profileImage: str
     createdAt: datetime = Field(default_factory=datetime.utcnow)
     updatedAt: datetime = Field(default_factory=datetime.utcnow)
+    version: int = 0
 
 class ProfileCreate(BaseModel):
     name: str
@@ -21,12 +38,13 @@ class ProfileCreate(BaseModel):
     intro: str
     profileImage: str
 
-class ProfileUpdate(BaseModel):
+class ProfileUpdate(PartialUpdate):
     name: Optional[str] = None
     title: Optional[str] = None
     tagline: Optional[str] = None
     intro: Optional[str] = None
     profileImage: Optional[str] = None
+    version: Optional[int] = None  # expected version for optimistic concurrency
 
 # Project Models
 class Project(BaseModel):
@@ -44,6 +62,7 @@ class Project(BaseModel):
     order: int = 0
     createdAt: datetime = Field(default_factory=datetime.utcnow)
     updatedAt: datetime = Field(default_factory=datetime.utcnow)
+    version: int = 0
 
 class ProjectCreate(BaseModel):
     title: str
@@ -58,7 +77,9 @@ class ProjectCreate(BaseModel):
     featured: bool = False
     order: int = 0
 
-class ProjectUpdate(BaseModel):
+class ProjectUpdate(PartialUpdate):
+    nullable: ClassVar[Tuple[str, ...]] = ("githubUrl", "liveUrl")
+
     title: Optional[str] = None
     description: Optional[str] = None
     tools: Optional[List[str]] = None
@@ -70,6 +91,7 @@ class ProjectUpdate(BaseModel):
     liveUrl: Optional[str] = None
     featured: Optional[bool] = None
     order: Optional[int] = None
+    version: Optional[int] = None  # expected version for optimistic concurrency
 
 # Skill Models
 class Skill(BaseModel):
@@ -81,6 +103,7 @@ class Skill(BaseModel):
     order: int = 0
     createdAt: datetime = Field(default_factory=datetime.utcnow)
     updatedAt: datetime = Field(default_factory=datetime.utcnow)
+    version: int = 0
 
 class SkillCreate(BaseModel):
     name: str
@@ -89,12 +112,13 @@ class SkillCreate(BaseModel):
     progress: int
     order: int = 0
 
-class SkillUpdate(BaseModel):
+class SkillUpdate(PartialUpdate):
     name: Optional[str] = None
     level: Optional[str] = None
     icon: Optional[str] = None
     progress: Optional[int] = None
     order: Optional[int] = None
+    version: Optional[int] = None  # expected version for optimistic concurrency
 
 # About Models
 class Highlight(BaseModel):
@@ -111,6 +135,7 @@ class About(BaseModel):
     highlights: List[Highlight] = []
     createdAt: datetime = Field(default_factory=datetime.utcnow)
     updatedAt: datetime = Field(default_factory=datetime.utcnow)
+    version: int = 0
 
 class AboutCreate(BaseModel):
     summary: str
@@ -119,12 +144,13 @@ class AboutCreate(BaseModel):
     passion: str
     highlights: List[Highlight] = []
 
-class AboutUpdate(BaseModel):
+class AboutUpdate(PartialUpdate):
     summary: Optional[str] = None
     experience: Optional[str] = None
     learning: Optional[str] = None
     passion: Optional[str] = None
     highlights: Optional[List[Highlight]] = None
+    version: Optional[int] = None  # expected version for optimistic concurrency
 
 # Contact Models
 class Contact(BaseModel):
@@ -136,6 +162,7 @@ class Contact(BaseModel):
     status: str = "new"  # 'new', 'read', 'replied'
     createdAt: datetime = Field(default_factory=datetime.utcnow)
     updatedAt: datetime = Field(default_factory=datetime.utcnow)
+    version: int = 0
 
 class ContactCreate(BaseModel):
     name: str
@@ -143,8 +170,37 @@ class ContactCreate(BaseModel):
     subject: str
     message: str
 
-class ContactUpdate(BaseModel):
+class ContactUpdate(PartialUpdate):
     status: str
+    version: Optional[int] = None  # expected version for optimistic concurrency
+
+CONTACT_STATUSES = ("new", "read", "replied")
+# Period formats shared by strftime and MongoDB's $dateToString; weeks are ISO weeks
+DAY_FORMAT = "%Y-%m-%d"
+WEEK_FORMAT = "%G-W%V"
+
+class PeriodCount(BaseModel):
+    period: str  # e.g. "2024-05-31" for a day, "2024-W22" for an ISO week
+    count: int
+
+class ContactStats(BaseModel):
+    total: int
+    byStatus: Dict[str, int]
+    byDay: List[PeriodCount]  # oldest first, including days without submissions
+    byWeek: List[PeriodCount]
+
+    @classmethod
+    def from_counts(cls, statuses: Dict[str, int], days: Dict[str, int], weeks: Dict[str, int],
+                    day_starts: List[datetime], week_starts: List[datetime]) -> "ContactStats":
+        """Fill in the periods starting at `day_starts` and `week_starts` that have no submissions."""
+        return cls(
+            total=sum(statuses.values()),
+            byStatus={**{status: 0 for status in CONTACT_STATUSES}, **statuses},
+            byDay=[PeriodCount(period=period, count=days.get(period, 0))
+                   for period in (start.strftime(DAY_FORMAT) for start in day_starts)],
+            byWeek=[PeriodCount(period=period, count=weeks.get(period, 0))
+                    for period in (start.strftime(WEEK_FORMAT) for start in week_starts)],
+        )
 
 # Settings Models
 class Settings(BaseModel):
@@ -157,6 +213,7 @@ class Settings(BaseModel):
     responseTime: str = "Usually within 24 hours"
     createdAt: datetime = Field(default_factory=datetime.utcnow)
     updatedAt: datetime = Field(default_factory=datetime.utcnow)
+    version: int = 0
 
 class SettingsCreate(BaseModel):
     email: str
@@ -166,10 +223,106 @@ class SettingsCreate(BaseModel):
     location: str = "Available for remote work worldwide"
     responseTime: str = "Usually within 24 hours"
 
-class SettingsUpdate(BaseModel):
+class SettingsUpdate(PartialUpdate):
     email: Optional[str] = None
     linkedin: Optional[str] = None
     github: Optional[str] = None
     leetcode: Optional[str] = None
     location: Optional[str] = None
-    responseTime: Optional[str] = None
\ No newline at end of file
+    responseTime: Optional[str] = None
+    version: Optional[int] = None  # expected version for optimistic concurrency
+
+# Bootstrap Models
+class Bootstrap(BaseModel):
+    version: str
+    profile: Profile
+    settings: Settings
+    about: About
+    projects: List[Project]
+    skills: List[Skill]
+
+    @classmethod
+    def from_documents(cls, profile: Dict[str, Any], settings: Dict[str, Any], about: Dict[str, Any],
+                       projects: List[Dict[str, Any]], skills: List[Dict[str, Any]]) -> "Bootstrap":
+        return cls(
+            version=version_stamp(profile, settings, about, *projects, *skills),
+            profile=Profile(**profile),
+            settings=Settings(**settings),
+            about=About(**about),
+            projects=[Project(**project) for project in projects],
+            skills=[Skill(**skill) for skill in skills],
+        )
+
+
+# Facet Models
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+class ProjectFacets(BaseModel):
+    total: int
+    tools: List[FacetCount]  # most used first
+    featured: int
+    notFeatured: int
+
+    @classmethod
+    def from_counts(cls, counts: Dict[str, Dict[Any, int]]) -> "ProjectFacets":
+        tools = sorted(counts["tools"].items(), key=lambda item: (-item[1], item[0].lower(), item[0]))
+        featured = counts["featured"].get(True, 0)
+        not_featured = counts["featured"].get(False, 0)
+        return cls(
+            total=featured + not_featured,
+            tools=[FacetCount(value=tool, count=count) for tool, count in tools],
+            featured=featured,
+            notFeatured=not_featured,
+        )
+
+# Change Models
+class Tombstone(BaseModel):
+    id: str
+    collection: str
+    deletedAt: datetime = Field(default_factory=datetime.utcnow)
+
+class ChangeSet(BaseModel):
+    since: Optional[datetime] = None
+    until: datetime  # pass as `since` on the next request
+    full: bool = False  # True when this is the whole portfolio rather than a delta
+    profile: Optional[Profile] = None
+    settings: Optional[Settings] = None
+    about: Optional[About] = None
+    projects: List[Project] = []
+    skills: List[Skill] = []
+    deleted: List[Tombstone] = []
+
+# Search Models
+class SearchHit(BaseModel):
+    collection: str  # 'projects' or 'contacts'
+    id: str
+    title: str  # project title or contact subject
+    score: float
+
+# Bulk Models
+class BulkOperation(BaseModel):
+    op: Literal["upsert", "update", "delete"]
+    id: Optional[str] = None
+    data: Dict[str, Any] = {}
+
+class BulkRequest(BaseModel):
+    operations: List[BulkOperation]
+
+class BulkItemResult(BaseModel):
+    index: int
+    op: str
+    id: Optional[str] = None
+    status: str  # 'created', 'updated', 'deleted', 'not_found', 'invalid', 'failed'
+    error: Optional[str] = None
+
+class BulkResult(BaseModel):
+    results: List[BulkItemResult]
+
+class ReorderItem(BaseModel):
+    id: str
+    order: int
+
+class ReorderRequest(BaseModel):
+    items: List[ReorderItem]
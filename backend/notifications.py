@@ -0,0 +1,202 @@
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Sequence, Tuple
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+from storage import MongoStorage, Storage
+
+logger = logging.getLogger(__name__)
+
+# Collections behind the cached public reads
+WATCHED = ("profiles", "projects", "skills", "about", "settings")
+
+# Server errors meaning change streams are unavailable: not a replica set, or not supported
+CHANGE_STREAMS_UNSUPPORTED = {40573, 115, 136}
+# The resume token fell off the oplog; changes may have been missed
+CHANGE_STREAM_HISTORY_LOST = 286
+
+Notify = Callable[[str], Any]
+
+
+class LocalWrites:
+    """Writes this worker made and already announced, so watchers can skip notifying it of them.
+
+    Each write is expected for `window` seconds; one that is never seen stops masking others then.
+    """
+
+    def __init__(self, window: float):
+        self.window = window
+        self._pending: Dict[str, Deque[float]] = {}
+
+    def add(self, collection: str, count: int = 1) -> None:
+        deadline = time.monotonic() + self.window
+        self._pending.setdefault(collection, deque()).extend([deadline] * count)
+
+    def _current(self, collection: str) -> Deque[float]:
+        pending = self._pending.get(collection, deque())
+        now = time.monotonic()
+        while pending and pending[0] < now:
+            pending.popleft()
+        return pending
+
+    def take(self, collection: str) -> bool:
+        """Consume one expected write of `collection`; False if none is expected."""
+        pending = self._current(collection)
+        if not pending:
+            return False
+        pending.popleft()
+        return True
+
+    def take_all(self, collection: str) -> bool:
+        """Consume every expected write of `collection`; False if none was expected."""
+        pending = self._current(collection)
+        if not pending:
+            return False
+        pending.clear()
+        return True
+
+
+class PollingWatcher:
+    """Detects writes by polling each collection's count and latest `updatedAt` (its high-water mark).
+
+    A collection this worker wrote to since the last poll is not notified: its high-water mark
+    cannot tell those writes from other workers' made in the same interval, and they have been
+    announced already.
+    """
+
+    mode = "poll"
+
+    def __init__(self, storage: Storage, collections: Sequence[str] = WATCHED, interval: float = 2.0):
+        self.storage = storage
+        self.collections = tuple(collections)
+        self.interval = interval
+        self.notifications = 0
+        self.skipped = 0
+        self.local = LocalWrites(window=2 * interval + 1)
+
+    def expect(self, collection: str, count: int = 1) -> None:
+        """Record writes this worker made and announced itself."""
+        self.local.add(collection, count)
+
+    async def _marks(self) -> Dict[str, Tuple[Any, ...]]:
+        marks = await asyncio.gather(*(self.storage[name].high_water_mark() for name in self.collections))
+        return dict(zip(self.collections, marks))
+
+    async def run(self, notify: Notify) -> None:
+        marks: Optional[Dict[str, Tuple[Any, ...]]] = None
+        while True:
+            try:
+                current = await self._marks()
+            except Exception as e:
+                logger.warning("Polling for changes failed: %s", e)
+            else:
+                if marks is not None:
+                    for name in self.collections:
+                        if current[name] == marks[name]:
+                            continue
+                        if self.local.take_all(name):
+                            self.skipped += 1
+                        else:
+                            self.notifications += 1
+                            notify(name)
+                marks = current
+            await asyncio.sleep(self.interval)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"mode": self.mode, "notifications": self.notifications, "skipped": self.skipped}
+
+
+class ChangeStreamWatcher:
+    """Relays MongoDB change stream events, falling back to `fallback` where change streams are unsupported.
+
+    Each write produces one event, so every write this worker `expect`s skips one event of its collection.
+    """
+
+    mode = "stream"
+
+    def __init__(self, db, collections: Sequence[str] = WATCHED, fallback: Optional[PollingWatcher] = None,
+                 retry_interval: float = 5.0):
+        self.db = db
+        self.collections = tuple(collections)
+        self.fallback = fallback
+        self.retry_interval = retry_interval
+        self.notifications = 0
+        self.skipped = 0
+        self.local = LocalWrites(window=5.0)
+
+    def expect(self, collection: str, count: int = 1) -> None:
+        """Record writes this worker made and announced itself."""
+        if self.mode == "poll":
+            self.fallback.expect(collection, count)
+        else:
+            self.local.add(collection, count)
+
+    def _notify_all(self, notify: Notify) -> None:
+        for name in self.collections:
+            self.notifications += 1
+            notify(name)
+
+    async def run(self, notify: Notify) -> None:
+        pipeline = [{"$match": {"ns.coll": {"$in": list(self.collections)}}}]
+        resume_token = None
+        while True:
+            try:
+                async with self.db.watch(pipeline, resume_after=resume_token) as stream:
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        collection = change.get("ns", {}).get("coll")
+                        if collection is None:  # dropDatabase or invalidate events
+                            self._notify_all(notify)
+                        elif self.local.take(collection):
+                            self.skipped += 1
+                        else:
+                            self.notifications += 1
+                            notify(collection)
+            except (NotImplementedError, OperationFailure) as e:
+                code = getattr(e, "code", None)
+                if code == CHANGE_STREAM_HISTORY_LOST:
+                    logger.warning("Change stream history lost, invalidating everything: %s", e)
+                    resume_token = None
+                    self._notify_all(notify)
+                    continue
+                if self.fallback is None or (code is not None and code not in CHANGE_STREAMS_UNSUPPORTED):
+                    logger.error("Change stream failed, cross-worker invalidation is off: %s", e)
+                    raise
+                logger.info("Change streams are not available (%s), polling for changes instead", e)
+                self.mode = self.fallback.mode
+                await self.fallback.run(notify)
+                return
+            except PyMongoError as e:
+                logger.warning("Change stream interrupted, reopening in %.0fs: %s", self.retry_interval, e)
+                await asyncio.sleep(self.retry_interval)
+                if resume_token is None:
+                    # Nothing to resume from, so writes during the outage would go unnoticed
+                    self._notify_all(notify)
+
+    def stats(self) -> Dict[str, Any]:
+        if self.mode == "poll":
+            return self.fallback.stats()
+        return {"mode": self.mode, "notifications": self.notifications, "skipped": self.skipped}
+
+
+def create_change_watcher(storage: Storage, collections: Sequence[str] = WATCHED):
+    """Build the watcher selected by CHANGE_NOTIFICATIONS: 'auto', 'stream', 'poll' or 'off'.
+
+    'auto' (the default) uses change streams on MongoDB and falls back to polling when the
+    server is not a replica set. The in-memory backend is private to its process, so it is
+    only watched when polling is requested explicitly.
+    """
+    mode = os.environ.get("CHANGE_NOTIFICATIONS", "auto")
+    interval = float(os.environ.get("CHANGE_POLL_SECONDS", "2"))
+    if mode == "off" or (mode == "auto" and not isinstance(storage, MongoStorage)):
+        return None
+    if mode == "poll":
+        return PollingWatcher(storage, collections, interval=interval)
+    if mode not in ("auto", "stream") or not isinstance(storage, MongoStorage):
+        raise ValueError(f"Unsupported CHANGE_NOTIFICATIONS={mode} for {type(storage).__name__}")
+    fallback = PollingWatcher(storage, collections, interval=interval) if mode == "auto" else None
+    return ChangeStreamWatcher(storage.db, collections, fallback=fallback)
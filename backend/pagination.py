@@ -0,0 +1,77 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple, Type
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+from fieldsets import render_document
+
+MAX_PAGE_SIZE = 1000
+
+# The type of each sort key's value in a cursor; comparing a value of another type with
+# stored keys would fail (or, on MongoDB, silently sort by type)
+CURSOR_TYPES: Dict[str, Tuple[type, ...]] = {
+    "order": (int,),
+    "createdAt": (datetime,),
+    "deletedAt": (datetime,),
+    "id": (str,),
+    # Search results, ordered by (score, collection, id)
+    "score": (int, float),
+    "collection": (str,),
+}
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"$date": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and "$date" in value:
+        return datetime.fromisoformat(value["$date"])
+    return value
+
+
+def encode_cursor(document: Dict[str, Any], sort: Sequence[Tuple[str, int]]) -> str:
+    values = [_encode_value(document.get(key)) for key, _ in sort]
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _valid_value(key: str, value: Any) -> bool:
+    types = CURSOR_TYPES.get(key)
+    if types is None:
+        return True
+    if isinstance(value, bool):
+        return bool in types
+    if isinstance(value, datetime):
+        return datetime in types and value.tzinfo is None  # stored times are naive UTC
+    return isinstance(value, types)
+
+
+def decode_cursor(cursor: str, sort: Sequence[Tuple[str, int]]) -> List[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = [_decode_value(value) for value in json.loads(raw)]
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if len(values) != len(sort) or not all(_valid_value(key, value) for (key, _), value in zip(sort, values)):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def split_page(rows: List[Dict[str, Any]], page_size: int, sort: Sequence[Tuple[str, int]]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Split `page_size + 1` fetched rows into the page and the cursor for the next one."""
+    if len(rows) <= page_size:
+        return rows, None
+    page = rows[:page_size]
+    return page, encode_cursor(page[-1], sort)
+
+
+async def ndjson_rows(rows: AsyncIterator[Dict[str, Any]], model: Type[BaseModel],
+                      selected: Optional[Tuple[str, ...]] = None) -> AsyncIterator[bytes]:
+    async for document in rows:
+        yield render_document(model, document, selected) + b"\n"
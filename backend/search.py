@@ -0,0 +1,272 @@
+import asyncio
+import heapq
+import logging
+import math
+import re
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
+
+from storage import Storage
+
+logger = logging.getLogger(__name__)
+
+# Indexed fields per collection and their weight in ranking
+FIELDS: Dict[str, Dict[str, float]] = {
+    "projects": {"title": 3.0, "tools": 2.0, "description": 1.0, "problem": 1.0, "solution": 1.0, "impact": 1.0},
+    "contacts": {"subject": 3.0, "message": 1.0},
+}
+SEARCHED = tuple(FIELDS)
+# The field shown as the title of a hit
+TITLES = {"projects": "title", "contacts": "subject"}
+
+# Letters and digits, keeping tool names such as "node.js", "c++" and "c#" whole
+_TOKEN = re.compile(r"[^\W_][\w+#]*(?:\.[\w+#]+)*")
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were will with".split()
+)
+MAX_PREFIX_EXPANSIONS = 50
+
+Key = Tuple[str, str]  # (collection, id)
+# Per-document scores of a term: ordered highest first, and by document
+Impacts = Tuple[List[Tuple[float, Key]], Dict[Key, float]]
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOP_WORDS]
+
+
+def _text(value: Any) -> str:
+    if isinstance(value, (list, tuple)):
+        return " ".join(str(item) for item in value)
+    return str(value) if value is not None else ""
+
+
+class SearchIndex:
+    """In-memory inverted index with BM25 ranking over the fields in FIELDS.
+
+    Each term maps to the documents containing it and their field-weighted term frequency,
+    so a query only touches the postings of its own terms. Every query term must match
+    (the last one as a prefix, for search-as-you-type). Documents are added and removed
+    one at a time as they are written; `catch_up` applies writes made elsewhere, from
+    documents updated and tombstones left since the newest `updatedAt` already indexed.
+    """
+
+    def __init__(self, fields: Dict[str, Dict[str, float]] = FIELDS, k1: float = 1.2, b: float = 0.75):
+        self.fields = fields
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[Key, float]] = {}
+        self._terms: List[str] = []  # sorted, for prefix lookups
+        self._documents: Dict[Key, Tuple[str, Tuple[str, ...]]] = {}  # title and terms, for removal
+        self._lengths: Dict[Key, float] = {}
+        self._total_length = 0.0
+        self._impact_cache: Dict[str, Impacts] = {}
+        self._prefix_cache: Dict[str, Impacts] = {}
+        self._results: "OrderedDict[Tuple[Any, ...], List[Dict[str, Any]]]" = OrderedDict()
+        self.max_results = 256
+        # Document count and average length the cached scores were computed with
+        self._impact_count = 0
+        self._impact_length = 1.0
+        self._marks: Dict[str, datetime] = {}
+        self._stale: Set[str] = set()
+        self._refreshing: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    # Maintenance
+    def add(self, collection: str, document: Dict[str, Any]) -> None:
+        key = (collection, document["id"])
+        self.remove(collection, document["id"])
+        frequencies: Dict[str, float] = {}
+        length = 0.0
+        for field, weight in self.fields[collection].items():
+            for term in tokenize(_text(document.get(field))):
+                frequencies[term] = frequencies.get(term, 0.0) + weight
+                length += weight
+        for term, frequency in frequencies.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                insort(self._terms, term)
+            postings[key] = frequency
+            self._forget(term)
+        self._documents[key] = (_text(document.get(TITLES[collection])), tuple(frequencies))
+        self._lengths[key] = length
+        self._total_length += length
+        updated_at = document.get("updatedAt")
+        if isinstance(updated_at, datetime) and updated_at > self._marks.get(collection, datetime.min):
+            self._marks[collection] = updated_at
+
+    def _forget(self, term: str) -> None:
+        """Drop cached scores that involve `term`, including those of every prefix expanding to it."""
+        self._results.clear()
+        self._impact_cache.pop(term, None)
+        for end in range(1, len(term) + 1):
+            self._prefix_cache.pop(term[:end], None)
+
+    def remove(self, collection: str, document_id: str) -> None:
+        key = (collection, document_id)
+        entry = self._documents.pop(key, None)
+        if entry is None:
+            return
+        for term in entry[1]:
+            postings = self._postings[term]
+            del postings[key]
+            self._forget(term)
+            if not postings:
+                del self._postings[term]
+                del self._terms[bisect_left(self._terms, term)]
+        self._total_length -= self._lengths.pop(key)
+
+    async def build(self, storage: Storage, collections: Sequence[str] = SEARCHED) -> None:
+        for collection in collections:
+            async for document in storage[collection].find():
+                self.add(collection, document)
+        logger.info("Indexed %d documents for search", len(self))
+
+    async def catch_up(self, storage: Storage, collection: str, overlap: timedelta = timedelta(seconds=5)) -> None:
+        """Apply writes to `collection` not made through this index, e.g. by other workers."""
+        mark = self._marks.get(collection)
+        if mark is None:
+            await self.build(storage, [collection])
+            return
+        since = mark - overlap
+        changed, deleted = await asyncio.gather(
+            storage[collection].find_all({"updatedAt": {"$gte": since}}),
+            storage.tombstones.find_all({"collection": collection, "deletedAt": {"$gte": since}}),
+        )
+        for document in changed:
+            self.add(collection, document)
+        for tombstone in deleted:
+            self.remove(collection, tombstone["id"])
+
+    def refresh_later(self, storage: Storage, collection: str) -> None:
+        """Catch up on `collection` in the background; repeated calls while one runs are merged."""
+        self._stale.add(collection)
+        if self._refreshing is None or self._refreshing.done():
+            self._refreshing = asyncio.create_task(self._refresh_stale(storage))
+
+    async def _refresh_stale(self, storage: Storage) -> None:
+        while self._stale:
+            collection = self._stale.pop()
+            try:
+                await self.catch_up(storage, collection)
+            except Exception as e:
+                logger.warning("Could not update the search index for %s: %s", collection, e)
+
+    # Queries
+    def _expand(self, prefix: str) -> List[str]:
+        start = bisect_left(self._terms, prefix)
+        terms = []
+        for term in self._terms[start:start + MAX_PREFIX_EXPANSIONS]:
+            if not term.startswith(prefix):
+                break
+            terms.append(term)
+        return terms
+
+    def _impacts(self, term: str) -> Impacts:
+        """The BM25 score of `term` in each document containing it, highest first and by document."""
+        count = len(self._documents)
+        average_length = self._total_length / count or 1.0
+        # Scores depend on the document count and average length; recompute them all once either has drifted
+        if (abs(average_length - self._impact_length) > 0.1 * self._impact_length
+                or abs(count - self._impact_count) > 0.1 * self._impact_count):
+            self._impact_cache.clear()
+            self._prefix_cache.clear()
+            self._impact_length = average_length
+            self._impact_count = count
+        impacts = self._impact_cache.get(term)
+        if impacts is None:
+            postings = self._postings[term]
+            k1, b = self.k1, self.b
+            idf = math.log(1 + (self._impact_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            scores = {
+                key: idf * frequency * (k1 + 1) / (frequency + k1 * (1 - b + b * self._lengths[key] / self._impact_length))
+                for key, frequency in postings.items()
+            }
+            impacts = self._impact_cache[term] = (sorted(((score, key) for key, score in scores.items()), reverse=True), scores)
+        return impacts
+
+    def _prefix_impacts(self, prefix: str) -> Optional[Impacts]:
+        """Scores for a prefix: a document scores by all of the terms it contains that start with it."""
+        terms = self._expand(prefix)
+        if len(terms) <= 1:
+            return self._impacts(terms[0]) if terms else None
+        impacts = self._prefix_cache.get(prefix)
+        if impacts is None:
+            scores: Dict[Key, float] = {}
+            for term in terms:
+                for key, score in self._impacts(term)[1].items():
+                    scores[key] = scores.get(key, 0.0) + score
+            impacts = self._prefix_cache[prefix] = (sorted(((score, key) for key, score in scores.items()), reverse=True), scores)
+        return impacts
+
+    def search(self, query: str, collections: Optional[Iterable[str]] = None, limit: int = 20,
+               after: Optional[Tuple[float, str, str]] = None) -> List[Dict[str, Any]]:
+        """Up to `limit` hits ranked by score, then collection and id; `after` is the last hit of the previous page.
+
+        Documents are visited in descending score for the query term with the fewest matches,
+        and the scan stops once no remaining document can make the page (max-score pruning),
+        so a query rarely scores every document its terms match. Results are cached until the
+        next write.
+        """
+        terms = tokenize(query)
+        if not terms or not self._documents:
+            return []
+        wanted = frozenset(collections) if collections is not None else None
+        cache_key = (tuple(terms), wanted, limit, after)
+        hits = self._results.get(cache_key)
+        if hits is None:
+            hits = self._search(terms, wanted, limit, after)
+            self._results[cache_key] = hits
+            if len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+        return hits
+
+    def _search(self, terms: List[str], wanted: Optional[FrozenSet[str]], limit: int,
+                after: Optional[Tuple[float, str, str]]) -> List[Dict[str, Any]]:
+        if any(term not in self._postings for term in terms[:-1]):
+            return []
+        last = self._prefix_impacts(terms[-1])
+        if last is None:
+            return []
+        # Every query term must match
+        groups = sorted([self._impacts(term) for term in terms[:-1]] + [last], key=lambda group: len(group[1]))
+        driver, others = groups[0], [scores for _, scores in groups[1:]]
+        others_max = sum(ordered[0][0] for ordered, _ in groups[1:])
+        position = (-after[0], after[1], after[2]) if after is not None else None
+
+        hits: List[Tuple[float, str, str]] = []
+        best: List[float] = []  # the `limit` highest scores so far, as a min-heap
+        for driver_score, key in driver[0]:
+            if len(best) == limit and driver_score + others_max < best[0]:
+                break
+            if wanted is not None and key[0] not in wanted:
+                continue
+            score = driver_score
+            for scores in others:
+                other = scores.get(key)
+                if other is None:
+                    break
+                score += other
+            else:
+                hit = (-score, key[0], key[1])
+                if position is not None and hit <= position:
+                    continue
+                hits.append(hit)
+                if len(best) < limit:
+                    heapq.heappush(best, score)
+                elif score > best[0]:
+                    heapq.heapreplace(best, score)
+
+        return [
+            {"collection": collection, "id": document_id, "title": self._documents[(collection, document_id)][0],
+             "score": -negative_score}
+            for negative_score, collection, document_id in heapq.nsmallest(limit, hits)
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"documents": len(self._documents), "terms": len(self._postings)}
@@ -1,5 +1,11 @@
-from models import Profile, Project, Skill, About, Settings, Highlight
+from models import Profile, Project, Skill, About, Contact, Settings, Highlight
 from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+import asyncio
+import json
+import logging
+import time
 
 # Seed data based on mock.js
 seed_profile = Profile(
@@ -80,4 +86,76 @@ seed_settings = Settings(
     linkedin="https://linkedin.com/in/surabhi-priya",
     github="https://github.com/surabhi-priya",
     leetcode="https://leetcode.com/surabhi-priya"
-)
\ No newline at end of file
+)
+
+# Seeding
+SEED_MODELS = {
+    "profiles": Profile,
+    "projects": Project,
+    "skills": Skill,
+    "about": About,
+    "contacts": Contact,
+    "settings": Settings,
+}
+
+SEED_BATCH_SIZE = 1000
+
+
+def default_seed() -> Dict[str, List[dict]]:
+    return {
+        "profiles": [seed_profile.dict()],
+        "projects": [project.dict() for project in seed_projects],
+        "skills": [skill.dict() for skill in seed_skills],
+        "about": [seed_about.dict()],
+        "settings": [seed_settings.dict()],
+    }
+
+
+def load_fixture(path: str) -> Dict[str, List[dict]]:
+    """Load seed documents from a fixture file.
+
+    `.json` files hold an object mapping collection names to lists of documents;
+    `.ndjson`/`.jsonl` files hold one `{"collection": ..., "document": ...}` object per line.
+    Every document is validated against its model, which also fills in ids and timestamps.
+    """
+    fixture_path = Path(path)
+    raw: Dict[str, List[dict]] = {}
+    with fixture_path.open() as f:
+        if fixture_path.suffix in (".ndjson", ".jsonl"):
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    raw.setdefault(entry["collection"], []).append(entry["document"])
+        else:
+            raw = json.load(f)
+
+    unknown = set(raw) - set(SEED_MODELS)
+    if unknown:
+        raise ValueError(f"Unknown collections in fixture: {', '.join(sorted(unknown))}")
+    return {
+        name: [SEED_MODELS[name](**document).dict() for document in documents]
+        for name, documents in raw.items()
+    }
+
+
+async def seed_collection(storage, name: str, documents: List[dict]) -> None:
+    started = time.perf_counter()
+    for start in range(0, len(documents), SEED_BATCH_SIZE):
+        await storage[name].insert_many(documents[start:start + SEED_BATCH_SIZE])
+    logging.info(f"Seeded {len(documents)} {name} in {(time.perf_counter() - started) * 1000:.1f}ms")
+
+
+async def seed_database(storage, fixture_path: Optional[str] = None) -> None:
+    """Seed every collection concurrently unless the database already has a profile.
+
+    Collections present in the fixture replace the built-in seed data; the rest keep it.
+    """
+    if await storage.profiles.find_one():
+        return
+    data = default_seed()
+    if fixture_path:
+        data.update(load_fixture(fixture_path))
+    await asyncio.gather(*(
+        seed_collection(storage, name, documents) for name, documents in data.items() if documents
+    ))
+    logging.info("Database seeded successfully")
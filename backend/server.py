@@ -1,29 +1,217 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi import FastAPI, APIRouter, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from pydantic import BaseModel
 from models import (
     Profile, ProfileCreate, ProfileUpdate,
     Project, ProjectCreate, ProjectUpdate,
     Skill, SkillCreate, SkillUpdate,
     About, AboutCreate, AboutUpdate,
     Contact, ContactCreate, ContactUpdate,
-    Settings, SettingsCreate, SettingsUpdate
+    Settings, SettingsCreate, SettingsUpdate,
+    Bootstrap, ChangeSet, Tombstone,
+    BulkRequest, BulkResult, ReorderRequest, SearchHit, ProjectFacets,
+    ContactStats, DAY_FORMAT, WEEK_FORMAT
 )
-from seed_data import seed_profile, seed_projects, seed_skills, seed_about, seed_settings
+from seed_data import seed_database
+from bulk import run_bulk, reorder_operations
+from cache import SingleFlight, TTLCache
+from encoding import json_response
+from fieldsets import parse_fields, fieldset_tag, storage_fields, render_document, render_documents
+from compression import CompressedBody, CompressionMiddleware
+from snapshots import SnapshotCache
+from notifications import WATCHED, create_change_watcher
+from events import EventBroker
+from ingest import IngestOverloaded, WriteBehindQueue
+from idempotency import ExpiringClaims, contact_fingerprint, request_fingerprint
+from search import SEARCHED, SearchIndex
+from limits import AdmissionController, Limit, LoadSheddingMiddleware, RateLimiter, create_bucket_store, parse_networks
+from conditional import conditional_response, is_not_modified, last_modified, validator_headers
+from pagination import MAX_PAGE_SIZE, decode_cursor, split_page, ndjson_rows
+from storage import create_storage
+from indexes import TOMBSTONE_RETENTION_DAYS
+import asyncio
+import hashlib
 import os
 import logging
+import time
 from pathlib import Path
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# Storage backend (MongoDB by default, STORAGE_BACKEND=memory for a database-free instance)
+storage = create_storage()
+
+# Concurrent identical reads share one storage query, keyed by collection and query parameters
+read_flights = SingleFlight()
+
+# Last known good snapshots of the public reads: served stale while refreshing in the background,
+# and in place of an error when storage is slow or unreachable
+snapshots = SnapshotCache(
+    read_flights,
+    soft_ttl=float(os.environ.get('SNAPSHOT_SOFT_TTL_SECONDS', '30')),
+    max_stale=float(os.environ.get('SNAPSHOT_MAX_STALE_SECONDS', '300')),
+    path=os.environ.get('SNAPSHOT_FILE'),
+)
+
+def invalidate_reads(*collections: str):
+    """Force fresh reads of `collections` and of the bootstrap and changes built from them."""
+    snapshots.invalidate(*collections, "bootstrap", "changes")
+
+# Full-text search over projects and contacts, kept current by the write handlers
+search_index = SearchIndex()
+SEARCH_ORDER = (("score", -1), ("collection", 1), ("id", 1))
+
+# Live change events for /events subscribers
+events = EventBroker(
+    queue_size=int(os.environ.get('EVENTS_QUEUE_SIZE', '100')),
+    heartbeat=float(os.environ.get('EVENTS_HEARTBEAT_SECONDS', '15')),
+    max_subscribers=int(os.environ.get('EVENTS_MAX_SUBSCRIBERS', '10000')),
+)
+
+def publish_change(collection: str, op: str, document_id: Optional[str], updated_at: Optional[datetime] = None):
+    events.publish({"collection": collection, "op": op, "id": document_id, "updatedAt": updated_at or datetime.utcnow()})
+
+def announce(collection: str, op: str, *documents: dict):
+    """Invalidate cached reads of `collection`, update the search index and, for the public
+    collections in WATCHED, publish a change event per written document."""
+    expect_own_writes(collection, len(documents))
+    if collection in WATCHED:
+        invalidate_reads(collection)
+    else:
+        snapshots.invalidate(collection)
+    for document in documents:
+        if collection in SEARCHED:
+            if op == "delete":
+                search_index.remove(collection, document["id"])
+            else:
+                search_index.add(collection, document)
+        if collection in WATCHED:
+            publish_change(collection, op, document["id"], document.get("updatedAt"))
+
+BULK_EVENTS = {"created": "create", "updated": "update", "deleted": "delete"}
+
+async def announce_bulk(collection: str, result: BulkResult):
+    expect_own_writes(collection, sum(item.status in BULK_EVENTS for item in result.results))
+    invalidate_reads(collection)
+    if collection in SEARCHED:
+        await search_index.catch_up(storage, collection)
+    for item in result.results:
+        if item.status in BULK_EVENTS:
+            publish_change(collection, BULK_EVENTS[item.status], item.id)
+
+# Writes made through other workers (or directly in the database) invalidate this worker's reads;
+# their subscribers get a collection-level event without an id. Contacts are watched only for
+# their own snapshots and the search index: they are not part of the bootstrap or the public feed
+change_watcher = create_change_watcher(storage, WATCHED + ("contacts",))
+change_task: Optional[asyncio.Task] = None
+
+def expect_own_writes(collection: str, count: int):
+    """Keep the watcher from reporting writes back to the worker that announced them."""
+    if change_watcher is not None and count:
+        change_watcher.expect(collection, count)
+
+def external_change(collection: str):
+    if collection in WATCHED:
+        invalidate_reads(collection)
+    else:
+        snapshots.invalidate(collection)
+    if collection in SEARCHED:
+        search_index.refresh_later(storage, collection)
+    if collection in WATCHED:
+        publish_change(collection, "change", None)
+
+# Contact submissions are written behind the request, in batches (see ingest.py for CONTACT_ACK)
+contact_ingest = WriteBehindQueue(
+    storage, "contacts",
+    ack=os.environ.get('CONTACT_ACK', 'stored'),
+    max_batch=int(os.environ.get('CONTACT_BATCH_SIZE', '100')),
+    window=float(os.environ.get('CONTACT_BATCH_WINDOW_MS', '10')) / 1000,
+    max_pending=int(os.environ.get('CONTACT_QUEUE_SIZE', '10000')),
+    spool_path=os.environ.get('CONTACT_SPOOL_FILE'),
+    on_stored=lambda contacts: announce("contacts", "create", *contacts),
+)
+
+# Retried submissions: an Idempotency-Key replays the first response, and the same content
+# within CONTACT_DEDUP_WINDOW_SECONDS returns the contact it already created. Both keep the
+# response as JSON, so a replay matches the first response exactly
+idempotency_keys = ExpiringClaims(storage, "idempotency_keys", timedelta(hours=float(os.environ.get('IDEMPOTENCY_KEY_TTL_HOURS', '24'))))
+contact_fingerprints = ExpiringClaims(storage, "contact_fingerprints", timedelta(seconds=float(os.environ.get('CONTACT_DEDUP_WINDOW_SECONDS', '600'))))
+# A key whose request never finished (the worker died) can be reused after this long
+IDEMPOTENCY_PENDING_TTL = timedelta(seconds=60)
+
+# Per-client token buckets and load shedding on in-flight requests and event loop lag; both
+# answer with Retry-After. Rate limiting is opt-in (RATE_LIMIT=on): behind a proxy clients are
+# only told apart once RATE_LIMIT_TRUSTED_PROXIES lists its addresses, and until then every
+# visitor would share one bucket
+rate_limiter = None if os.environ.get('RATE_LIMIT', 'off') != 'on' else RateLimiter(
+    create_bucket_store(storage),
+    reads=Limit(float(os.environ.get('RATE_LIMIT_READS_PER_SECOND', '20')), int(os.environ.get('RATE_LIMIT_READ_BURST', '100'))),
+    writes=Limit(float(os.environ.get('RATE_LIMIT_WRITES_PER_SECOND', '2')), int(os.environ.get('RATE_LIMIT_WRITE_BURST', '20'))),
+    limits={
+        ("POST", "/api/contact"): Limit(float(os.environ.get('RATE_LIMIT_CONTACTS_PER_MINUTE', '5')) / 60,
+                                        int(os.environ.get('RATE_LIMIT_CONTACT_BURST', '5'))),
+        ("GET", "/api/events"): Limit(0.2, 5),  # reconnects
+    },
+    proxies=parse_networks(os.environ.get('RATE_LIMIT_TRUSTED_PROXIES', '')),
+)
+admission = AdmissionController(
+    max_in_flight=int(os.environ.get('ADMISSION_MAX_IN_FLIGHT', '512')),
+    max_lag=float(os.environ.get('ADMISSION_MAX_LAG_MS', '200')) / 1000,
+    exempt=("/api/events",),
+)
+
+async def read_snapshot(key: tuple, load, response: Optional[Response] = None):
+    snapshot = await snapshots.read(key, load)
+    if response is not None:
+        response.headers.update(snapshot.headers())
+    return snapshot.value
+
+async def find_singleton(collection: str, response: Optional[Response] = None):
+    return await read_snapshot((collection,), lambda: storage[collection].find_one(), response)
+
+async def record_deletions(collection: str, ids: List[str]):
+    """Leave tombstones so /changes can report the deletions to clients holding copies."""
+    for document_id in ids:
+        await storage.tombstones.delete_one({"id": document_id})
+        await storage.tombstones.insert_one(Tombstone(id=document_id, collection=collection).dict())
+
+def bulk_deletions(result: BulkResult) -> List[str]:
+    return [item.id for item in result.results if item.status == "deleted"]
+
+async def update_document(collection: str, query: dict, changes: BaseModel, not_found: str):
+    """Apply a partial update in a single round trip and return the updated document.
+
+    When the update carries a `version`, it is only applied if the stored document is
+    still at that version; otherwise the request fails with 409.
+    """
+    update_data = changes.dict(exclude_unset=True)
+    expected_version = update_data.pop("version", None)
+    update_data["updatedAt"] = datetime.utcnow()
+
+    updated = await storage[collection].update_one(query, update_data, expected_version)
+    if updated is None:
+        if expected_version is not None and await storage[collection].count(query):
+            raise HTTPException(status_code=409, detail="Version conflict")
+        raise HTTPException(status_code=404, detail=not_found)
+    return updated
+
+# Encoded (and lazily compressed) bodies of cacheable GETs, keyed by URL and ETag,
+# so each document revision is serialized and compressed once
+body_cache = TTLCache(ttl=float(os.environ.get('CACHE_TTL_SECONDS', '300')), max_entries=1024)
+
+def precompressed(request: Request, response: Response, render) -> Response:
+    headers = {key: value for key, value in response.headers.items() if key != "content-length"}
+    key = (request.url.path, request.url.query, headers.get("etag"))
+    body = body_cache.get(key)
+    if body is None:
+        body = CompressedBody(render())
+        body_cache.set(key, body)
+    return body.response(request.headers.get("accept-encoding"), headers)
 
 # Create the main app without a prefix
 app = FastAPI()
@@ -31,228 +219,459 @@ app = FastAPI()
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
-# Seed database on startup
-@app.on_event("startup")
-async def seed_database():
+async def run_startup_phase(phase: str, operation) -> None:
+    started = time.perf_counter()
     try:
-        # Check if data already exists
-        profile_exists = await db.profiles.find_one()
-        if not profile_exists:
-            # Seed profile
-            await db.profiles.insert_one(seed_profile.dict())
-            
-            # Seed projects
-            for project in seed_projects:
-                await db.projects.insert_one(project.dict())
-            
-            # Seed skills
-            for skill in seed_skills:
-                await db.skills.insert_one(skill.dict())
-            
-            # Seed about
-            await db.about.insert_one(seed_about.dict())
-            
-            # Seed settings
-            await db.settings.insert_one(seed_settings.dict())
-            
-            logging.info("Database seeded successfully")
+        await operation
     except Exception as e:
-        logging.error(f"Error seeding database: {e}")
+        logging.error(f"Error during startup phase '{phase}': {e}")
+    logging.info(f"Startup phase '{phase}' took {(time.perf_counter() - started) * 1000:.1f}ms")
+
+# Prepare storage (indexes), then seed it on startup
+@app.on_event("startup")
+async def startup():
+    started = time.perf_counter()
+    snapshots.load()
+    await run_startup_phase("storage", storage.setup())
+    await run_startup_phase("seed", seed_database(storage, os.environ.get("SEED_FIXTURE")))
+    await run_startup_phase("search", search_index.build(storage))
+    contact_ingest.recover()
+    admission.start()
+    if change_watcher is not None:
+        global change_task
+        change_task = asyncio.create_task(change_watcher.run(external_change))
+    logging.info(f"Startup completed in {(time.perf_counter() - started) * 1000:.1f}ms")
 
 # Profile Endpoints
 @api_router.get("/profile", response_model=Profile)
-async def get_profile():
-    profile = await db.profiles.find_one()
+async def get_profile(request: Request, response: Response):
+    profile = await find_singleton("profiles", response)
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
-    return Profile(**profile)
+    not_modified = conditional_response(request, response, [profile])
+    if not_modified:
+        return not_modified
+    return precompressed(request, response, lambda: render_document(Profile, profile))
 
 @api_router.put("/profile", response_model=Profile)
 async def update_profile(profile_update: ProfileUpdate):
-    existing_profile = await db.profiles.find_one()
-    if not existing_profile:
-        raise HTTPException(status_code=404, detail="Profile not found")
-    
-    update_data = profile_update.dict(exclude_unset=True)
-    update_data["updatedAt"] = datetime.utcnow()
-    
-    await db.profiles.update_one(
-        {"id": existing_profile["id"]},
-        {"$set": update_data}
-    )
-    
-    updated_profile = await db.profiles.find_one({"id": existing_profile["id"]})
+    updated_profile = await update_document("profiles", {}, profile_update, "Profile not found")
+    announce("profiles", "update", updated_profile)
     return Profile(**updated_profile)
 
 # Project Endpoints
 @api_router.get("/projects", response_model=List[Project])
-async def get_projects(featured: Optional[bool] = None, limit: Optional[int] = None):
+async def get_projects(
+    request: Request,
+    response: Response,
+    featured: Optional[bool] = None,
+    tool: Optional[List[str]] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    stream: bool = False,
+    fields: Optional[str] = None,
+):
     query = {}
     if featured is not None:
         query["featured"] = featured
+    tools = tuple(sorted(set(tool))) if tool else None
+    if tools:
+        query["tools"] = {"$all": list(tools)}
     
-    cursor = db.projects.find(query).sort("order", 1)
-    if limit:
-        cursor = cursor.limit(limit)
+    after = decode_cursor(cursor, storage.projects.order) if cursor else None
+    selected = parse_fields(Project, fields)
+    projection = storage_fields(selected, storage.projects.order)
     
-    projects = await cursor.to_list(1000)
-    return [Project(**project) for project in projects]
+    if stream:
+        rows = storage.projects.find(query, after, limit, projection)
+        return StreamingResponse(ndjson_rows(rows, Project, selected), media_type="application/x-ndjson")
+    
+    page_size = limit or MAX_PAGE_SIZE
+    rows = await read_snapshot(
+        ("projects", featured, tools, cursor, page_size, projection),
+        lambda: storage.projects.find_all(query, after, page_size + 1, projection),
+        response,
+    )
+    projects, next_cursor = split_page(rows, page_size, storage.projects.order)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    # Validated on the page itself; the lookahead row only decides whether more pages follow
+    variant = fieldset_tag(selected) + ("+" if next_cursor else "")
+    not_modified = conditional_response(request, response, projects, variant, dated=False)
+    if not_modified:
+        return not_modified
+    return precompressed(request, response, lambda: render_documents(Project, projects, selected))
+
+# Tool and featured counts across all projects, aggregated in storage; the snapshot is the
+# materialized view, rebuilt on the first read after a project write
+async def build_project_facets():
+    facets = ProjectFacets.from_counts(await storage.projects.facet_counts(["tools", "featured"]))
+    body = facets.model_dump_json().encode()
+    return f'"{hashlib.sha1(body).hexdigest()[:16]}"', CompressedBody(body)
+
+@api_router.get("/projects/facets", response_model=ProjectFacets)
+async def get_project_facets(request: Request):
+    snapshot = await snapshots.read(("projects", "facets"), build_project_facets)
+    etag, body = snapshot.value
+    headers = {"ETag": etag, **snapshot.headers()}
+    if is_not_modified(request, etag, None):
+        return Response(status_code=304, headers=headers)
+    return body.response(request.headers.get("accept-encoding"), headers)
+
+@api_router.post("/projects/bulk", response_model=BulkResult)
+async def bulk_projects(bulk_request: BulkRequest):
+    result = await run_bulk(storage.projects, bulk_request.operations, ProjectCreate, ProjectUpdate, Project)
+    await record_deletions("projects", bulk_deletions(result))
+    await announce_bulk("projects", result)
+    return result
+
+@api_router.post("/projects/reorder", response_model=BulkResult)
+async def reorder_projects(reorder_request: ReorderRequest):
+    result = await run_bulk(storage.projects, reorder_operations(reorder_request.items), ProjectCreate, ProjectUpdate, Project)
+    await announce_bulk("projects", result)
+    return result
 
 @api_router.get("/projects/{project_id}", response_model=Project)
-async def get_project(project_id: str):
-    project = await db.projects.find_one({"id": project_id})
+async def get_project(project_id: str, request: Request, response: Response, fields: Optional[str] = None):
+    selected = parse_fields(Project, fields)
+    projection = storage_fields(selected)
+    project = await read_snapshot(
+        ("projects", project_id, projection),
+        lambda: storage.projects.find_one({"id": project_id}, projection),
+        response,
+    )
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
-    return Project(**project)
+    not_modified = conditional_response(request, response, [project], fieldset_tag(selected))
+    if not_modified:
+        return not_modified
+    return precompressed(request, response, lambda: render_document(Project, project, selected))
 
 @api_router.post("/projects", response_model=Project)
 async def create_project(project_create: ProjectCreate):
     project_dict = project_create.dict()
     project_obj = Project(**project_dict)
-    await db.projects.insert_one(project_obj.dict())
+    await storage.projects.insert_one(project_obj.dict())
+    announce("projects", "create", project_obj.dict())
     return project_obj
 
 @api_router.put("/projects/{project_id}", response_model=Project)
 async def update_project(project_id: str, project_update: ProjectUpdate):
-    existing_project = await db.projects.find_one({"id": project_id})
-    if not existing_project:
-        raise HTTPException(status_code=404, detail="Project not found")
-    
-    update_data = project_update.dict(exclude_unset=True)
-    update_data["updatedAt"] = datetime.utcnow()
-    
-    await db.projects.update_one(
-        {"id": project_id},
-        {"$set": update_data}
-    )
-    
-    updated_project = await db.projects.find_one({"id": project_id})
+    updated_project = await update_document("projects", {"id": project_id}, project_update, "Project not found")
+    announce("projects", "update", updated_project)
     return Project(**updated_project)
 
 @api_router.delete("/projects/{project_id}")
 async def delete_project(project_id: str):
-    result = await db.projects.delete_one({"id": project_id})
-    if result.deleted_count == 0:
+    deleted = await storage.projects.delete_one({"id": project_id})
+    if not deleted:
         raise HTTPException(status_code=404, detail="Project not found")
+    await record_deletions("projects", [project_id])
+    announce("projects", "delete", {"id": project_id})
     return {"message": "Project deleted successfully"}
 
 # Skill Endpoints
 @api_router.get("/skills", response_model=List[Skill])
-async def get_skills():
-    skills = await db.skills.find().sort("order", 1).to_list(1000)
-    return [Skill(**skill) for skill in skills]
+async def get_skills(request: Request, response: Response, fields: Optional[str] = None):
+    selected = parse_fields(Skill, fields)
+    projection = storage_fields(selected, storage.skills.order)
+    skills = await read_snapshot(("skills", projection), lambda: storage.skills.find_all(fields=projection), response)
+    not_modified = conditional_response(request, response, skills, fieldset_tag(selected), dated=False)
+    if not_modified:
+        return not_modified
+    return precompressed(request, response, lambda: render_documents(Skill, skills, selected))
 
 @api_router.post("/skills", response_model=Skill)
 async def create_skill(skill_create: SkillCreate):
     skill_dict = skill_create.dict()
     skill_obj = Skill(**skill_dict)
-    await db.skills.insert_one(skill_obj.dict())
+    await storage.skills.insert_one(skill_obj.dict())
+    announce("skills", "create", skill_obj.dict())
     return skill_obj
 
+@api_router.post("/skills/bulk", response_model=BulkResult)
+async def bulk_skills(bulk_request: BulkRequest):
+    result = await run_bulk(storage.skills, bulk_request.operations, SkillCreate, SkillUpdate, Skill)
+    await record_deletions("skills", bulk_deletions(result))
+    await announce_bulk("skills", result)
+    return result
+
+@api_router.post("/skills/reorder", response_model=BulkResult)
+async def reorder_skills(reorder_request: ReorderRequest):
+    result = await run_bulk(storage.skills, reorder_operations(reorder_request.items), SkillCreate, SkillUpdate, Skill)
+    await announce_bulk("skills", result)
+    return result
+
 @api_router.put("/skills/{skill_id}", response_model=Skill)
 async def update_skill(skill_id: str, skill_update: SkillUpdate):
-    existing_skill = await db.skills.find_one({"id": skill_id})
-    if not existing_skill:
-        raise HTTPException(status_code=404, detail="Skill not found")
-    
-    update_data = skill_update.dict(exclude_unset=True)
-    update_data["updatedAt"] = datetime.utcnow()
-    
-    await db.skills.update_one(
-        {"id": skill_id},
-        {"$set": update_data}
-    )
-    
-    updated_skill = await db.skills.find_one({"id": skill_id})
+    updated_skill = await update_document("skills", {"id": skill_id}, skill_update, "Skill not found")
+    announce("skills", "update", updated_skill)
     return Skill(**updated_skill)
 
 @api_router.delete("/skills/{skill_id}")
 async def delete_skill(skill_id: str):
-    result = await db.skills.delete_one({"id": skill_id})
-    if result.deleted_count == 0:
+    deleted = await storage.skills.delete_one({"id": skill_id})
+    if not deleted:
         raise HTTPException(status_code=404, detail="Skill not found")
+    await record_deletions("skills", [skill_id])
+    announce("skills", "delete", {"id": skill_id})
     return {"message": "Skill deleted successfully"}
 
 # About Endpoints
 @api_router.get("/about", response_model=About)
-async def get_about():
-    about = await db.about.find_one()
+async def get_about(request: Request, response: Response):
+    about = await find_singleton("about", response)
     if not about:
         raise HTTPException(status_code=404, detail="About information not found")
-    return About(**about)
+    not_modified = conditional_response(request, response, [about])
+    if not_modified:
+        return not_modified
+    return precompressed(request, response, lambda: render_document(About, about))
 
 @api_router.put("/about", response_model=About)
 async def update_about(about_update: AboutUpdate):
-    existing_about = await db.about.find_one()
-    if not existing_about:
-        raise HTTPException(status_code=404, detail="About information not found")
-    
-    update_data = about_update.dict(exclude_unset=True)
-    update_data["updatedAt"] = datetime.utcnow()
-    
-    await db.about.update_one(
-        {"id": existing_about["id"]},
-        {"$set": update_data}
-    )
-    
-    updated_about = await db.about.find_one({"id": existing_about["id"]})
+    updated_about = await update_document("about", {}, about_update, "About information not found")
+    announce("about", "update", updated_about)
     return About(**updated_about)
 
 # Contact Endpoints
-@api_router.post("/contact", response_model=Contact)
-async def create_contact(contact_create: ContactCreate):
-    contact_dict = contact_create.dict()
-    contact_obj = Contact(**contact_dict)
-    await db.contacts.insert_one(contact_obj.dict())
+async def submit_contact(contact_create: ContactCreate) -> Contact:
+    """Queue a new contact, or return the one an identical recent submission created."""
+    contact_obj = Contact(**contact_create.dict())
+    fingerprint = contact_fingerprint(contact_obj.email, contact_obj.subject, contact_obj.message)
+    original = await contact_fingerprints.claim(fingerprint, {"contact": contact_obj.model_dump_json()})
+    if original is not None:
+        return Contact.model_validate_json(original["contact"])
+    try:
+        await contact_ingest.submit(contact_obj.dict())
+    except Exception as e:
+        await contact_fingerprints.release(fingerprint)
+        if isinstance(e, IngestOverloaded):
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+        raise
     return contact_obj
 
-@api_router.get("/contact", response_model=List[Contact])
-async def get_contacts():
-    contacts = await db.contacts.find().sort("createdAt", -1).to_list(1000)
-    return [Contact(**contact) for contact in contacts]
+@api_router.post("/contact", response_model=Contact)
+async def create_contact(contact_create: ContactCreate, response: Response,
+                         idempotency_key: Optional[str] = Header(None, min_length=1, max_length=255)):
+    if idempotency_key is None:
+        return await submit_contact(contact_create)
 
-@api_router.put("/contact/{contact_id}", response_model=Contact)
-async def update_contact_status(contact_id: str, contact_update: ContactUpdate):
-    existing_contact = await db.contacts.find_one({"id": contact_id})
-    if not existing_contact:
-        raise HTTPException(status_code=404, detail="Contact not found")
+    request_hash = request_fingerprint(contact_create.dict())
+    earlier = await idempotency_keys.claim(idempotency_key, {"request": request_hash, "contact": None},
+                                           IDEMPOTENCY_PENDING_TTL)
+    if earlier is not None:
+        if earlier["request"] != request_hash:
+            raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+        if earlier["contact"] is None:
+            raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is in progress",
+                                headers={"Retry-After": "1"})
+        response.headers["Idempotent-Replayed"] = "true"
+        return Contact.model_validate_json(earlier["contact"])
+
+    try:
+        contact = await submit_contact(contact_create)
+    except Exception:
+        await idempotency_keys.release(idempotency_key)
+        raise
+    await idempotency_keys.update(idempotency_key, {"contact": contact.model_dump_json()})
+    return contact
+
+@api_router.get("/contact", response_model=List[Contact])
+async def get_contacts(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    stream: bool = False,
+    fields: Optional[str] = None,
+):
+    query = {}
     
-    update_data = contact_update.dict(exclude_unset=True)
-    update_data["updatedAt"] = datetime.utcnow()
+    after = decode_cursor(cursor, storage.contacts.order) if cursor else None
+    selected = parse_fields(Contact, fields)
+    projection = storage_fields(selected, storage.contacts.order)
     
-    await db.contacts.update_one(
-        {"id": contact_id},
-        {"$set": update_data}
-    )
+    if stream:
+        rows = storage.contacts.find(query, after, limit, projection)
+        return StreamingResponse(ndjson_rows(rows, Contact, selected), media_type="application/x-ndjson")
     
-    updated_contact = await db.contacts.find_one({"id": contact_id})
+    page_size = limit or MAX_PAGE_SIZE
+    rows = await storage.contacts.find_all(query, after, page_size + 1, projection)
+    contacts, next_cursor = split_page(rows, page_size, storage.contacts.order)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return json_response(render_documents(Contact, contacts, selected), response)
+
+async def build_contact_stats(days: int, weeks: int) -> dict:
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    day_starts = [today - timedelta(days=offset) for offset in range(days - 1, -1, -1)]
+    this_week = today - timedelta(days=today.weekday())
+    week_starts = [this_week - timedelta(weeks=offset) for offset in range(weeks - 1, -1, -1)]
+    statuses, periods = await asyncio.gather(
+        storage.contacts.facet_counts(["status"]),
+        storage.contacts.period_counts("createdAt", {
+            "days": (DAY_FORMAT, day_starts[0]),
+            "weeks": (WEEK_FORMAT, week_starts[0]),
+        }),
+    )
+    # Kept as a plain document, like the other snapshots, so it can be persisted
+    return ContactStats.from_counts(statuses["status"], periods["days"], periods["weeks"], day_starts, week_starts).model_dump()
+
+@api_router.get("/contact/stats", response_model=ContactStats)
+async def get_contact_stats(
+    response: Response,
+    days: int = Query(30, ge=1, le=366),
+    weeks: int = Query(12, ge=1, le=104),
+):
+    """Submission counts by status and per UTC day and ISO week, oldest first; counted by the database."""
+    return await read_snapshot(("contacts", "stats", days, weeks), lambda: build_contact_stats(days, weeks), response)
+
+@api_router.put("/contact/{contact_id}", response_model=Contact)
+async def update_contact_status(contact_id: str, contact_update: ContactUpdate):
+    updated_contact = await update_document("contacts", {"id": contact_id}, contact_update, "Contact not found")
+    announce("contacts", "update", updated_contact)
     return Contact(**updated_contact)
 
 # Settings Endpoints
 @api_router.get("/settings", response_model=Settings)
-async def get_settings():
-    settings = await db.settings.find_one()
+async def get_settings(request: Request, response: Response):
+    settings = await find_singleton("settings", response)
     if not settings:
         raise HTTPException(status_code=404, detail="Settings not found")
-    return Settings(**settings)
+    not_modified = conditional_response(request, response, [settings])
+    if not_modified:
+        return not_modified
+    return precompressed(request, response, lambda: render_document(Settings, settings))
 
 @api_router.put("/settings", response_model=Settings)
 async def update_settings(settings_update: SettingsUpdate):
-    existing_settings = await db.settings.find_one()
-    if not existing_settings:
-        raise HTTPException(status_code=404, detail="Settings not found")
-    
-    update_data = settings_update.dict(exclude_unset=True)
-    update_data["updatedAt"] = datetime.utcnow()
-    
-    await db.settings.update_one(
-        {"id": existing_settings["id"]},
-        {"$set": update_data}
-    )
-    
-    updated_settings = await db.settings.find_one({"id": existing_settings["id"]})
+    updated_settings = await update_document("settings", {}, settings_update, "Settings not found")
+    announce("settings", "update", updated_settings)
     return Settings(**updated_settings)
 
+# Bootstrap Endpoint: the whole public portfolio in one round trip
+BOOTSTRAP_DELETIONS = {"collection": {"$in": ["projects", "skills"]}}
+
+async def build_bootstrap():
+    profile, settings, about, projects, skills, deleted = await asyncio.gather(
+        find_singleton("profiles"),
+        find_singleton("settings"),
+        find_singleton("about"),
+        storage.projects.find_all(),
+        storage.skills.find_all(),
+        storage.tombstones.find_all(BOOTSTRAP_DELETIONS, fields=["deletedAt"]),
+    )
+    if not profile or not settings or not about:
+        raise HTTPException(status_code=404, detail="Portfolio not found")
+
+    bootstrap = Bootstrap.from_documents(profile, settings, about, projects, skills)
+    # A deleted project or skill leaves no updatedAt behind, only its tombstone
+    modified = last_modified([profile, settings, about, *projects, *skills], deleted)
+    return f'"{bootstrap.version}"', modified, CompressedBody(bootstrap.model_dump_json().encode())
+
+@api_router.get("/bootstrap", response_model=Bootstrap)
+async def get_bootstrap(request: Request):
+    snapshot = await snapshots.read(("bootstrap",), build_bootstrap)
+    etag, modified, body = snapshot.value
+    headers = {**validator_headers(etag, modified), **snapshot.headers()}
+    if is_not_modified(request, etag, modified):
+        return Response(status_code=304, headers=headers)
+    return body.response(request.headers.get("accept-encoding"), headers)
+
+# Changes Endpoint: what changed since a client's last sync
+# Writes stamp updatedAt just before they are stored, so each delta re-sends a short overlap
+# rather than miss a write that landed after a previous `until`. Clients all sync right after
+# the same change event, so `since` is rounded down to a CHANGES_OVERLAP step: their requests
+# share one snapshot, loaded once per step until the next write invalidates it
+CHANGES_OVERLAP = timedelta(seconds=5)
+
+async def load_changes(since: Optional[datetime]) -> dict:
+    until = datetime.utcnow()
+    full = since is None or since < until - timedelta(days=TOMBSTONE_RETENTION_DAYS)
+
+    changed = {} if full else {"updatedAt": {"$gt": since - CHANGES_OVERLAP}}
+    deleted_after = until if full else since - CHANGES_OVERLAP
+    profile, settings, about, projects, skills, deleted = await asyncio.gather(
+        storage.profiles.find_one(changed),
+        storage.settings.find_one(changed),
+        storage.about.find_one(changed),
+        storage.projects.find_all(changed),
+        storage.skills.find_all(changed),
+        storage.tombstones.find_all({"deletedAt": {"$gt": deleted_after}}),
+    )
+    # A document recreated after its deletion is reported as an upsert only
+    current = {document["id"] for document in projects + skills}
+    return {
+        "since": since,
+        "until": until,
+        "full": full,
+        "profile": profile,
+        "settings": settings,
+        "about": about,
+        "projects": projects,
+        "skills": skills,
+        "deleted": [tombstone for tombstone in deleted if tombstone["id"] not in current],
+    }
+
+@api_router.get("/changes", response_model=ChangeSet)
+async def get_changes(response: Response, since: Optional[datetime] = None):
+    if since is not None:
+        if since.tzinfo is not None:
+            since = since.astimezone(timezone.utc).replace(tzinfo=None)
+        since -= (since - datetime.min) % CHANGES_OVERLAP
+    return await read_snapshot(("changes", since), lambda: load_changes(since), response)
+
+# Events Endpoint: Server-Sent Events with a compact record of each committed write
+@api_router.get("/events")
+async def get_events(request: Request):
+    if events.full:
+        raise HTTPException(status_code=503, detail="Too many event subscribers", headers={"Retry-After": "30"})
+    return StreamingResponse(
+        events.stream(request.headers.get("last-event-id")),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@api_router.get("/events/stats")
+async def get_event_stats():
+    return events.stats()
+
+# Search Endpoints
+@api_router.get("/search", response_model=List[SearchHit])
+async def search(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    collection: Optional[str] = Query(None, pattern="^(projects|contacts)$"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+):
+    after = tuple(decode_cursor(cursor, SEARCH_ORDER)) if cursor else None
+    hits = search_index.search(q, [collection] if collection else None, limit + 1, after)
+    page, next_cursor = split_page(hits, limit, SEARCH_ORDER)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return json_response(render_documents(SearchHit, page), response)
+
+# Limits Endpoints
+@api_router.get("/limits/stats")
+async def get_limit_stats():
+    return {
+        "rateLimit": rate_limiter.stats() if rate_limiter else {"store": "off"},
+        "admission": admission.stats(),
+    }
+
+# Cache Endpoints
+@api_router.get("/cache/stats")
+async def get_cache_stats():
+    return {
+        "snapshots": snapshots.stats(),
+        "bodies": body_cache.stats(),
+        "coalescing": read_flights.stats(),
+        "changes": change_watcher.stats() if change_watcher else {"mode": "off"},
+        "contactIngest": contact_ingest.stats(),
+        "search": search_index.stats(),
+    }
+
 # Legacy endpoint for backward compatibility
 @api_router.get("/")
 async def root():
@@ -261,12 +680,17 @@ async def root():
 # Include the router in the main app
 app.include_router(api_router)
 
+app.add_middleware(CompressionMiddleware)
+
+app.add_middleware(LoadSheddingMiddleware, limiter=rate_limiter, admission=admission)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Last-Modified", "X-Next-Cursor", "Age", "Warning", "Retry-After", "Idempotent-Replayed"],
 )
 
 # Configure logging
@@ -277,5 +701,10 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 @app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+async def shutdown_storage():
+    if change_task is not None:
+        change_task.cancel()
+    admission.stop()
+    await contact_ingest.close()
+    await snapshots.flush()
+    storage.close()
\ No newline at end of file
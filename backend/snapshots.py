@@ -0,0 +1,229 @@
+import asyncio
+import base64
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from cache import SingleFlight
+from compression import CompressedBody
+
+logger = logging.getLogger(__name__)
+
+Key = Tuple[Hashable, ...]
+
+
+class Snapshot:
+    """Last known good value of a read, with the wall-clock time it was loaded."""
+
+    __slots__ = ("value", "stored_at", "expired", "warning")
+
+    def __init__(self, value: Any, stored_at: float, expired: bool = False, warning: Optional[str] = None):
+        self.value = value
+        self.stored_at = stored_at
+        self.expired = expired
+        self.warning = warning
+
+    def age(self) -> int:
+        return max(0, int(time.time() - self.stored_at))
+
+    def served(self, warning: str) -> "Snapshot":
+        return Snapshot(self.value, self.stored_at, self.expired, warning)
+
+    def headers(self) -> Dict[str, str]:
+        if self.warning is None:
+            return {}
+        return {"Age": str(self.age()), "Warning": self.warning}
+
+
+# Persisted snapshots are plain JSON, so a tampered file can at worst serve wrong data. Values
+# are documents and encoded bodies; the types JSON lacks are written as single-key tagged objects
+def _encode(value: Any) -> Any:
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, datetime):
+        return {"$date": value.isoformat()}
+    if isinstance(value, CompressedBody):
+        return {"$body": base64.b64encode(value.raw).decode()}
+    if isinstance(value, tuple):
+        return {"$tuple": [_encode(item) for item in value]}
+    if isinstance(value, list):
+        return [_encode(item) for item in value]
+    if isinstance(value, dict) and all(isinstance(name, str) for name in value):
+        return {name: _encode(item) for name, item in value.items()}
+    raise TypeError(f"Cannot persist a {type(value).__name__}")
+
+
+def _decode(value: Dict[str, Any]) -> Any:
+    if len(value) == 1:
+        name, item = next(iter(value.items()))
+        if name == "$date":
+            return datetime.fromisoformat(item)
+        if name == "$body":
+            return CompressedBody(base64.b64decode(item))
+        if name == "$tuple":
+            return tuple(item)
+    return value
+
+
+STALE = '110 - "Response is Stale"'
+REVALIDATION_FAILED = '111 - "Revalidation Failed"'
+
+
+class SnapshotCache:
+    """Read-through cache of public reads that prefers a stale answer over a slow or failed one.
+
+    Within `soft_ttl` a snapshot is served as is. Past it, the snapshot is served immediately
+    and refreshed in the background, until it is `max_stale` old; from then on, and after
+    `invalidate`, readers wait for a fresh load. If a load fails and a snapshot exists it is
+    served with a `Warning` header instead of the error. Snapshots are optionally persisted
+    to `path` so a restarted worker can answer while the database is unreachable.
+    """
+
+    def __init__(self, flights: SingleFlight, soft_ttl: float = 30.0, max_stale: float = 300.0,
+                 max_entries: int = 1024, path: Optional[str] = None):
+        self.flights = flights
+        self.soft_ttl = soft_ttl
+        self.max_stale = max_stale
+        self.max_entries = max_entries
+        self.path = Path(path) if path else None
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.errors = 0
+        self._entries: Dict[Key, Snapshot] = {}
+        self._generations: Dict[Hashable, int] = {}
+        self._refreshing: Dict[Key, asyncio.Task] = {}
+        self._saving: Optional[asyncio.Task] = None
+        self._dirty = False
+
+    async def read(self, key: Key, load: Callable[[], Awaitable[Any]]) -> Snapshot:
+        snapshot = self._entries.get(key)
+        if snapshot is not None and not snapshot.expired:
+            age = time.time() - snapshot.stored_at
+            if age < self.soft_ttl:
+                self.hits += 1
+                return snapshot
+            if age < self.max_stale:
+                self.stale += 1
+                self._refresh_in_background(key, load)
+                return snapshot.served(STALE)
+
+        self.misses += 1
+        try:
+            return await self._load(key, load)
+        except HTTPException:
+            raise
+        except Exception as e:
+            if snapshot is None:
+                raise
+            self.errors += 1
+            logger.warning("Serving snapshot of %s after a failed read: %s", key, e)
+            return snapshot.served(REVALIDATION_FAILED)
+
+    async def _load(self, key: Key, load: Callable[[], Awaitable[Any]]) -> Snapshot:
+        generation = self._generations.get(key[0], 0)
+        value = await self.flights.do(key, load)
+        snapshot = Snapshot(value, time.time())
+        # A load that overlapped an invalidation may predate the write; answer with it, don't keep it
+        if value is not None and self._generations.get(key[0], 0) == generation:
+            self._store(key, snapshot)
+        return snapshot
+
+    def _store(self, key: Key, snapshot: Snapshot) -> None:
+        self._entries.pop(key, None)
+        self._entries[key] = snapshot
+        if len(self._entries) > self.max_entries:
+            del self._entries[next(iter(self._entries))]
+        self._schedule_save()
+
+    def _refresh_in_background(self, key: Key, load: Callable[[], Awaitable[Any]]) -> None:
+        if key in self._refreshing:
+            return
+
+        async def refresh():
+            try:
+                await self._load(key, load)
+            except Exception as e:
+                self.errors += 1
+                logger.warning("Background refresh of %s failed, keeping the snapshot: %s", key, e)
+            finally:
+                if self._refreshing.get(key) is asyncio.current_task():
+                    del self._refreshing[key]
+
+        self._refreshing[key] = asyncio.create_task(refresh())
+
+    def invalidate(self, *names: Hashable) -> None:
+        """Force the next read of `names` to reload; the snapshots stay as a fallback."""
+        for name in names:
+            self._generations[name] = self._generations.get(name, 0) + 1
+        for key, snapshot in self._entries.items():
+            if key[0] in names:
+                snapshot.expired = True
+        for key in [key for key in self._refreshing if key[0] in names]:
+            self._refreshing.pop(key).cancel()
+        self.flights.forget(*names)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.stale + self.misses
+        return {
+            "softTtl": self.soft_ttl,
+            "maxStale": self.max_stale,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "stale": self.stale,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hitRatio": round((self.hits + self.stale) / total, 4) if total else 0.0,
+        }
+
+    # Persistence
+    def load(self) -> None:
+        """Restore persisted snapshots; they only serve as a fallback until reloaded."""
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            entries = json.loads(self.path.read_bytes(), object_hook=_decode)
+            restored = {tuple(key): Snapshot(value, float(stored_at), expired=True) for key, value, stored_at in entries}
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning("Could not read snapshots from %s: %s", self.path, e)
+            return
+        self._entries.update(restored)
+        logger.info("Restored %d snapshots from %s", len(entries), self.path)
+
+    def _schedule_save(self) -> None:
+        self._dirty = True
+        if self.path is None or (self._saving is not None and not self._saving.done()):
+            return
+        self._saving = asyncio.create_task(self.save())
+
+    async def save(self) -> None:
+        """Write the snapshots to `path`, again if they changed while writing."""
+        while self.path is not None and self._dirty:
+            self._dirty = False
+            entries = []
+            for key, snapshot in list(self._entries.items()):
+                try:
+                    entries.append([_encode(key), _encode(snapshot.value), snapshot.stored_at])
+                except TypeError as e:
+                    logger.warning("Not persisting snapshot %s: %s", key, e)
+            try:
+                await asyncio.to_thread(self._write, entries)
+            except OSError as e:
+                logger.warning("Could not persist snapshots to %s: %s", self.path, e)
+                return
+
+    async def flush(self) -> None:
+        if self._saving is not None:
+            await self._saving
+        await self.save()
+
+    def _write(self, entries: List[List[Any]]) -> None:
+        temporary = self.path.with_suffix(self.path.suffix + ".tmp")
+        temporary.write_text(json.dumps(entries, separators=(",", ":")))
+        os.replace(temporary, self.path)
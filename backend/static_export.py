@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Static Snapshot Export of the Public Portfolio
+Renders every public read endpoint to JSON files that are byte-identical to the API responses,
+with brotli/gzip siblings and a manifest of content hashes, and serves them without a database.
+
+    python static_export.py export --out ../static              # STORAGE_BACKEND/MONGO_URL as for the server
+    python static_export.py serve --dir ../static --port 8002   # zero database access
+
+Layout: /api/profile is written to api/profile.json (plus .json.br and .json.gz), /api/projects/{id}
+to api/projects/{id}.json, and so on, so a plain static file server can answer the read path with
+`try_files $uri.json` and precompressed-file support (e.g. nginx gzip_static/brotli_static).
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from fastapi import FastAPI, HTTPException, Request, Response
+from starlette.middleware.cors import CORSMiddleware
+
+from compression import ENCODINGS, MINIMUM_SIZE, compress, negotiate
+from conditional import entity_tag, etag_for_encoding, is_not_modified, last_modified, validator_headers
+from fieldsets import render_document, render_documents
+from models import About, Bootstrap, Profile, Project, Settings, Skill
+from seed_data import seed_database
+from storage import MemoryStorage, Storage, create_storage
+
+ROOT_DIR = Path(__file__).parent
+MANIFEST = "manifest.json"
+EXTENSIONS = {"br": ".br", "gzip": ".gz"}
+
+
+def write_resource(out_dir: Path, route: str, body: bytes, documents: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Write one endpoint's body and its compressed siblings, returning its manifest entry."""
+    path = out_dir / (route.lstrip("/") + ".json")
+    # Routes embed document ids; never let one write outside the export directory
+    if not path.resolve().is_relative_to(out_dir.resolve()):
+        raise ValueError(f"{route}: resolves outside {out_dir}")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(body)
+
+    etag = entity_tag(documents)
+    modified = last_modified(documents)
+    entry = {
+        "file": path.relative_to(out_dir).as_posix(),
+        "size": len(body),
+        "sha256": hashlib.sha256(body).hexdigest(),
+        "headers": validator_headers(etag, modified),
+        "encodings": {},
+    }
+    # Like the API, bodies below the compression threshold are only served uncompressed
+    for encoding in ENCODINGS if len(body) >= MINIMUM_SIZE else ():
+        compressed = compress(body, encoding, "maximum")
+        compressed_path = path.with_name(path.name + EXTENSIONS[encoding])
+        compressed_path.write_bytes(compressed)
+        entry["encodings"][encoding] = {
+            "file": compressed_path.relative_to(out_dir).as_posix(),
+            "size": len(compressed),
+            "sha256": hashlib.sha256(compressed).hexdigest(),
+        }
+    return entry
+
+
+async def export_site(storage: Storage, out_dir: Path) -> Dict[str, Any]:
+    profile, settings, about, projects, skills, deleted = await asyncio.gather(
+        storage.profiles.find_one(),
+        storage.settings.find_one(),
+        storage.about.find_one(),
+        storage.projects.find_all(),
+        storage.skills.find_all(),
+        storage.tombstones.find_all({"collection": {"$in": ["projects", "skills"]}}, fields=["deletedAt"]),
+    )
+    if not profile or not settings or not about:
+        raise RuntimeError("Portfolio not found: profile, settings and about are required")
+
+    bootstrap = Bootstrap.from_documents(profile, settings, about, projects, skills)
+    resources: List[Tuple[str, bytes, List[Dict[str, Any]]]] = [
+        ("/api/profile", render_document(Profile, profile), [profile]),
+        ("/api/settings", render_document(Settings, settings), [settings]),
+        ("/api/about", render_document(About, about), [about]),
+        ("/api/projects", render_documents(Project, projects), projects),
+        ("/api/skills", render_documents(Skill, skills), skills),
+        ("/api/bootstrap", bootstrap.model_dump_json().encode(), [profile, settings, about, *projects, *skills]),
+    ]
+    resources += [(f"/api/projects/{project['id']}", render_document(Project, project), [project]) for project in projects]
+
+    files = {}
+    for route, body, documents in resources:
+        files[route] = write_resource(out_dir, route, body, documents)
+    # As served by the API: lists carry no Last-Modified, the bootstrap ETag is its version
+    # and its Last-Modified includes deletions
+    for route in ("/api/projects", "/api/skills"):
+        files[route]["headers"].pop("Last-Modified", None)
+    files["/api/bootstrap"]["headers"] = validator_headers(f'"{bootstrap.version}"', last_modified(
+        [profile, settings, about, *projects, *skills], deleted))
+
+    manifest = {"generatedAt": datetime.utcnow().isoformat(), "version": bootstrap.version, "files": files}
+    (out_dir / MANIFEST).write_text(json.dumps(manifest, indent=2))
+    return manifest
+
+
+class StaticResource:
+    __slots__ = ("headers", "modified", "bodies")
+
+    def __init__(self, headers: Dict[str, str], bodies: Dict[Optional[str], bytes]):
+        self.headers = headers
+        self.modified = parsedate_to_datetime(headers["Last-Modified"]) if "Last-Modified" in headers else None
+        self.bodies = bodies
+
+
+def load_site(directory: Path) -> Dict[str, StaticResource]:
+    """Load an export into memory, verifying every file against the manifest."""
+    manifest = json.loads((directory / MANIFEST).read_text())
+    site = {}
+    for route, entry in manifest["files"].items():
+        bodies = {None: (directory / entry["file"]).read_bytes()}
+        for encoding, variant in entry["encodings"].items():
+            if encoding in ENCODINGS:
+                bodies[encoding] = (directory / variant["file"]).read_bytes()
+        for encoding, body in bodies.items():
+            expected = entry["encodings"][encoding]["sha256"] if encoding else entry["sha256"]
+            if hashlib.sha256(body).hexdigest() != expected:
+                raise ValueError(f"{route}: {encoding or 'identity'} body does not match the manifest")
+        site[route] = StaticResource(entry["headers"], bodies)
+    return site
+
+
+def create_static_app(directory: Path) -> FastAPI:
+    """An app answering the public read endpoints from an export, without touching storage."""
+    site = load_site(directory)
+    app = FastAPI()
+
+    @app.get("/{path:path}")
+    async def serve(path: str, request: Request):
+        resource = site.get("/" + path.rstrip("/"))
+        if resource is None:
+            raise HTTPException(status_code=404, detail="Not Found")
+        encoding = negotiate(request.headers.get("accept-encoding"))
+        if encoding not in resource.bodies:
+            encoding = None
+
+        headers = dict(resource.headers, Vary="Accept-Encoding")
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+            headers["ETag"] = etag_for_encoding(headers["ETag"], encoding)
+        if is_not_modified(request, resource.headers["ETag"], resource.modified):
+            headers.pop("Content-Encoding", None)
+            return Response(status_code=304, headers=headers)
+        return Response(content=resource.bodies[encoding], media_type="application/json", headers=headers)
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_methods=["GET"],
+        allow_headers=["*"],
+        expose_headers=["ETag", "Last-Modified"],
+    )
+    return app
+
+
+async def export(args) -> Dict[str, Any]:
+    storage = create_storage()
+    try:
+        if isinstance(storage, MemoryStorage):
+            await seed_database(storage, args.fixture)
+        return await export_site(storage, Path(args.out))
+    finally:
+        storage.close()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Export the public portfolio as static files, or serve an export")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_parser = commands.add_parser("export", help="Render the public endpoints to a directory")
+    export_parser.add_argument("--out", default="static", help="Output directory")
+    export_parser.add_argument("--fixture", help="Seed fixture for STORAGE_BACKEND=memory (default: built-in seed data)")
+    serve_parser = commands.add_parser("serve", help="Serve an export without database access")
+    serve_parser.add_argument("--dir", default="static", help="Directory written by `export`")
+    serve_parser.add_argument("--host", default="0.0.0.0")
+    serve_parser.add_argument("--port", type=int, default=8002)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    load_dotenv(ROOT_DIR / '.env')
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    args = parse_args()
+    if args.command == "export":
+        manifest = asyncio.run(export(args))
+        print(f"📦 Exported {len(manifest['files'])} endpoints (version {manifest['version']}) to {args.out}")
+    else:
+        import uvicorn
+
+        uvicorn.run(create_static_app(Path(args.dir)), host=args.host, port=args.port)
@@ -0,0 +1,527 @@
+import asyncio
+import bisect
+import logging
+import os
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import DeleteOne, InsertOne, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from indexes import ensure_indexes, ttl_fields
+
+logger = logging.getLogger(__name__)
+
+Order = Sequence[Tuple[str, int]]
+
+# Listing order per collection; the trailing `id` makes every position unique.
+# Singletons have no order and keep insertion order.
+PROJECT_ORDER: Order = (("order", 1), ("id", 1))
+SKILL_ORDER: Order = (("order", 1), ("id", 1))
+CONTACT_ORDER: Order = (("createdAt", -1), ("id", -1))
+TOMBSTONE_ORDER: Order = (("deletedAt", 1), ("id", 1))
+
+COLLECTIONS: Dict[str, Order] = {
+    "profiles": (),
+    "projects": PROJECT_ORDER,
+    "skills": SKILL_ORDER,
+    "about": (),
+    "contacts": CONTACT_ORDER,
+    "settings": (),
+    "tombstones": TOMBSTONE_ORDER,
+    "idempotency_keys": (),
+    "contact_fingerprints": (),
+}
+
+# Bulk operations: ("insert", document), ("update", id, fields) or ("delete", id)
+BulkWrite = Tuple[Any, ...]
+
+
+class DuplicateDocument(Exception):
+    pass
+
+
+class Repository(ABC):
+    """Storage for one collection.
+
+    Queries use the MongoDB filter syntax restricted to equality (including array
+    membership), `$in`, `$nin`, `$ne`, `$gt`, `$gte`, `$lt`, `$lte`, `$all`, `$exists`
+    and `$or`, so the same filters work on every backend. Returned documents must be
+    treated as read-only.
+    """
+
+    def __init__(self, name: str, order: Order):
+        self.name = name
+        self.order = order
+
+    @abstractmethod
+    async def find_one(self, query: Optional[Dict[str, Any]] = None,
+                       fields: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def find(self, query: Optional[Dict[str, Any]] = None, after: Optional[List[Any]] = None,
+             limit: Optional[int] = None, fields: Optional[Sequence[str]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Iterate matching documents in collection order, optionally strictly after the `after` sort key.
+
+        `fields` limits the returned documents to those keys.
+        """
+        raise NotImplementedError
+
+    async def find_all(self, query: Optional[Dict[str, Any]] = None, after: Optional[List[Any]] = None,
+                       limit: Optional[int] = None, fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        return [document async for document in self.find(query, after, limit, fields)]
+
+    @abstractmethod
+    async def count(self, query: Optional[Dict[str, Any]] = None) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def existing_ids(self, ids: Iterable[str]) -> Set[str]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def high_water_mark(self) -> Tuple[int, Optional[datetime]]:
+        """Document count and latest `updatedAt`; any write to the collection changes one of them."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def facet_counts(self, fields: Sequence[str]) -> Dict[str, Dict[Any, int]]:
+        """Number of documents per distinct value of each field; array fields count each element."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def period_counts(self, field: str, periods: Dict[str, Tuple[str, datetime]]) -> Dict[str, Dict[str, int]]:
+        """Number of documents per calendar period of the datetime `field`.
+
+        `periods` maps a name to a format (the strftime subset MongoDB's $dateToString
+        shares, e.g. "%Y-%m-%d" or ISO weeks as "%G-W%V") and the earliest time to count.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def insert_one(self, document: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def insert_many(self, documents: List[Dict[str, Any]]) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def update_one(self, query: Dict[str, Any], changes: Dict[str, Any],
+                         expected_version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Set `changes` on the first match, bump its version and return the updated document.
+
+        With `expected_version`, only a document still at that version is updated.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete_one(self, query: Dict[str, Any]) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def bulk_write(self, operations: List[BulkWrite]) -> Dict[int, str]:
+        """Apply operations unordered and return error messages keyed by operation index."""
+        raise NotImplementedError
+
+
+# MongoDB backend
+class MongoRepository(Repository):
+    def __init__(self, collection, order: Order):
+        super().__init__(collection.name, order)
+        self.collection = collection
+
+    def _keyset_query(self, query: Optional[Dict[str, Any]], after: Optional[List[Any]]) -> Dict[str, Any]:
+        query = dict(query or {})
+        if after is not None:
+            branches = []
+            for position, (key, direction) in enumerate(self.order):
+                branch = {self.order[i][0]: after[i] for i in range(position)}
+                branch[key] = {"$gt" if direction == 1 else "$lt": after[position]}
+                branches.append(branch)
+            query["$or"] = branches
+        return query
+
+    @staticmethod
+    def _projection(fields: Optional[Sequence[str]]) -> Dict[str, int]:
+        projection = {"_id": 0}
+        for name in fields or ():
+            projection[name] = 1
+        return projection
+
+    async def find_one(self, query=None, fields=None):
+        return await self.collection.find_one(query or {}, self._projection(fields))
+
+    async def find(self, query=None, after=None, limit=None, fields=None):
+        cursor = self.collection.find(self._keyset_query(query, after), self._projection(fields))
+        if self.order:
+            cursor = cursor.sort(list(self.order))
+        if limit:
+            cursor = cursor.limit(limit)
+        async for document in cursor:
+            yield document
+
+    async def count(self, query=None):
+        return await self.collection.count_documents(query or {})
+
+    async def existing_ids(self, ids):
+        ids = list(ids)
+        if not ids:
+            return set()
+        return {document["id"] async for document in self.collection.find({"id": {"$in": ids}}, {"_id": 0, "id": 1})}
+
+    async def high_water_mark(self):
+        latest = await self.collection.find_one({}, {"_id": 0, "updatedAt": 1}, sort=[("updatedAt", -1)])
+        return await self.collection.estimated_document_count(), (latest or {}).get("updatedAt")
+
+    async def facet_counts(self, fields):
+        # $unwind passes scalar values through as they are, so one stage shape serves both kinds
+        pipeline = [{"$facet": {
+            field: [{"$unwind": f"${field}"}, {"$group": {"_id": f"${field}", "count": {"$sum": 1}}}]
+            for field in fields
+        }}]
+        result = (await self.collection.aggregate(pipeline).to_list(1))[0]
+        return {field: {row["_id"]: row["count"] for row in result[field]} for field in fields}
+
+    async def period_counts(self, field, periods):
+        pipeline = [{"$facet": {
+            name: [
+                {"$match": {field: {"$gte": since}}},
+                {"$group": {"_id": {"$dateToString": {"format": format, "date": f"${field}"}}, "count": {"$sum": 1}}},
+            ]
+            for name, (format, since) in periods.items()
+        }}]
+        result = (await self.collection.aggregate(pipeline).to_list(1))[0]
+        return {name: {row["_id"]: row["count"] for row in result[name]} for name in periods}
+
+    async def insert_one(self, document):
+        try:
+            await self.collection.insert_one(dict(document))
+        except DuplicateKeyError as e:
+            raise DuplicateDocument(str(e))
+
+    async def insert_many(self, documents):
+        await self.collection.insert_many([dict(document) for document in documents], ordered=False)
+
+    async def update_one(self, query, changes, expected_version=None):
+        query = dict(query)
+        if expected_version is not None:
+            # Documents written before versioning have no field and count as version 0
+            query["version"] = {"$in": [0, None]} if expected_version == 0 else expected_version
+        return await self.collection.find_one_and_update(
+            query,
+            {"$set": changes, "$inc": {"version": 1}},
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def delete_one(self, query):
+        result = await self.collection.delete_one(query)
+        return result.deleted_count > 0
+
+    async def bulk_write(self, operations):
+        requests = []
+        for operation in operations:
+            if operation[0] == "insert":
+                requests.append(InsertOne(dict(operation[1])))
+            elif operation[0] == "update":
+                requests.append(UpdateOne({"id": operation[1]}, {"$set": operation[2], "$inc": {"version": 1}}))
+            else:
+                requests.append(DeleteOne({"id": operation[1]}))
+        if not requests:
+            return {}
+        try:
+            await self.collection.bulk_write(requests, ordered=False)
+        except BulkWriteError as e:
+            return {error["index"]: error.get("errmsg", "") for error in e.details.get("writeErrors", [])}
+        return {}
+
+
+# In-memory backend
+def _equals(value: Any, condition: Any) -> bool:
+    return value == condition or (isinstance(value, list) and condition in value)
+
+
+def _compare(value: Any, operand: Any, test) -> bool:
+    try:
+        return value is not None and test(value, operand)
+    except TypeError:
+        return False
+
+
+_OPERATORS = {
+    "$in": lambda value, operand: any(_equals(value, candidate) for candidate in operand),
+    "$nin": lambda value, operand: not any(_equals(value, candidate) for candidate in operand),
+    "$ne": lambda value, operand: not _equals(value, operand),
+    "$gt": lambda value, operand: _compare(value, operand, lambda a, b: a > b),
+    "$gte": lambda value, operand: _compare(value, operand, lambda a, b: a >= b),
+    "$lt": lambda value, operand: _compare(value, operand, lambda a, b: a < b),
+    "$lte": lambda value, operand: _compare(value, operand, lambda a, b: a <= b),
+    "$all": lambda value, operand: isinstance(value, list) and all(item in value for item in operand),
+    "$exists": lambda value, operand: (value is not None) == bool(operand),
+}
+
+
+def matches(document: Dict[str, Any], query: Optional[Dict[str, Any]]) -> bool:
+    for key, condition in (query or {}).items():
+        if key == "$or":
+            if not any(matches(document, branch) for branch in condition):
+                return False
+            continue
+        value = document.get(key)
+        if isinstance(condition, dict) and condition and all(op.startswith("$") for op in condition):
+            if not all(_OPERATORS[op](value, operand) for op, operand in condition.items()):
+                return False
+        elif not _equals(value, condition):
+            return False
+    return True
+
+
+class MemoryRepository(Repository):
+    """Dict-backed collection with a sorted index on the collection order.
+
+    Documents are replaced rather than mutated on update, so readers holding a
+    document keep a consistent snapshot without copying.
+    """
+
+    def __init__(self, name: str, order: Order):
+        super().__init__(name, order)
+        if order and (order[-1][0] != "id" or len({direction for _, direction in order}) > 1):
+            raise ValueError("Orders must share one direction and end with id")
+        self.descending = bool(order) and order[0][1] == -1
+        self._documents: Dict[str, Dict[str, Any]] = {}
+        self._index: List[Tuple[Any, ...]] = []  # ascending sort keys, ending with the id
+
+    def _sort_key(self, document: Dict[str, Any]) -> Tuple[Any, ...]:
+        return tuple(document.get(key) for key, _ in self.order)
+
+    def _ordered(self, after: Optional[List[Any]]) -> Iterator[Dict[str, Any]]:
+        if not self.order:
+            yield from list(self._documents.values())
+            return
+        # Slice a snapshot of the index so concurrent writes cannot disturb the iteration
+        if self.descending:
+            end = len(self._index) if after is None else bisect.bisect_left(self._index, tuple(after))
+            keys = reversed(self._index[:end])
+        else:
+            start = 0 if after is None else bisect.bisect_right(self._index, tuple(after))
+            keys = self._index[start:]
+        for key in keys:
+            document = self._documents.get(key[-1])
+            if document is not None:
+                yield document
+
+    def _check_sortable(self, document: Dict[str, Any]) -> None:
+        """Raise ValueError, before anything is changed, if `document` cannot be placed in the index."""
+        # Every key in the index has values of the same types, so one of them is enough to compare with
+        others = (key for key in self._index if key[-1] != document["id"])
+        reference = next(others, None) if self.order else None
+        if reference is None:
+            return
+        for (name, _), value, indexed in zip(self.order, self._sort_key(document), reference):
+            try:
+                value == indexed or value < indexed
+            except TypeError:
+                raise ValueError(f"{name} {value!r} cannot be ordered with the other {self.name}") from None
+
+    def _store(self, document: Dict[str, Any]) -> None:
+        self._documents[document["id"]] = document
+        if self.order:
+            bisect.insort(self._index, self._sort_key(document))
+
+    def _unstore(self, document: Dict[str, Any]) -> None:
+        del self._documents[document["id"]]
+        if self.order:
+            key = self._sort_key(document)
+            del self._index[bisect.bisect_left(self._index, key)]
+
+    def _first(self, query: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if query and set(query) == {"id"} and isinstance(query["id"], str):
+            return self._documents.get(query["id"])
+        return next((document for document in self._ordered(None) if matches(document, query)), None)
+
+    @staticmethod
+    def _project(document: Optional[Dict[str, Any]], fields: Optional[Sequence[str]]) -> Optional[Dict[str, Any]]:
+        if document is None or fields is None:
+            return document
+        return {name: document[name] for name in fields if name in document}
+
+    async def find_one(self, query=None, fields=None):
+        return self._project(self._first(query), fields)
+
+    async def find(self, query=None, after=None, limit=None, fields=None):
+        returned = 0
+        for document in self._ordered(after):
+            if limit and returned >= limit:
+                return
+            if matches(document, query):
+                returned += 1
+                yield self._project(document, fields)
+
+    async def count(self, query=None):
+        if not query:
+            return len(self._documents)
+        return sum(1 for document in self._documents.values() if matches(document, query))
+
+    async def existing_ids(self, ids):
+        return {document_id for document_id in ids if document_id in self._documents}
+
+    async def high_water_mark(self):
+        stamps = [document["updatedAt"] for document in self._documents.values() if document.get("updatedAt")]
+        return len(self._documents), max(stamps, default=None)
+
+    async def facet_counts(self, fields):
+        counts: Dict[str, Dict[Any, int]] = {field: {} for field in fields}
+        for document in self._documents.values():
+            for field in fields:
+                value = document.get(field)
+                for item in value if isinstance(value, list) else () if value is None else (value,):
+                    counts[field][item] = counts[field].get(item, 0) + 1
+        return counts
+
+    async def period_counts(self, field, periods):
+        counts: Dict[str, Dict[str, int]] = {name: {} for name in periods}
+        for document in self._documents.values():
+            value = document.get(field)
+            if not isinstance(value, datetime):
+                continue
+            for name, (format, since) in periods.items():
+                if value >= since:
+                    period = value.strftime(format)
+                    counts[name][period] = counts[name].get(period, 0) + 1
+        return counts
+
+    async def insert_one(self, document):
+        if document["id"] in self._documents:
+            raise DuplicateDocument(f"Duplicate id {document['id']} in {self.name}")
+        self._check_sortable(document)
+        self._store(dict(document))
+
+    async def insert_many(self, documents):
+        for document in documents:
+            await self.insert_one(document)
+
+    async def update_one(self, query, changes, expected_version=None):
+        current = self._first(query)
+        if current is None:
+            return None
+        if expected_version is not None and current.get("version", 0) != expected_version:
+            return None
+        updated = {**current, **changes, "version": current.get("version", 0) + 1}
+        self._check_sortable(updated)
+        self._unstore(current)
+        self._store(updated)
+        return updated
+
+    async def delete_one(self, query):
+        current = self._first(query)
+        if current is None:
+            return False
+        self._unstore(current)
+        return True
+
+    def delete_expired(self, field: str, cutoff: datetime) -> int:
+        """Remove documents whose datetime `field` is before `cutoff`, as a MongoDB TTL index would."""
+        expired = [document for document in self._documents.values()
+                   if isinstance(document.get(field), datetime) and document[field] < cutoff]
+        for document in expired:
+            self._unstore(document)
+        return len(expired)
+
+    async def bulk_write(self, operations):
+        errors = {}
+        for index, operation in enumerate(operations):
+            try:
+                if operation[0] == "insert":
+                    await self.insert_one(operation[1])
+                elif operation[0] == "update":
+                    await self.update_one({"id": operation[1]}, operation[2])
+                else:
+                    await self.delete_one({"id": operation[1]})
+            except (DuplicateDocument, ValueError) as e:
+                errors[index] = str(e)
+        return errors
+
+
+class Storage:
+    """The portfolio collections, exposed as attributes (`storage.projects`) or by name."""
+
+    def __init__(self, repositories: Dict[str, Repository]):
+        self.repositories = repositories
+        for name, repository in repositories.items():
+            setattr(self, name, repository)
+
+    def __getitem__(self, name: str) -> Repository:
+        return self.repositories[name]
+
+    async def setup(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class MongoStorage(Storage):
+    def __init__(self, db, client: Optional[AsyncIOMotorClient] = None):
+        super().__init__({name: MongoRepository(db[name], order) for name, order in COLLECTIONS.items()})
+        self.db = db
+        self.client = client
+
+    async def setup(self) -> None:
+        await ensure_indexes(self.db)
+
+    def close(self) -> None:
+        if self.client is not None:
+            self.client.close()
+
+
+class MemoryStorage(Storage):
+    """Collections held in this process.
+
+    Expired documents are removed every `ttl_interval` seconds according to the TTL indexes
+    declared in indexes.py, as MongoDB's TTL monitor does, so expiring collections such as
+    idempotency keys stay bounded.
+    """
+
+    def __init__(self, ttl_interval: float = 60.0):
+        super().__init__({name: MemoryRepository(name, order) for name, order in COLLECTIONS.items()})
+        self.ttl_interval = ttl_interval
+        self._ttl_task: Optional[asyncio.Task] = None
+
+    async def setup(self) -> None:
+        if self._ttl_task is None or self._ttl_task.done():
+            self._ttl_task = asyncio.create_task(self._expire_periodically())
+
+    def close(self) -> None:
+        if self._ttl_task is not None:
+            self._ttl_task.cancel()
+
+    def expire(self, now: Optional[datetime] = None) -> int:
+        """Remove every expired document now; returns how many were removed."""
+        now = now or datetime.utcnow()
+        removed = 0
+        for name, repository in self.repositories.items():
+            for field, seconds in ttl_fields(name):
+                removed += repository.delete_expired(field, now - timedelta(seconds=seconds))
+        return removed
+
+    async def _expire_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.ttl_interval)
+            removed = self.expire()
+            if removed:
+                logger.debug("Removed %d expired documents", removed)
+
+
+def create_storage() -> Storage:
+    """Build the storage backend selected by STORAGE_BACKEND ('mongo', the default, or 'memory')."""
+    backend = os.environ.get("STORAGE_BACKEND", "mongo")
+    if backend == "memory":
+        return MemoryStorage()
+    if backend == "mongo":
+        client = AsyncIOMotorClient(os.environ["MONGO_URL"])
+        return MongoStorage(client[os.environ["DB_NAME"]], client)
+    raise ValueError(f"Unknown STORAGE_BACKEND: {backend}")
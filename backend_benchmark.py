@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Load and Latency Benchmark for the Portfolio API
+Drives the FastAPI app in-process (ASGI transport) or a running server over HTTP,
+and reports throughput and latency percentiles per scenario.
+
+Examples:
+    python backend_benchmark.py                                  # in-process, MONGO_URL from backend/.env
+    python backend_benchmark.py --storage memory                 # in-process, no database
+    python backend_benchmark.py --mongo-url mongodb://localhost:27017 --db-name bench
+    python backend_benchmark.py --url http://localhost:8001 --concurrency 64 --duration 20   # rate limiting is off unless RATE_LIMIT=on
+    python backend_benchmark.py --scenario mixed --output bench/$(git rev-parse --short HEAD).json
+    python backend_benchmark.py --storage memory --events 5000     # idle SSE connections on one worker
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+BACKEND_DIR = Path(__file__).parent / "backend"
+
+# (method, path, weight, payload factory)
+Request = Tuple[str, str, float, Optional[Callable[[], Dict[str, Any]]]]
+
+
+def contact_payload() -> Dict[str, Any]:
+    return {
+        "name": "Benchmark Visitor",
+        "email": "bench@example.com",
+        "subject": f"Benchmark {uuid.uuid4().hex[:8]}",
+        "message": "Load test submission",
+    }
+
+
+def skill_payload() -> Dict[str, Any]:
+    return {"progress": random.randint(0, 100)}
+
+
+SCENARIOS: Dict[str, List[Request]] = {
+    "profile": [("GET", "/profile", 1.0, None)],
+    "settings": [("GET", "/settings", 1.0, None)],
+    "about": [("GET", "/about", 1.0, None)],
+    "projects": [("GET", "/projects", 1.0, None)],
+    "featured_projects": [("GET", "/projects?featured=true&limit=2", 1.0, None)],
+    "project_detail": [("GET", "/projects/{project_id}", 1.0, None)],
+    "skills": [("GET", "/skills", 1.0, None)],
+    "bootstrap": [("GET", "/bootstrap", 1.0, None)],
+    "contacts": [("GET", "/contact?limit=100", 1.0, None)],
+    "contact_stats": [("GET", "/contact/stats", 1.0, None)],
+    "contact_submit": [("POST", "/contact", 1.0, contact_payload)],
+    "search": [("GET", "/search?q=react", 0.5, None), ("GET", "/search?q=pyth", 0.5, None)],
+    "mixed": [
+        ("GET", "/bootstrap", 0.35, None),
+        ("GET", "/projects", 0.20, None),
+        ("GET", "/projects/{project_id}", 0.10, None),
+        ("GET", "/skills", 0.10, None),
+        ("GET", "/profile", 0.10, None),
+        ("POST", "/contact", 0.10, contact_payload),
+        ("PUT", "/skills/{skill_id}", 0.05, skill_payload),
+    ],
+}
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class PortfolioAPIBenchmark:
+    def __init__(self, client: httpx.AsyncClient, concurrency: int, duration: float, warmup: float):
+        self.client = client
+        self.concurrency = concurrency
+        self.duration = duration
+        self.warmup = warmup
+        self.path_params: Dict[str, str] = {}
+
+    async def discover_ids(self):
+        """Resolve ids used by path templates such as /projects/{project_id}"""
+        projects = (await self.client.get("/api/projects", params={"limit": 1})).json()
+        skills = (await self.client.get("/api/skills")).json()
+        if projects:
+            self.path_params["project_id"] = projects[0]["id"]
+        if skills:
+            self.path_params["skill_id"] = skills[0]["id"]
+
+    async def worker(self, requests: List[Request], deadline: float, samples: List[float], statuses: Dict[str, int], seed: int):
+        rng = random.Random(seed)
+        weights = [weight for _, _, weight, _ in requests]
+        while time.perf_counter() < deadline:
+            method, path, _, payload = rng.choices(requests, weights)[0]
+            url = "/api" + path.format(**self.path_params)
+            started = time.perf_counter()
+            try:
+                response = await self.client.request(method, url, json=payload() if payload else None)
+                key = str(response.status_code)
+            except httpx.HTTPError as e:
+                key = type(e).__name__
+            samples.append(time.perf_counter() - started)
+            statuses[key] = statuses.get(key, 0) + 1
+
+    async def run_phase(self, requests: List[Request], seconds: float) -> Tuple[List[float], Dict[str, int], float]:
+        samples: List[float] = []
+        statuses: Dict[str, int] = {}
+        started = time.perf_counter()
+        deadline = started + seconds
+        await asyncio.gather(*(
+            self.worker(requests, deadline, samples, statuses, seed) for seed in range(self.concurrency)
+        ))
+        return samples, statuses, time.perf_counter() - started
+
+    async def run_scenario(self, name: str) -> Dict[str, Any]:
+        requests = SCENARIOS[name]
+        if self.warmup:
+            await self.run_phase(requests, self.warmup)
+        samples, statuses, elapsed = await self.run_phase(requests, self.duration)
+        samples.sort()
+        errors = sum(count for status, count in statuses.items() if not status.startswith(("2", "3")))
+        return {
+            "requests": len(samples),
+            "errors": errors,
+            "statuses": statuses,
+            "rps": round(len(samples) / elapsed, 1) if elapsed else 0.0,
+            "p50_ms": round(percentile(samples, 0.50) * 1000, 3),
+            "p95_ms": round(percentile(samples, 0.95) * 1000, 3),
+            "p99_ms": round(percentile(samples, 0.99) * 1000, 3),
+            "max_ms": round(samples[-1] * 1000, 3) if samples else 0.0,
+        }
+
+
+def resident_memory_mb() -> Optional[float]:
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        return None
+
+
+class EventsBenchmark:
+    """Holds many idle /api/events connections, then measures how fast one write reaches all of them"""
+
+    def __init__(self, client: httpx.AsyncClient, connections: int, timeout: float):
+        self.client = client
+        self.connections = connections
+        self.timeout = timeout
+        self.connected = 0
+        self.failed = 0
+        self.arrivals: List[float] = []
+        self.all_connected = asyncio.Event()
+        self.all_arrived = asyncio.Event()
+
+    async def listen(self, opening: asyncio.Semaphore):
+        try:
+            async with opening:
+                response = await self.client.send(self.client.build_request("GET", "/api/events"), stream=True)
+            try:
+                lines = response.aiter_lines()
+                async for line in lines:
+                    if line.startswith("retry:"):
+                        self.connected += 1
+                        if self.connected + self.failed == self.connections:
+                            self.all_connected.set()
+                    elif line.startswith("data:"):
+                        self.arrivals.append(time.perf_counter())
+                        if len(self.arrivals) == self.connected:
+                            self.all_arrived.set()
+                        return
+            finally:
+                await response.aclose()
+        except httpx.HTTPError:
+            self.failed += 1
+            if self.connected + self.failed == self.connections:
+                self.all_connected.set()
+
+    async def run(self) -> Dict[str, Any]:
+        memory_before = resident_memory_mb()
+        opening = asyncio.Semaphore(200)
+        started = time.perf_counter()
+        listeners = [asyncio.create_task(self.listen(opening)) for _ in range(self.connections)]
+        try:
+            await asyncio.wait_for(self.all_connected.wait(), self.timeout)
+        except asyncio.TimeoutError:
+            pass
+        connect_seconds = time.perf_counter() - started
+        memory_after = resident_memory_mb()
+        stats = (await self.client.get("/api/events/stats")).json()
+
+        # One write, fanned out to every open connection
+        skill = (await self.client.get("/api/skills")).json()[0]
+        published = time.perf_counter()
+        await self.client.put(f"/api/skills/{skill['id']}", json={"progress": skill["progress"]})
+        try:
+            await asyncio.wait_for(self.all_arrived.wait(), self.timeout)
+        except asyncio.TimeoutError:
+            pass
+        for listener in listeners:
+            listener.cancel()
+        await asyncio.gather(*listeners, return_exceptions=True)
+
+        latencies = sorted(arrival - published for arrival in self.arrivals)
+        result = {
+            "connections": self.connections,
+            "connected": self.connected,
+            "failed": self.failed,
+            "serverSubscribers": stats["subscribers"],
+            "connect_s": round(connect_seconds, 3),
+            "delivered": len(latencies),
+            "fanout_p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+            "fanout_p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+            "fanout_max_ms": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+        }
+        if memory_before is not None and memory_after is not None and self.connected:
+            # In-process runs include the client side of each connection as well
+            result["rss_kb_per_connection"] = round((memory_after - memory_before) * 1024 / self.connected, 1)
+        return result
+
+
+async def start_local_server(server) -> Tuple[str, Any]:
+    """Serve the app over real sockets: streaming responses need more than the ASGI transport"""
+    import uvicorn
+
+    uvicorn_server = uvicorn.Server(uvicorn.Config(server.app, host="127.0.0.1", port=0, log_level="warning", lifespan="off"))
+    uvicorn_server.install_signal_handlers = lambda: None
+    task = asyncio.create_task(uvicorn_server.serve())
+    while not uvicorn_server.started:
+        await asyncio.sleep(0.05)
+    port = uvicorn_server.servers[0].sockets[0].getsockname()[1]
+
+    async def stop():
+        uvicorn_server.should_exit = True
+        await task
+
+    return f"http://127.0.0.1:{port}", stop
+
+
+async def run_events(args) -> Dict[str, Any]:
+    # Every connection needs a descriptor (two, when client and server share this process)
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+    client, server = await open_client(args)
+    stop = None
+    try:
+        if server is not None:
+            base_url, stop = await start_local_server(server)
+            await client.aclose()
+            client = httpx.AsyncClient(base_url=base_url, timeout=args.timeout)
+        limits = httpx.Limits(max_connections=args.events + 10, max_keepalive_connections=args.events + 10)
+        async with httpx.AsyncClient(base_url=str(client.base_url), limits=limits,
+                                     timeout=httpx.Timeout(args.timeout, read=None)) as streaming:
+            print(f"🔍 Opening {args.events} event stream connections...")
+            result = await EventsBenchmark(streaming, args.events, args.timeout).run()
+    finally:
+        await client.aclose()
+        if stop is not None:
+            await stop()
+        if server is not None:
+            await server.app.router.shutdown()
+
+    print(f"\n{'connections':<14}{'connected':>10}{'server':>10}{'connect s':>11}{'delivered':>11}"
+          f"{'p50 ms':>10}{'p99 ms':>10}{'KB/conn':>10}")
+    print("-" * 86)
+    print(f"{result['connections']:<14}{result['connected']:>10}{result['serverSubscribers']:>10}{result['connect_s']:>11}"
+          f"{result['delivered']:>11}{result['fanout_p50_ms']:>10}{result['fanout_p99_ms']:>10}"
+          f"{result.get('rss_kb_per_connection', '-'):>10}")
+    return {
+        "revision": git_revision(),
+        "timestamp": datetime.utcnow().isoformat(),
+        "target": args.url or "local",
+        "storage": None if args.url else os.environ.get("STORAGE_BACKEND", "mongo"),
+        "events": result,
+    }
+
+
+def print_report(results: Dict[str, Dict[str, Any]]):
+    print(f"\n{'scenario':<20}{'requests':>10}{'errors':>8}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    print("-" * 78)
+    for name, result in results.items():
+        print(f"{name:<20}{result['requests']:>10}{result['errors']:>8}{result['rps']:>10}"
+              f"{result['p50_ms']:>10}{result['p95_ms']:>10}{result['p99_ms']:>10}")
+
+
+async def open_client(args) -> Tuple[httpx.AsyncClient, Optional[Any]]:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    if args.url:
+        return httpx.AsyncClient(base_url=args.url, limits=limits, timeout=args.timeout), None
+
+    if args.storage:
+        os.environ["STORAGE_BACKEND"] = args.storage
+    if args.mongo_url:
+        os.environ["MONGO_URL"] = args.mongo_url
+    if args.db_name:
+        os.environ["DB_NAME"] = args.db_name
+    # All benchmark traffic comes from one address, so per-client limits would measure the limiter;
+    # and the client shares the server's event loop, so loop lag would be the client's as much as the server's
+    os.environ.setdefault("RATE_LIMIT", "off")
+    os.environ.setdefault("ADMISSION_MAX_LAG_MS", "60000")
+    sys.path.insert(0, str(BACKEND_DIR))
+    import server
+
+    await server.app.router.startup()
+    transport = httpx.ASGITransport(app=server.app)
+    return httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=args.timeout), server
+
+
+async def main(args) -> Dict[str, Any]:
+    client, server = await open_client(args)
+    try:
+        benchmark = PortfolioAPIBenchmark(client, args.concurrency, args.duration, args.warmup)
+        await benchmark.discover_ids()
+        results = {}
+        for name in args.scenario or list(SCENARIOS):
+            print(f"🔍 Running {name} ({args.concurrency} concurrent, {args.duration}s)...")
+            results[name] = await benchmark.run_scenario(name)
+    finally:
+        await client.aclose()
+        if server is not None:
+            await server.app.router.shutdown()
+
+    print_report(results)
+    return {
+        "revision": git_revision(),
+        "timestamp": datetime.utcnow().isoformat(),
+        "target": args.url or "asgi",
+        "storage": None if args.url else os.environ.get("STORAGE_BACKEND", "mongo"),
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "results": results,
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the Portfolio API")
+    parser.add_argument("--url", help="Base URL of a running server (default: drive the app in-process)")
+    parser.add_argument("--storage", choices=["mongo", "memory"], help="Storage backend for in-process runs (default: STORAGE_BACKEND or mongo)")
+    parser.add_argument("--mongo-url", help="MongoDB URL for in-process runs (overrides backend/.env)")
+    parser.add_argument("--db-name", help="Database name for in-process runs (overrides backend/.env)")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Scenario to run (repeatable; default: all)")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to measure each scenario")
+    parser.add_argument("--warmup", type=float, default=1.0, help="Seconds of unmeasured warmup per scenario")
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--events", type=int, metavar="N", help="Instead of the scenarios, hold N /api/events connections and measure fan-out")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    report = asyncio.run(run_events(args) if args.events else main(args))
+    if args.output:
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2))
+        print(f"\n📄 Results written to {output}")
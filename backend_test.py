@@ -37,7 +37,8 @@ class PortfolioAPITester:
             'skills': {'passed': 0, 'failed': 0, 'tests': []},
             'about': {'passed': 0, 'failed': 0, 'tests': []},
             'settings': {'passed': 0, 'failed': 0, 'tests': []},
-            'contact': {'passed': 0, 'failed': 0, 'tests': []}
+            'contact': {'passed': 0, 'failed': 0, 'tests': []},
+            'changes': {'passed': 0, 'failed': 0, 'tests': []}
         }
         
     def log_test(self, category: str, test_name: str, passed: bool, details: str = ""):
@@ -463,6 +464,55 @@ class PortfolioAPITester:
             self.log_test('contact', 'GET /api/contact - Request', False, 
                         f"Request failed: {error if not success else response.status_code}")
     
+    def test_changes_api(self):
+        """Test delta sync: a full sync, then an edit and a deletion reported since it"""
+        print("\n🔍 Testing Changes API...")
+        
+        response, success, error = self.make_request('GET', '/changes')
+        if not success or response.status_code != 200:
+            self.log_test('changes', 'GET /changes - Full Sync', False,
+                        f"Request failed: {error if not success else response.status_code}")
+            return
+        full = response.json()
+        if full.get('full') and full.get('profile') and isinstance(full.get('projects'), list):
+            self.log_test('changes', 'GET /changes - Full Sync', True)
+        else:
+            self.log_test('changes', 'GET /changes - Full Sync', False, "Expected the whole portfolio with full=true")
+        
+        project_data = {
+            "title": "Delta Sync Project",
+            "description": "Created and deleted by the changes test",
+            "tools": ["Python"],
+            "problem": "Test problem",
+            "solution": "Test solution",
+            "impact": "Test impact",
+            "visual": "https://example.com/test.jpg"
+        }
+        response, success, error = self.make_request('POST', '/projects', project_data)
+        if not success or response.status_code != 200:
+            self.log_test('changes', 'POST /projects - Create for Delta', False,
+                        f"Request failed: {error if not success else response.status_code}")
+            return
+        project_id = response.json()['id']
+        
+        response, success, error = self.make_request('GET', f"/changes?since={full['until']}")
+        if success and response.status_code == 200 and any(p['id'] == project_id for p in response.json()['projects']):
+            self.log_test('changes', 'GET /changes?since - Reports Upsert', True)
+        else:
+            self.log_test('changes', 'GET /changes?since - Reports Upsert', False, "Created project missing from delta")
+        
+        self.make_request('DELETE', f'/projects/{project_id}')
+        response, success, error = self.make_request('GET', f"/changes?since={full['until']}")
+        if success and response.status_code == 200:
+            delta = response.json()
+            deleted = any(t['id'] == project_id and t['collection'] == 'projects' for t in delta['deleted'])
+            upserted = any(p['id'] == project_id for p in delta['projects'])
+            self.log_test('changes', 'GET /changes?since - Reports Tombstone', deleted and not upserted,
+                        "" if deleted and not upserted else "Deleted project not reported as a tombstone")
+        else:
+            self.log_test('changes', 'GET /changes?since - Reports Tombstone', False,
+                        f"Request failed: {error if not success else response.status_code}")
+    
     def run_all_tests(self):
         """Run all API tests"""
         print(f"🚀 Starting Portfolio Backend API Tests")
@@ -476,6 +526,7 @@ class PortfolioAPITester:
         self.test_about_api()
         self.test_settings_api()
         self.test_contact_api()
+        self.test_changes_api()
         
         # Print summary
         self.print_summary()
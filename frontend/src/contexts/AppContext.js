@@ -1,8 +1,12 @@
-import React, { createContext, useContext, useState, useEffect } from 'react';
-import { profileAPI, settingsAPI } from '../services/api';
+import React, { createContext, useContext, useState, useEffect, useRef } from 'react';
+import { profileAPI, settingsAPI, bootstrapAPI, changesAPI, eventsAPI } from '../services/api';
+import { loadStore, saveStore, storeFromBootstrap, applyChanges } from '../services/portfolioStore';
 
 const AppContext = createContext();
 
+const SYNC_DELAY_MS = 250;
+const SYNC_JITTER_MS = 2000;
+
 export const useAppContext = () => {
   const context = useContext(AppContext);
   if (!context) {
@@ -14,24 +18,58 @@ export const useAppContext = () => {
 export const AppProvider = ({ children }) => {
   const [profile, setProfile] = useState(null);
   const [settings, setSettings] = useState(null);
+  const [about, setAbout] = useState(null);
+  const [projects, setProjects] = useState([]);
+  const [skills, setSkills] = useState([]);
+  const [version, setVersion] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
+  const storeRef = useRef(null);
+
+  const showStore = (store) => {
+    storeRef.current = store;
+    setProfile(store.profile);
+    setSettings(store.settings);
+    setAbout(store.about);
+    setProjects(store.projects);
+    setSkills(store.skills);
+    setVersion(store.version);
+  };
+
+  // Fetch and apply what changed since the local copy was last synced
+  const syncChanges = async () => {
+    const current = storeRef.current;
+    if (!current || !current.since) return;
+    const next = applyChanges(current, await changesAPI.since(current.since));
+    showStore(next);
+    saveStore(next);
+  };
 
   // Load initial data
   useEffect(() => {
     const loadInitialData = async () => {
+      const stored = loadStore();
+      if (stored && stored.since) {
+        // Returning visitor: show the local copy right away, then fetch only what changed
+        showStore(stored);
+        setLoading(false);
+        try {
+          await syncChanges();
+        } catch (err) {
+          console.error('Error syncing changes:', err);
+        }
+        return;
+      }
+
       try {
         setLoading(true);
         setError(null);
         
-        // Load profile and settings in parallel
-        const [profileData, settingsData] = await Promise.all([
-          profileAPI.get(),
-          settingsAPI.get()
-        ]);
+        // Load the whole portfolio in a single round trip
+        const store = storeFromBootstrap(await bootstrapAPI.get());
         
-        setProfile(profileData);
-        setSettings(settingsData);
+        showStore(store);
+        saveStore(store);
       } catch (err) {
         console.error('Error loading initial data:', err);
         setError('Failed to load application data');
@@ -43,6 +81,22 @@ export const AppProvider = ({ children }) => {
     loadInitialData();
   }, []);
 
+  // Live updates: the server pushes a small event per write, and a burst of them triggers one sync.
+  // Every open page receives the same event, so each waits a random extra delay before syncing
+  useEffect(() => {
+    let timer = null;
+    const unsubscribe = eventsAPI.subscribe((change) => {
+      clearTimeout(timer);
+      timer = setTimeout(() => {
+        syncChanges().catch((err) => console.error('Error syncing changes:', err));
+      }, SYNC_DELAY_MS + Math.random() * SYNC_JITTER_MS);
+    });
+    return () => {
+      clearTimeout(timer);
+      unsubscribe();
+    };
+  }, []);
+
   const updateProfile = async (profileData) => {
     try {
       const updatedProfile = await profileAPI.update(profileData);
@@ -68,6 +122,10 @@ export const AppProvider = ({ children }) => {
   const value = {
     profile,
     settings,
+    about,
+    projects,
+    skills,
+    version,
     loading,
     error,
     updateProfile,
@@ -1,45 +1,14 @@
-import React, { useState, useEffect } from "react";
+import React from "react";
 import { Code, TrendingUp, Users, Award } from "lucide-react";
 import { useAppContext } from "../contexts/AppContext";
-import { skillsAPI, aboutAPI } from "../services/api";
 import LoadingSpinner from "../components/LoadingSpinner";
 import ErrorMessage from "../components/ErrorMessage";
 
 const AboutPage = () => {
-  const { profile, loading: profileLoading, error: profileError } = useAppContext();
-  const [about, setAbout] = useState(null);
-  const [skills, setSkills] = useState([]);
-  const [aboutLoading, setAboutLoading] = useState(true);
-  const [skillsLoading, setSkillsLoading] = useState(true);
-  const [aboutError, setAboutError] = useState(null);
-  const [skillsError, setSkillsError] = useState(null);
+  // About and skills come with the bootstrap loaded by AppContext
+  const { profile, about, skills, loading, error } = useAppContext();
 
-  // Load about and skills data
-  useEffect(() => {
-    const loadData = async () => {
-      try {
-        const aboutData = await aboutAPI.get();
-        setAbout(aboutData);
-        setAboutLoading(false);
-      } catch (err) {
-        setAboutError('Failed to load about information');
-        setAboutLoading(false);
-      }
-
-      try {
-        const skillsData = await skillsAPI.getAll();
-        setSkills(skillsData);
-        setSkillsLoading(false);
-      } catch (err) {
-        setSkillsError('Failed to load skills');
-        setSkillsLoading(false);
-      }
-    };
-
-    loadData();
-  }, []);
-
-  if (profileLoading || aboutLoading) {
+  if (loading) {
     return (
       <div className="bg-[#fffef2] min-h-screen flex items-center justify-center">
         <LoadingSpinner size="large" text="Loading about information..." />
@@ -47,10 +16,10 @@ const AboutPage = () => {
     );
   }
 
-  if (profileError || aboutError) {
+  if (error) {
     return (
       <div className="bg-[#fffef2] min-h-screen flex items-center justify-center">
-        <ErrorMessage message={profileError || aboutError} />
+        <ErrorMessage message={error} />
       </div>
     );
   }
@@ -274,55 +243,36 @@ const AboutPage = () => {
             </p>
           </div>
           
-            {skillsLoading ? (
-              <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-8">
-                {[...Array(6)].map((_, i) => (
-                  <div key={i} className="bg-[#f6f5e8] p-6 border border-[#ebeade] animate-pulse">
-                    <div className="flex items-center justify-between mb-4">
-                      <div className="h-6 bg-[#ebeade] rounded w-20"></div>
-                      <div className="w-6 h-6 bg-[#ebeade] rounded"></div>
-                    </div>
-                    <div className="w-full bg-[#bcbbb4] h-2 mb-2">
-                      <div className="h-2 bg-[#ebeade] rounded w-3/4"></div>
-                    </div>
-                    <div className="h-4 bg-[#ebeade] rounded w-16"></div>
-                  </div>
-                ))}
-              </div>
-            ) : skillsError ? (
-              <ErrorMessage message={skillsError} showRetry={false} />
-            ) : (
-              <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-8">
-                {skills.map((skill, index) => (
-                  <div
-                    key={skill.id || index}
-                    className="bg-[#f6f5e8] p-6 border border-[#ebeade] hover:bg-[#ebeade] transition-all duration-200"
-                  >
-                    <div className="flex items-center justify-between mb-4">
-                      <h3 
-                        className="text-lg font-medium text-[#333333]"
-                        style={{ fontFamily: "'Inter', sans-serif" }}
-                      >
-                        {skill.name}
-                      </h3>
-                      <span className="text-xl">{skill.icon}</span>
-                    </div>
-                    <div className="w-full bg-[#bcbbb4] h-2 mb-2">
-                      <div 
-                        className="h-2 bg-[#333333] transition-all duration-1000 ease-out"
-                        style={{ width: `${skill.progress}%` }}
-                      ></div>
-                    </div>
-                    <span 
-                      className="text-sm text-[#666666] capitalize"
+            <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-8">
+              {skills.map((skill, index) => (
+                <div
+                  key={skill.id || index}
+                  className="bg-[#f6f5e8] p-6 border border-[#ebeade] hover:bg-[#ebeade] transition-all duration-200"
+                >
+                  <div className="flex items-center justify-between mb-4">
+                    <h3 
+                      className="text-lg font-medium text-[#333333]"
                       style={{ fontFamily: "'Inter', sans-serif" }}
                     >
-                      {skill.level}
-                    </span>
+                      {skill.name}
+                    </h3>
+                    <span className="text-xl">{skill.icon}</span>
                   </div>
-                ))}
-              </div>
-            )}
+                  <div className="w-full bg-[#bcbbb4] h-2 mb-2">
+                    <div 
+                      className="h-2 bg-[#333333] transition-all duration-1000 ease-out"
+                      style={{ width: `${skill.progress}%` }}
+                    ></div>
+                  </div>
+                  <span 
+                    className="text-sm text-[#666666] capitalize"
+                    style={{ fontFamily: "'Inter', sans-serif" }}
+                  >
+                    {skill.level}
+                  </span>
+                </div>
+              ))}
+            </div>
         </div>
       </section>
     </div>
@@ -1,4 +1,4 @@
-import React, { useState } from "react";
+import React, { useRef, useState } from "react";
 import { Send, Github, Linkedin, Mail, Code, MapPin, Clock } from "lucide-react";
 import { useAppContext } from "../contexts/AppContext";
 import { contactAPI } from "../services/api";
@@ -15,8 +15,11 @@ const ContactPage = () => {
   });
   const [isSubmitted, setIsSubmitted] = useState(false);
   const [isSubmitting, setIsSubmitting] = useState(false);
+  // One key per message: a retry after an error reuses it, so the message is recorded once
+  const submissionKey = useRef(null);
 
   const handleInputChange = (e) => {
+    submissionKey.current = null;
     setFormData({
       ...formData,
       [e.target.name]: e.target.value
@@ -27,8 +30,13 @@ const ContactPage = () => {
     e.preventDefault();
     setIsSubmitting(true);
 
+    if (!submissionKey.current) {
+      submissionKey.current = window.crypto?.randomUUID?.() || `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+    }
+
     try {
-      await contactAPI.submit(formData);
+      await contactAPI.submit(formData, submissionKey.current);
+      submissionKey.current = null;
       setIsSubmitted(true);
       toast({
         title: "Message sent!",
@@ -1,46 +1,14 @@
-import React, { useState, useEffect } from "react";
+import React from "react";
 import { Link } from "react-router-dom";
 import { ArrowRight } from "lucide-react";
 import { useAppContext } from "../contexts/AppContext";
-import { projectsAPI, skillsAPI } from "../services/api";
 import LoadingSpinner from "../components/LoadingSpinner";
 import ErrorMessage from "../components/ErrorMessage";
 
 const HomePage = () => {
-  const { profile, loading, error } = useAppContext();
-  const [skills, setSkills] = useState([]);
-  const [projects, setProjects] = useState([]);
-  const [skillsLoading, setSkillsLoading] = useState(true);
-  const [projectsLoading, setProjectsLoading] = useState(true);
-  const [skillsError, setSkillsError] = useState(null);
-  const [projectsError, setProjectsError] = useState(null);
-
-  // Load skills and featured projects
-  useEffect(() => {
-    const loadData = async () => {
-      try {
-        // Load skills
-        const skillsData = await skillsAPI.getAll();
-        setSkills(skillsData);
-        setSkillsLoading(false);
-      } catch (err) {
-        setSkillsError('Failed to load skills');
-        setSkillsLoading(false);
-      }
-
-      try {
-        // Load featured projects
-        const projectsData = await projectsAPI.getAll({ featured: true, limit: 2 });
-        setProjects(projectsData);
-        setProjectsLoading(false);
-      } catch (err) {
-        setProjectsError('Failed to load projects');
-        setProjectsLoading(false);
-      }
-    };
-
-    loadData();
-  }, []);
+  const { profile, projects: allProjects, skills, loading, error } = useAppContext();
+  // Skills and projects come with the bootstrap; featured projects are the first two in display order
+  const projects = allProjects.filter((project) => project.featured).slice(0, 2);
 
   if (loading) {
     return (
@@ -138,46 +106,30 @@ const HomePage = () => {
             </p>
           </div>
           
-          {skillsLoading ? (
-            <div className="grid grid-cols-2 md:grid-cols-3 lg:grid-cols-6 gap-8">
-              {[...Array(6)].map((_, i) => (
-                <div key={i} className="bg-[#fffef2] p-6 border border-[#ebeade] animate-pulse">
-                  <div className="text-center space-y-3">
-                    <div className="w-8 h-8 bg-[#ebeade] rounded mx-auto"></div>
-                    <div className="h-4 bg-[#ebeade] rounded"></div>
-                    <div className="w-full bg-[#ebeade] h-1 rounded"></div>
+          <div className="grid grid-cols-2 md:grid-cols-3 lg:grid-cols-6 gap-8">
+            {skills.map((skill, index) => (
+              <div
+                key={skill.id || index}
+                className="bg-[#fffef2] p-6 border border-[#ebeade] hover:shadow-lg transition-all duration-200 hover:transform hover:-translate-y-1 cursor-pointer group"
+              >
+                <div className="text-center space-y-3">
+                  <div className="text-2xl">{skill.icon}</div>
+                  <h3 
+                    className="text-sm font-medium text-[#333333] group-hover:text-[#000000] transition-colors"
+                    style={{ fontFamily: "'Inter', sans-serif" }}
+                  >
+                    {skill.name}
+                  </h3>
+                  <div className="w-full bg-[#ebeade] h-1">
+                    <div 
+                      className="h-1 bg-[#333333] transition-all duration-1000 ease-out"
+                      style={{ width: `${skill.progress}%` }}
+                    ></div>
                   </div>
                 </div>
-              ))}
-            </div>
-          ) : skillsError ? (
-            <ErrorMessage message={skillsError} showRetry={false} />
-          ) : (
-            <div className="grid grid-cols-2 md:grid-cols-3 lg:grid-cols-6 gap-8">
-              {skills.map((skill, index) => (
-                <div
-                  key={skill.id || index}
-                  className="bg-[#fffef2] p-6 border border-[#ebeade] hover:shadow-lg transition-all duration-200 hover:transform hover:-translate-y-1 cursor-pointer group"
-                >
-                  <div className="text-center space-y-3">
-                    <div className="text-2xl">{skill.icon}</div>
-                    <h3 
-                      className="text-sm font-medium text-[#333333] group-hover:text-[#000000] transition-colors"
-                      style={{ fontFamily: "'Inter', sans-serif" }}
-                    >
-                      {skill.name}
-                    </h3>
-                    <div className="w-full bg-[#ebeade] h-1">
-                      <div 
-                        className="h-1 bg-[#333333] transition-all duration-1000 ease-out"
-                        style={{ width: `${skill.progress}%` }}
-                      ></div>
-                    </div>
-                  </div>
-                </div>
-              ))}
-            </div>
-          )}
+              </div>
+            ))}
+          </div>
         </div>
       </section>
 
@@ -199,65 +151,41 @@ const HomePage = () => {
             </p>
           </div>
 
-          {projectsLoading ? (
-            <div className="grid grid-cols-1 lg:grid-cols-2 gap-12">
-              {[...Array(2)].map((_, i) => (
-                <div key={i} className="bg-[#f6f5e8] p-8 animate-pulse">
-                  <div className="space-y-6">
-                    <div className="w-12 h-12 bg-[#ebeade] rounded"></div>
-                    <div className="h-6 bg-[#ebeade] rounded w-3/4"></div>
-                    <div className="space-y-2">
-                      <div className="h-4 bg-[#ebeade] rounded"></div>
-                      <div className="h-4 bg-[#ebeade] rounded w-5/6"></div>
-                    </div>
-                    <div className="flex flex-wrap gap-2">
-                      {[...Array(4)].map((_, j) => (
-                        <div key={j} className="h-6 w-16 bg-[#ebeade] rounded"></div>
-                      ))}
-                    </div>
-                  </div>
-                </div>
-              ))}
-            </div>
-          ) : projectsError ? (
-            <ErrorMessage message={projectsError} showRetry={false} />
-          ) : (
-            <div className="grid grid-cols-1 lg:grid-cols-2 gap-12">
-              {projects.map((project) => (
-                <div
-                  key={project.id}
-                  className="bg-[#f6f5e8] p-8 hover:bg-[#ebeade] transition-all duration-300 hover:transform hover:-translate-y-2 cursor-pointer group"
-                >
-                  <div className="space-y-6">
-                    <div className="text-4xl mb-4">{project.visual}</div>
-                    <h3 
-                      className="text-xl font-normal text-[#333333] group-hover:text-[#000000] transition-colors"
-                      style={{ fontFamily: "'Inter', sans-serif" }}
-                    >
-                      {project.title}
-                    </h3>
-                    <p 
-                      className="text-[#666666] leading-relaxed"
-                      style={{ fontFamily: "'Inter', sans-serif" }}
-                    >
-                      {project.description}
-                    </p>
-                    <div className="flex flex-wrap gap-2">
-                      {project.tools.map((tool) => (
-                        <span
-                          key={tool}
-                          className="px-3 py-1 bg-[#fffef2] text-[#4a4a4a] text-xs border border-[#bcbbb4] font-medium"
-                          style={{ fontFamily: "'Inter', sans-serif" }}
-                        >
-                          {tool}
-                        </span>
-                      ))}
-                    </div>
+          <div className="grid grid-cols-1 lg:grid-cols-2 gap-12">
+            {projects.map((project) => (
+              <div
+                key={project.id}
+                className="bg-[#f6f5e8] p-8 hover:bg-[#ebeade] transition-all duration-300 hover:transform hover:-translate-y-2 cursor-pointer group"
+              >
+                <div className="space-y-6">
+                  <div className="text-4xl mb-4">{project.visual}</div>
+                  <h3 
+                    className="text-xl font-normal text-[#333333] group-hover:text-[#000000] transition-colors"
+                    style={{ fontFamily: "'Inter', sans-serif" }}
+                  >
+                    {project.title}
+                  </h3>
+                  <p 
+                    className="text-[#666666] leading-relaxed"
+                    style={{ fontFamily: "'Inter', sans-serif" }}
+                  >
+                    {project.description}
+                  </p>
+                  <div className="flex flex-wrap gap-2">
+                    {project.tools.map((tool) => (
+                      <span
+                        key={tool}
+                        className="px-3 py-1 bg-[#fffef2] text-[#4a4a4a] text-xs border border-[#bcbbb4] font-medium"
+                        style={{ fontFamily: "'Inter', sans-serif" }}
+                      >
+                        {tool}
+                      </span>
+                    ))}
                   </div>
                 </div>
-              ))}
-            </div>
-          )}
+              </div>
+            ))}
+          </div>
 
           <div className="text-center mt-12">
             <Link
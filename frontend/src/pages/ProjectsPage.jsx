@@ -1,33 +1,13 @@
-import React, { useState, useEffect } from "react";
+import React, { useState } from "react";
 import { ArrowRight, ExternalLink, Github } from "lucide-react";
-import { projectsAPI } from "../services/api";
+import { useAppContext } from "../contexts/AppContext";
 import LoadingSpinner from "../components/LoadingSpinner";
 import ErrorMessage from "../components/ErrorMessage";
 
 const ProjectsPage = () => {
   const [selectedProject, setSelectedProject] = useState(null);
-  const [projects, setProjects] = useState([]);
-  const [loading, setLoading] = useState(true);
-  const [error, setError] = useState(null);
-
-  // Load projects on component mount
-  useEffect(() => {
-    const loadProjects = async () => {
-      try {
-        setLoading(true);
-        setError(null);
-        const projectsData = await projectsAPI.getAll();
-        setProjects(projectsData);
-      } catch (err) {
-        setError('Failed to load projects');
-        console.error('Error loading projects:', err);
-      } finally {
-        setLoading(false);
-      }
-    };
-
-    loadProjects();
-  }, []);
+  // Projects come with the bootstrap loaded by AppContext
+  const { projects, loading, error } = useAppContext();
 
   if (loading) {
     return (
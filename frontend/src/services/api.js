@@ -38,6 +38,16 @@ export const projectsAPI = {
     const response = await apiClient.get(`/projects${queryString ? `?${queryString}` : ''}`);
     return response.data;
   },
+  // params.tool may be a list of tools, sent as repeated ?tool= parameters; projects using all of them match
+  getPage: async (params = {}) => {
+    const response = await apiClient.get('/projects', { params, paramsSerializer: { indexes: null } });
+    return { items: response.data, next: response.headers['x-next-cursor'] || null };
+  },
+  // Counts per tool and featured flag, for building filters
+  getFacets: async () => {
+    const response = await apiClient.get('/projects/facets');
+    return response.data;
+  },
   getById: async (id) => {
     const response = await apiClient.get(`/projects/${id}`);
     return response.data;
@@ -53,6 +63,14 @@ export const projectsAPI = {
   delete: async (id) => {
     const response = await apiClient.delete(`/projects/${id}`);
     return response.data;
+  },
+  bulk: async (operations) => {
+    const response = await apiClient.post('/projects/bulk', { operations });
+    return response.data;
+  },
+  reorder: async (items) => {
+    const response = await apiClient.post('/projects/reorder', { items });
+    return response.data;
   }
 };
 
@@ -73,6 +91,14 @@ export const skillsAPI = {
   delete: async (id) => {
     const response = await apiClient.delete(`/skills/${id}`);
     return response.data;
+  },
+  bulk: async (operations) => {
+    const response = await apiClient.post('/skills/bulk', { operations });
+    return response.data;
+  },
+  reorder: async (items) => {
+    const response = await apiClient.post('/skills/reorder', { items });
+    return response.data;
   }
 };
 
@@ -90,14 +116,25 @@ export const aboutAPI = {
 
 // Contact API
 export const contactAPI = {
-  submit: async (data) => {
-    const response = await apiClient.post('/contact', data);
+  // Retries of one submission should pass the same idempotencyKey, so it is only recorded once
+  submit: async (data, idempotencyKey) => {
+    const headers = idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : {};
+    const response = await apiClient.post('/contact', data, { headers });
     return response.data;
   },
   getAll: async () => {
     const response = await apiClient.get('/contact');
     return response.data;
   },
+  getPage: async (params = {}) => {
+    const response = await apiClient.get('/contact', { params });
+    return { items: response.data, next: response.headers['x-next-cursor'] || null };
+  },
+  // Counts by status and per day and week, for the inbox dashboard: params { days, weeks }
+  getStats: async (params = {}) => {
+    const response = await apiClient.get('/contact/stats', { params });
+    return response.data;
+  },
   updateStatus: async (id, status) => {
     const response = await apiClient.put(`/contact/${id}`, { status });
     return response.data;
@@ -116,6 +153,41 @@ export const settingsAPI = {
   }
 };
 
+// Bootstrap API: profile, settings, about, projects and skills in one request
+export const bootstrapAPI = {
+  get: async () => {
+    const response = await apiClient.get('/bootstrap');
+    return response.data;
+  }
+};
+
+// Changes API: documents updated and deleted since a previous sync
+export const changesAPI = {
+  since: async (since) => {
+    const response = await apiClient.get('/changes', { params: since ? { since } : {} });
+    return response.data;
+  }
+};
+
+// Search API: ranked matches over projects and contacts
+export const searchAPI = {
+  query: async (q, params = {}) => {
+    const response = await apiClient.get('/search', { params: { q, ...params } });
+    return { items: response.data, next: response.headers['x-next-cursor'] || null };
+  }
+};
+
+// Events API: live change notifications over Server-Sent Events
+export const eventsAPI = {
+  // Calls onChange with {collection, op, id, updatedAt}, or null when the client should resync
+  subscribe: (onChange) => {
+    const source = new EventSource(`${API_BASE}/events`);
+    source.addEventListener('change', (event) => onChange(JSON.parse(event.data)));
+    source.addEventListener('resync', () => onChange(null));
+    return () => source.close();
+  }
+};
+
 // Generic API helper for loading states
 export const withLoading = async (apiCall, setLoading, setError = null) => {
   setLoading(true);
@@ -142,5 +214,9 @@ export default {
   aboutAPI,
   contactAPI,
   settingsAPI,
+  bootstrapAPI,
+  changesAPI,
+  searchAPI,
+  eventsAPI,
   withLoading,
 };
\ No newline at end of file
@@ -0,0 +1,75 @@
+// Local copy of the public portfolio, kept current by applying /changes deltas
+const STORAGE_KEY = 'portfolio-store';
+
+const byOrder = (a, b) => (a.order ?? 0) - (b.order ?? 0) || (a.id < b.id ? -1 : a.id > b.id ? 1 : 0);
+
+export const loadStore = () => {
+  try {
+    return JSON.parse(localStorage.getItem(STORAGE_KEY));
+  } catch (err) {
+    return null;
+  }
+};
+
+export const saveStore = (store) => {
+  try {
+    localStorage.setItem(STORAGE_KEY, JSON.stringify(store));
+  } catch (err) {
+    // Storage full or unavailable (private mode): the store just isn't kept
+  }
+};
+
+// A store from a /bootstrap response; later deltas start from its newest updatedAt
+export const storeFromBootstrap = (data) => {
+  const stamps = [data.profile, data.settings, data.about, ...data.projects, ...data.skills]
+    .map((document) => document.updatedAt)
+    .filter(Boolean)
+    .sort();
+  return {
+    profile: data.profile,
+    settings: data.settings,
+    about: data.about,
+    projects: data.projects,
+    skills: data.skills,
+    version: data.version,
+    since: stamps[stamps.length - 1] || null,
+  };
+};
+
+const merge = (items, changed, removedIds) => {
+  const byId = new Map(items.map((item) => [item.id, item]));
+  changed.forEach((item) => byId.set(item.id, item));
+  removedIds.forEach((id) => byId.delete(id));
+  return [...byId.values()].sort(byOrder);
+};
+
+// Apply a /changes response; deltas may repeat documents the store already has
+export const applyChanges = (store, changes) => {
+  if (changes.full) {
+    return {
+      profile: changes.profile,
+      settings: changes.settings,
+      about: changes.about,
+      projects: changes.projects,
+      skills: changes.skills,
+      version: changes.until,
+      since: changes.until,
+    };
+  }
+
+  const removed = (collection) => changes.deleted
+    .filter((tombstone) => tombstone.collection === collection)
+    .map((tombstone) => tombstone.id);
+  const changed = changes.profile || changes.settings || changes.about
+    || changes.projects.length > 0 || changes.skills.length > 0 || changes.deleted.length > 0;
+
+  return {
+    profile: changes.profile || store.profile,
+    settings: changes.settings || store.settings,
+    about: changes.about || store.about,
+    projects: merge(store.projects, changes.projects, removed('projects')),
+    skills: merge(store.skills, changes.skills, removed('skills')),
+    version: changed ? changes.until : store.version,
+    since: changes.until,
+  };
+};
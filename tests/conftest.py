@@ -0,0 +1,46 @@
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# The backend modules import each other by their flat names, as when run from backend/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+
+
+class Api:
+    """The API app on its own event loop, called synchronously from tests."""
+
+    def __init__(self, server, loop):
+        import httpx
+
+        self.server = server
+        self.loop = loop
+        self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://test")
+
+    def run(self, awaitable):
+        return self.loop.run_until_complete(awaitable)
+
+    def request(self, method, path, **kwargs):
+        return self.run(self.client.request(method, path, **kwargs))
+
+
+@pytest.fixture(scope="session")
+def api():
+    # Tests send requests faster than any client would, from the server's own event loop
+    os.environ.setdefault("RATE_LIMIT", "off")
+    os.environ.setdefault("ADMISSION_MAX_LAG_MS", "60000")
+    import server
+
+    loop = asyncio.new_event_loop()
+    client = Api(server, loop)
+    for handler in server.app.router.on_startup:
+        client.run(handler())
+    yield client
+    for handler in server.app.router.on_shutdown:
+        client.run(handler())
+    client.run(client.client.aclose())
+    loop.close()
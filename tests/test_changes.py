@@ -0,0 +1,25 @@
+import asyncio
+from datetime import datetime, timedelta
+
+
+def test_syncs_within_one_step_share_a_load_and_see_later_writes(api):
+    step = datetime.utcnow() - timedelta(minutes=1)
+    step -= (step - datetime.min) % api.server.CHANGES_OVERLAP
+    # Clients whose last sync falls within the same CHANGES_OVERLAP step
+    stamps = [(step + timedelta(milliseconds=offset)).isoformat() for offset in range(0, 5000, 500)]
+    calls = api.server.read_flights.calls
+
+    async def sync_all():
+        return await asyncio.gather(*(api.client.get("/api/changes", params={"since": since}) for since in stamps))
+
+    responses = api.run(sync_all())
+    assert all(response.status_code == 200 for response in responses)
+    assert len({response.content for response in responses}) == 1
+    assert api.server.read_flights.calls == calls + 1
+
+    project = api.request("GET", "/api/projects").json()[0]
+    api.request("PUT", f"/api/projects/{project['id']}", json={"impact": "Synced after the write"})
+    changes = api.request("GET", "/api/changes", params={"since": stamps[-1]}).json()
+    assert {"id": project["id"], "impact": "Synced after the write"} in [
+        {"id": document["id"], "impact": document["impact"]} for document in changes["projects"]]
+    api.request("PUT", f"/api/projects/{project['id']}", json={"impact": project["impact"]})
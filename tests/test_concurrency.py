@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+from storage import PROJECT_ORDER, MongoRepository
+
+
+def legacy_project(project_id):
+    """A project stored before versioning: it has no `version` field."""
+    return {"id": project_id, "title": "Legacy", "description": "", "tools": [], "problem": "", "solution": "",
+            "impact": "", "visual": "", "order": 99}
+
+
+def test_stale_version_conflicts(api):
+    project = api.request("GET", "/api/projects").json()[0]
+    path = f"/api/projects/{project['id']}"
+
+    updated = api.request("PUT", path, json={"impact": project["impact"], "version": project["version"]})
+    assert updated.status_code == 200
+    assert updated.json()["version"] == project["version"] + 1
+
+    stale = api.request("PUT", path, json={"impact": "Lost update", "version": project["version"]})
+    assert stale.status_code == 409
+    assert stale.json()["detail"] == "Version conflict"
+    assert api.request("GET", path).json()["impact"] == project["impact"]
+
+
+def test_missing_document_is_not_found_with_or_without_a_version(api):
+    assert api.request("PUT", "/api/projects/missing", json={"impact": "x", "version": 3}).status_code == 404
+    assert api.request("PUT", "/api/projects/missing", json={"impact": "x"}).status_code == 404
+
+
+def test_document_without_version_counts_as_version_zero(api):
+    api.run(api.server.storage.projects.insert_one(legacy_project("legacy")))
+    try:
+        updated = api.request("PUT", "/api/projects/legacy", json={"impact": "Versioned", "version": 0})
+        assert updated.status_code == 200
+        assert updated.json()["version"] == 1
+        assert api.request("PUT", "/api/projects/legacy", json={"impact": "Stale", "version": 0}).status_code == 409
+    finally:
+        api.request("DELETE", "/api/projects/legacy")
+
+
+def test_mongo_matches_documents_written_before_versioning():
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+
+    async def scenario():
+        projects = MongoRepository(mongomock_motor.AsyncMongoMockClient()["test"]["projects"], PROJECT_ORDER)
+        await projects.insert_one(legacy_project("legacy"))
+        await projects.insert_one({**legacy_project("zero"), "version": 0})
+
+        # mongomock re-reads the updated document with the original filter, which no longer
+        # matches it, so the stored documents are checked instead of the returned ones
+        async def stored(project_id):
+            document = await projects.find_one({"id": project_id})
+            return document.get("version"), document["impact"]
+
+        await projects.update_one({"id": "legacy"}, {"impact": "a"}, expected_version=0)
+        await projects.update_one({"id": "zero"}, {"impact": "a"}, expected_version=0)
+        assert await stored("legacy") == await stored("zero") == (1, "a")
+
+        await projects.update_one({"id": "legacy"}, {"impact": "stale"}, expected_version=0)
+        assert await stored("legacy") == (1, "a")
+        await projects.update_one({"id": "legacy"}, {"impact": "b"}, expected_version=1)
+        assert await stored("legacy") == (2, "b")
+
+    asyncio.run(scenario())
@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+
+from conditional import last_modified
+
+
+def test_a_page_is_validated_on_its_own_documents(api):
+    first = api.request("GET", "/api/projects", params={"limit": 1})
+    assert "last-modified" not in first.headers
+    assert "x-next-cursor" in first.headers
+    etag = first.headers["etag"]
+
+    # Editing the row after the page changes neither the page nor whether more follow
+    following = api.request("GET", "/api/projects", params={"limit": 1, "cursor": first.headers["x-next-cursor"]}).json()[0]
+    api.request("PUT", f"/api/projects/{following['id']}", json={"impact": following["impact"]})
+    again = api.request("GET", "/api/projects", params={"limit": 1}, headers={"If-None-Match": etag})
+    assert again.status_code == 304
+
+    # The last page has its own validator, so a client learns when more pages appear
+    count = len(api.request("GET", "/api/projects").json())
+    last = api.request("GET", "/api/projects", params={"limit": count})
+    assert "x-next-cursor" not in last.headers
+    assert last.headers["etag"] != api.request("GET", "/api/projects", params={"limit": count - 1}).headers["etag"]
+
+
+def test_bootstrap_last_modified_includes_deletions(api):
+    deleted_at = datetime.utcnow().replace(microsecond=0) + timedelta(hours=1)
+    tombstone = {"id": "removed-project", "collection": "projects", "deletedAt": deleted_at}
+    api.run(api.server.storage.tombstones.insert_one(tombstone))
+    api.server.invalidate_reads("projects")
+    try:
+        modified = api.request("GET", "/api/bootstrap").headers["last-modified"]
+        assert parsedate_to_datetime(modified) == deleted_at.replace(tzinfo=timezone.utc)
+    finally:
+        api.run(api.server.storage.tombstones.delete_one({"id": "removed-project"}))
+        api.server.invalidate_reads("projects")
+
+
+def test_last_modified_takes_the_newest_update_or_deletion():
+    documents = [{"updatedAt": datetime(2024, 5, 1)}, {"updatedAt": datetime(2024, 5, 3)}]
+    assert last_modified(documents) == datetime(2024, 5, 3, tzinfo=timezone.utc)
+    assert last_modified(documents, [{"deletedAt": datetime(2024, 5, 4, 8, 30, 1, 500)}]) == datetime(2024, 5, 4, 8, 30, 1, tzinfo=timezone.utc)
+    assert last_modified([]) is None
@@ -0,0 +1,39 @@
+from datetime import datetime
+
+import pytest
+
+import fieldsets
+from models import Contact, Project, Skill
+
+
+def stored(api, collection):
+    """Documents as storage returns them: with a storage-only `_id`, and without `version`
+    when they were written before versioning."""
+    documents = api.run(api.server.storage[collection].find_all())
+    assert documents
+    legacy = {key: value for key, value in documents[0].items() if key != "version"}
+    legacy["_id"] = "65f0c0ffee0000000000beef"
+    legacy["updatedAt"] = datetime(2024, 5, 31, 12, 30, 15, 123456)
+    return [legacy, *documents[1:]]
+
+
+@pytest.mark.parametrize("collection, model, selected", [
+    ("projects", Project, None),
+    ("projects", Project, ("id", "title", "version")),
+    ("skills", Skill, None),
+    ("contacts", Contact, None),
+])
+def test_fast_json_matches_the_standard_encoder_byte_for_byte(api, monkeypatch, collection, model, selected):
+    if collection == "contacts":
+        api.request("POST", "/api/contact", json={"name": "A", "email": "a@example.com", "subject": "Encoding", "message": "Byte for byte"})
+    documents = stored(api, collection)
+
+    monkeypatch.setattr(fieldsets, "FAST_JSON", False)
+    standard = fieldsets.render_documents(model, documents, selected)
+    monkeypatch.setattr(fieldsets, "FAST_JSON", True)
+    fast = fieldsets.render_documents(model, documents, selected)
+
+    assert fast == standard
+    assert b'"_id"' not in fast
+    if selected is None:
+        assert b'"version":0' in fast  # the default of a document written before versioning
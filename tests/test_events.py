@@ -0,0 +1,83 @@
+import asyncio
+import re
+
+from events import RESYNC, RETRY, EventBroker
+
+
+def received(broker, last_event_id=None, publish=()):
+    """Frames a subscriber resuming from `last_event_id` receives, with `publish` sent after it connects."""
+    async def scenario():
+        stream = broker.stream(last_event_id)
+        assert await stream.__anext__() == RETRY
+        for data in publish:
+            broker.publish(data)
+        frames = []
+        while True:
+            try:
+                frames.append(await asyncio.wait_for(stream.__anext__(), 0.05))
+            except asyncio.TimeoutError:
+                break
+        await stream.aclose()
+        return frames
+
+    return asyncio.run(scenario())
+
+
+def ids(frames):
+    return [re.match(rb"id: (\S+)", frame).group(1).decode() for frame in frames]
+
+
+def change(number):
+    return {"collection": "projects", "op": "update", "id": str(number)}
+
+
+def test_event_ids_carry_the_broker_epoch():
+    broker = EventBroker()
+    frames = received(broker, publish=[change(1), change(2)])
+    assert ids(frames) == [f"{broker.epoch}:1", f"{broker.epoch}:2"]
+    assert EventBroker().epoch != broker.epoch
+
+
+def test_reconnect_replays_the_missed_events():
+    broker = EventBroker()
+    for number in range(5):
+        broker.publish(change(number))
+    assert ids(received(broker, f"{broker.epoch}:3")) == [f"{broker.epoch}:4", f"{broker.epoch}:5"]
+    assert received(broker, f"{broker.epoch}:5") == []
+
+
+def test_reconnect_past_the_buffered_history_resyncs():
+    broker = EventBroker(history=2)
+    for number in range(5):
+        broker.publish(change(number))
+    assert received(broker, f"{broker.epoch}:1") == [RESYNC]
+
+
+def test_ids_from_another_process_resync():
+    broker = EventBroker()
+    broker.publish(change(1))
+    # A restarted process, or another worker, with a counter that is behind or ahead of this one
+    assert received(broker, "0123456789ab:999") == [RESYNC]
+    assert received(broker, "0123456789ab:1") == [RESYNC]
+    assert received(broker, "999") == [RESYNC]
+    assert received(broker, f"{broker.epoch}:7") == [RESYNC]
+    assert received(broker) == []
+
+
+def test_slow_subscriber_gets_a_single_resync():
+    broker = EventBroker(queue_size=3)
+    frames = received(broker, publish=[change(number) for number in range(10)])
+    assert frames == [RESYNC]
+    assert broker.stats()["dropped"] == 7
+
+
+def test_only_public_collections_are_published(api):
+    published = api.server.events.published
+    contact = {"name": "A", "email": "a@example.com", "subject": "Events", "message": "Not for the public feed"}
+    contact_id = api.request("POST", "/api/contact", json=contact).json()["id"]
+    api.request("PUT", f"/api/contact/{contact_id}", json={"status": "read"})
+    assert api.server.events.published == published
+
+    project = api.request("GET", "/api/projects").json()[0]
+    api.request("PUT", f"/api/projects/{project['id']}", json={"impact": project["impact"]})
+    assert api.server.events.published == published + 1
@@ -0,0 +1,100 @@
+import asyncio
+import uuid
+from datetime import timedelta
+
+from idempotency import ExpiringClaims, contact_fingerprint, request_fingerprint
+from storage import MemoryStorage
+
+
+def submission(**fields):
+    return {"name": "A", "email": "a@example.com", "subject": "Hello",
+            "message": f"Message {uuid.uuid4()}", **fields}
+
+
+def test_concurrent_claims_have_one_winner():
+    async def scenario():
+        claims = ExpiringClaims(MemoryStorage(), "idempotency_keys", timedelta(minutes=1))
+        results = await asyncio.gather(*(claims.claim("key", {"request": index}) for index in range(20)))
+        winners = [result for result in results if result is None]
+        assert len(winners) == 1
+        first = (await claims.storage.idempotency_keys.find_one({"id": "key"}))["request"]
+        assert all(result["request"] == first for result in results if result is not None)
+
+    asyncio.run(scenario())
+
+
+def test_expired_claim_is_taken_over_by_one_request():
+    async def scenario():
+        claims = ExpiringClaims(MemoryStorage(), "idempotency_keys", timedelta(minutes=1))
+        assert await claims.claim("key", {"request": "old"}, timedelta(milliseconds=10)) is None
+        await asyncio.sleep(0.02)
+        results = await asyncio.gather(*(claims.claim("key", {"request": index}) for index in range(10)))
+        assert sum(result is None for result in results) == 1
+
+    asyncio.run(scenario())
+
+
+def test_released_key_can_be_claimed_again():
+    async def scenario():
+        claims = ExpiringClaims(MemoryStorage(), "idempotency_keys", timedelta(minutes=1))
+        assert await claims.claim("key", {"request": "a"}) is None
+        assert (await claims.claim("key", {"request": "b"}))["request"] == "a"
+        await claims.release("key")
+        assert await claims.claim("key", {"request": "b"}) is None
+
+    asyncio.run(scenario())
+
+
+def test_expired_claims_are_removed_from_memory():
+    async def scenario():
+        storage = MemoryStorage()
+        claims = ExpiringClaims(storage, "contact_fingerprints", timedelta(milliseconds=10))
+        for index in range(50):
+            await claims.claim(f"key {index}", {})
+        await asyncio.sleep(0.02)
+        assert storage.expire() == 50
+        assert await storage.contact_fingerprints.count() == 0
+
+    asyncio.run(scenario())
+
+
+def test_fingerprint_ignores_case_and_whitespace():
+    assert contact_fingerprint("A@Example.com", "Hello  there", "Hi\n") == contact_fingerprint("a@example.com", "hello there", " hi")
+    assert contact_fingerprint("a@example.com", "Hello", "Hi") != contact_fingerprint("a@example.com", "Hello", "Bye")
+
+
+def test_retry_with_key_replays_first_response(api):
+    body = submission()
+    first = api.request("POST", "/api/contact", json=body, headers={"Idempotency-Key": "replay"})
+    retry = api.request("POST", "/api/contact", json=body, headers={"Idempotency-Key": "replay"})
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.content == first.content
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert "idempotent-replayed" not in first.headers
+    assert api.run(api.server.storage.contacts.count({"message": body["message"]})) == 1
+
+
+def test_key_reused_for_another_request_is_rejected(api):
+    assert api.request("POST", "/api/contact", json=submission(), headers={"Idempotency-Key": "reused"}).status_code == 200
+    response = api.request("POST", "/api/contact", json=submission(), headers={"Idempotency-Key": "reused"})
+    assert response.status_code == 422
+
+
+def test_retry_while_first_request_runs_conflicts(api):
+    body = submission()
+    pending = {"request": request_fingerprint(body), "contact": None}
+    api.run(api.server.idempotency_keys.claim("pending", pending, api.server.IDEMPOTENCY_PENDING_TTL))
+
+    response = api.request("POST", "/api/contact", json=body, headers={"Idempotency-Key": "pending"})
+    assert response.status_code == 409
+    assert response.headers["retry-after"] == "1"
+
+
+def test_identical_submission_returns_the_first_contact(api):
+    body = submission()
+    first = api.request("POST", "/api/contact", json=body).json()
+    again = api.request("POST", "/api/contact", json=dict(body, message=body["message"].upper() + "  ")).json()
+
+    assert again == first
+    assert api.run(api.server.storage.contacts.count({"message": body["message"]})) == 1
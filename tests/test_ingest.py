@@ -0,0 +1,146 @@
+import asyncio
+import uuid
+from datetime import datetime
+
+import pytest
+
+from ingest import IngestOverloaded, Spool, WriteBehindQueue
+from storage import MemoryStorage
+
+
+def contact(**fields):
+    now = datetime.utcnow()
+    return {"id": str(uuid.uuid4()), "name": "A", "email": "a@example.com", "subject": "Hi",
+            "message": "Hello", "status": "new", "createdAt": now, "updatedAt": now, "version": 0, **fields}
+
+
+def fail_inserts(storage, times, store_first=False):
+    """Make the next `times` insert_many calls on contacts fail, optionally after storing their first document."""
+    repository = storage.contacts
+    insert_many = repository.insert_many
+    calls = {"failed": 0}
+
+    async def flaky(documents):
+        if calls["failed"] < times:
+            calls["failed"] += 1
+            if store_first:
+                await insert_many(documents[:1])
+            raise ConnectionError("database unavailable")
+        await insert_many(documents)
+
+    repository.insert_many = flaky
+    return calls
+
+
+def test_submissions_are_stored_in_batches():
+    async def scenario():
+        storage = MemoryStorage()
+        stored = []
+        queue = WriteBehindQueue(storage, "contacts", max_batch=10, window=0.05, on_stored=stored.extend)
+        documents = [contact() for _ in range(25)]
+        await asyncio.gather(*(queue.submit(document) for document in documents))
+
+        assert await storage.contacts.count() == 25
+        assert sorted(document["id"] for document in stored) == sorted(document["id"] for document in documents)
+        stats = queue.stats()
+        assert stats["stored"] == 25 and stats["pending"] == 0
+        assert stats["batches"] == 3
+        await queue.close()
+
+    asyncio.run(scenario())
+
+
+def test_failed_batch_fails_its_requests_when_acknowledged_on_store():
+    async def scenario():
+        storage = MemoryStorage()
+        fail_inserts(storage, times=1)
+        queue = WriteBehindQueue(storage, "contacts", ack="stored", window=0.01)
+        results = await asyncio.gather(*(queue.submit(contact()) for _ in range(3)), return_exceptions=True)
+
+        assert all(isinstance(result, ConnectionError) for result in results)
+        assert await storage.contacts.count() == 0
+        assert queue.stats()["failures"] == 1 and queue.stats()["pending"] == 0
+
+        await queue.submit(contact())  # the next batch goes through
+        assert await storage.contacts.count() == 1
+        await queue.close()
+
+    asyncio.run(scenario())
+
+
+def test_acknowledged_batch_is_retried_without_duplicates():
+    async def scenario():
+        storage = MemoryStorage()
+        calls = fail_inserts(storage, times=2, store_first=True)
+        queue = WriteBehindQueue(storage, "contacts", ack="queued", window=0.01, retry_interval=0.01)
+        documents = [contact() for _ in range(5)]
+        for document in documents:
+            await queue.submit(document)  # returns once queued
+        await queue.close(timeout=5)
+
+        assert calls["failed"] == 2
+        stored = await storage.contacts.find_all()
+        assert sorted(document["id"] for document in stored) == sorted(document["id"] for document in documents)
+        assert queue.stats()["stored"] == 5
+
+    asyncio.run(scenario())
+
+
+def test_spooled_submissions_survive_a_restart(tmp_path):
+    spool_path = tmp_path / "contacts.spool"
+
+    async def crash():
+        storage = MemoryStorage()
+        fail_inserts(storage, times=1000)
+        queue = WriteBehindQueue(storage, "contacts", ack="spooled", spool_path=str(spool_path),
+                                 window=0.01, retry_interval=0.01)
+        documents = [contact(message=f"message {index}") for index in range(4)]
+        for document in documents:
+            await queue.submit(document)  # returns once fsync'd
+        await queue.close(timeout=0.05)
+        assert await storage.contacts.count() == 0
+        return documents
+
+    async def restart(documents):
+        storage = MemoryStorage()
+        queue = WriteBehindQueue(storage, "contacts", ack="spooled", spool_path=str(spool_path), window=0.01)
+        assert queue.recover() == len(documents)
+        await queue.close(timeout=5)
+
+        stored = {document["id"]: document for document in await storage.contacts.find_all()}
+        assert set(stored) == {document["id"] for document in documents}
+        assert all(stored[document["id"]] == document for document in documents)
+        assert spool_path.read_bytes() == b""
+
+    documents = asyncio.run(crash())
+    asyncio.run(restart(documents))
+
+
+def test_spool_skips_a_torn_final_line(tmp_path):
+    async def scenario():
+        spool = Spool(str(tmp_path / "contacts.spool"))
+        document = contact()
+        await spool.append(document)
+        with spool.path.open("ab") as file:
+            file.write(b'{"id": "torn')
+        assert spool.read() == [document]
+
+    asyncio.run(scenario())
+
+
+def test_full_or_closed_queue_rejects_submissions():
+    async def scenario():
+        storage = MemoryStorage()
+        queue = WriteBehindQueue(storage, "contacts", ack="queued", window=1.0, max_batch=100, max_pending=2)
+        await queue.submit(contact())
+        await queue.submit(contact())
+        with pytest.raises(IngestOverloaded):
+            await queue.submit(contact())
+
+        await queue.close(timeout=5)  # drains what was accepted
+        assert await storage.contacts.count() == 2
+        with pytest.raises(IngestOverloaded):
+            await queue.submit(contact())
+        assert queue.stats()["rejected"] == 2
+
+    asyncio.run(scenario())
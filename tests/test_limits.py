@@ -0,0 +1,145 @@
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+
+import limits
+from limits import AdmissionController, Limit, LoadSheddingMiddleware, MemoryBuckets, RateLimiter, client_address, parse_networks
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def app_with(limiter, admission):
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: str):
+        return {"id": item_id}
+
+    @app.get("/slow")
+    async def slow():
+        await asyncio.sleep(0.1)
+        return {}
+
+    @app.get("/stream")
+    async def stream():
+        return {}
+
+    app.add_middleware(LoadSheddingMiddleware, limiter=limiter, admission=admission)
+    return app
+
+
+def run(app, requests):
+    """Send `requests` (method, path, headers) concurrently; returns the responses in order."""
+    async def scenario():
+        transport = httpx.ASGITransport(app=app, client=("203.0.113.9", 4000))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(client.request(method, path, headers=headers) for method, path, headers in requests))
+
+    return asyncio.run(scenario())
+
+
+def test_bucket_allows_a_burst_then_refills_at_the_rate(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(limits.time, "monotonic", clock)
+    buckets = MemoryBuckets()
+    limit = Limit(rate=2, burst=3)
+
+    async def scenario():
+        assert [await buckets.take("k", limit) for _ in range(3)] == [0, 0, 0]
+        assert await buckets.take("k", limit) == 0.5
+        clock.now += 0.5
+        assert await buckets.take("k", limit) == 0
+        assert await buckets.take("other", limit) == 0  # buckets are per key
+        clock.now += 60
+        assert [await buckets.take("k", limit) for _ in range(4)][-1] > 0  # refilled only up to the burst
+
+    asyncio.run(scenario())
+
+
+def test_bucket_store_forgets_the_least_recently_used_keys():
+    buckets = MemoryBuckets(max_keys=2)
+
+    async def scenario():
+        for key in ("a", "b", "c"):
+            await buckets.take(key, Limit(1, 1))
+
+    asyncio.run(scenario())
+    assert len(buckets) == 2
+
+
+def test_over_the_limit_answers_429_with_retry_after():
+    limiter = RateLimiter(MemoryBuckets(), reads=Limit(rate=0.5, burst=2), writes=Limit(1, 1))
+    app = app_with(limiter, AdmissionController())
+    # Different ids share the route's bucket
+    responses = run(app, [("GET", f"/items/{number}", {}) for number in range(3)])
+
+    assert [response.status_code for response in responses] == [200, 200, 429]
+    assert responses[2].headers["retry-after"] == "2"
+    assert responses[2].json() == {"detail": "Too many requests"}
+    assert limiter.stats()["limited"] == 1
+
+
+def test_clients_behind_a_trusted_proxy_get_their_own_buckets():
+    proxies = parse_networks("203.0.113.0/24, 10.0.0.1")
+    limiter = RateLimiter(MemoryBuckets(), reads=Limit(rate=0.1, burst=1), writes=Limit(1, 1), proxies=proxies)
+    app = app_with(limiter, AdmissionController())
+    responses = run(app, [
+        ("GET", "/items/a", {"X-Forwarded-For": "198.51.100.1"}),
+        ("GET", "/items/a", {"X-Forwarded-For": "198.51.100.2, 10.0.0.1"}),
+        ("GET", "/items/a", {"X-Forwarded-For": "198.51.100.1"}),
+    ])
+    assert [response.status_code for response in responses] == [200, 200, 429]
+
+
+def test_client_address_only_trusts_forwarded_for_from_listed_proxies():
+    def scope(peer, forwarded=None):
+        headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded else []
+        return {"client": (peer, 1234), "headers": headers}
+
+    proxies = parse_networks("10.0.0.0/8")
+    assert client_address(scope("10.1.2.3", "198.51.100.7")) == "10.1.2.3"  # no proxies configured
+    assert client_address(scope("10.1.2.3", "198.51.100.7"), proxies) == "198.51.100.7"
+    assert client_address(scope("198.51.100.9", "1.2.3.4"), proxies) == "198.51.100.9"  # untrusted peer
+    # A client cannot pick its address by sending its own X-Forwarded-For
+    assert client_address(scope("10.1.2.3", "1.2.3.4, 198.51.100.7, 10.0.0.2"), proxies) == "198.51.100.7"
+    assert client_address(scope("10.1.2.3"), proxies) == "10.1.2.3"
+
+
+def test_too_many_requests_in_flight_are_shed_except_exempt_paths():
+    admission = AdmissionController(max_in_flight=1, exempt=("/stream",))
+    app = app_with(None, admission)
+    responses = run(app, [("GET", "/slow", {}), ("GET", "/slow", {}), ("GET", "/stream", {})])
+
+    assert sorted(response.status_code for response in responses[:2]) == [200, 503]
+    shed = next(response for response in responses if response.status_code == 503)
+    assert shed.headers["retry-after"] == "1"
+    assert responses[2].status_code == 200
+    assert admission.stats()["shed"] == 1 and admission.in_flight == 0
+
+
+def test_event_loop_lag_is_measured_and_sheds_requests():
+    async def scenario():
+        admission = AdmissionController(max_lag=0.05, interval=0.01)
+        admission.start()
+        await asyncio.sleep(0.05)  # past the ignored first tick
+        assert admission.admit()
+        time.sleep(0.2)  # block the event loop
+        await asyncio.sleep(0.03)
+        assert admission.lag > 0.05
+        assert not admission.admit()
+        for _ in range(100):  # the lag decays once the loop keeps up again
+            await asyncio.sleep(0.02)
+            if admission.admit():
+                break
+        assert admission.admit()
+        admission.stop()
+
+    asyncio.run(scenario())
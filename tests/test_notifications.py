@@ -0,0 +1,80 @@
+import asyncio
+from datetime import datetime
+
+from notifications import LocalWrites, PollingWatcher, create_change_watcher
+from storage import MemoryStorage
+
+
+def project(project_id):
+    return {"id": project_id, "title": project_id, "order": 0, "updatedAt": datetime.utcnow()}
+
+
+def watch(watcher, writes):
+    """Collections `watcher` notifies while `writes` runs, one poll after another."""
+    async def scenario():
+        notified = []
+        task = asyncio.create_task(watcher.run(notified.append))
+        await asyncio.sleep(watcher.interval * 2)  # the first poll only records the marks
+        await writes()
+        await asyncio.sleep(watcher.interval * 5)
+        task.cancel()
+        return notified
+
+    return asyncio.run(scenario())
+
+
+def test_each_write_elsewhere_is_notified_once_per_collection(monkeypatch):
+    monkeypatch.setenv("CHANGE_NOTIFICATIONS", "poll")
+    monkeypatch.setenv("CHANGE_POLL_SECONDS", "0.01")
+    storage = MemoryStorage()
+    watcher = create_change_watcher(storage, ("projects", "skills"))
+    assert isinstance(watcher, PollingWatcher)
+
+    async def writes():
+        await storage.projects.insert_one(project("a"))
+        await storage.skills.insert_one(project("b"))
+
+    assert sorted(watch(watcher, writes)) == ["projects", "skills"]
+
+
+def test_writes_this_worker_announced_are_not_notified_back():
+    storage = MemoryStorage()
+    watcher = PollingWatcher(storage, ("projects", "skills"), interval=0.01)
+
+    async def writes():
+        await storage.projects.insert_one(project("own"))
+        watcher.expect("projects")
+        await storage.skills.insert_one(project("elsewhere"))
+
+    assert watch(watcher, writes) == ["skills"]
+    assert watcher.stats() == {"mode": "poll", "notifications": 1, "skipped": 1}
+
+
+def test_one_api_write_publishes_one_event(api, monkeypatch):
+    watcher = PollingWatcher(api.server.storage, ("projects",), interval=0.01)
+    monkeypatch.setattr(api.server, "change_watcher", watcher)
+    project = api.request("GET", "/api/projects").json()[0]
+    published = api.server.events.published
+
+    async def scenario():
+        task = asyncio.create_task(watcher.run(api.server.external_change))
+        await asyncio.sleep(0.03)
+        await api.client.put(f"/api/projects/{project['id']}", json={"impact": project["impact"]})
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+    api.run(scenario())
+    assert api.server.events.published == published + 1
+    assert watcher.notifications == 0
+
+
+def test_expected_writes_expire():
+    async def scenario():
+        local = LocalWrites(window=0.01)
+        local.add("projects", 2)
+        assert local.take("projects")
+        await asyncio.sleep(0.02)
+        assert not local.take("projects")
+        assert not local.take_all("skills")
+
+    asyncio.run(scenario())
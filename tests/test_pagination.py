@@ -0,0 +1,92 @@
+import base64
+import json
+from datetime import datetime
+
+import pytest
+
+from pagination import decode_cursor, encode_cursor
+
+
+def ids(items):
+    return [item["id"] for item in items]
+
+
+def walk(api, path, limit):
+    """Every item of `path`, following X-Next-Cursor one page of `limit` at a time."""
+    items, cursor = [], None
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        response = api.request("GET", path, params=params)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page) <= limit
+        items.extend(page)
+        cursor = response.headers.get("x-next-cursor")
+        if cursor is None:
+            return items
+
+
+def raw_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+@pytest.fixture
+def tied_projects(api):
+    """Projects sharing one `order`, so only their ids tell them apart."""
+    storage = api.server.storage
+    tied = [f"tied-{number}" for number in (3, 1, 4, 0, 2)]
+    for project_id in tied:
+        api.run(storage.projects.insert_one({"id": project_id, "title": project_id, "description": "", "tools": [],
+                                              "problem": "", "solution": "", "impact": "", "visual": "", "order": 7}))
+    api.server.invalidate_reads("projects")
+    yield tied
+    for project_id in tied:
+        api.run(storage.projects.delete_one({"id": project_id}))
+    api.server.invalidate_reads("projects")
+
+
+def test_projects_pages_have_no_gaps_or_repeats(api, tied_projects):
+    everything = api.request("GET", "/api/projects").json()
+    assert [(project["order"], project["id"]) for project in everything] == sorted(
+        (project["order"], project["id"]) for project in everything)
+    assert [project_id for project_id in ids(everything) if project_id in tied_projects] == sorted(tied_projects)
+    for limit in (1, 2, 3):
+        assert ids(walk(api, "/api/projects", limit)) == ids(everything)
+
+
+def test_contacts_pages_run_newest_first_across_ties(api):
+    stamp = datetime(2030, 1, 1, 12, 0, 0)  # newer than any submission, so they open the list
+    tied = [f"contact-{number}" for number in range(5)]
+    for contact_id in tied:
+        api.run(api.server.storage.contacts.insert_one({"id": contact_id, "name": "A", "email": "a@example.com",
+                                                        "subject": "Paging", "message": contact_id,
+                                                        "status": "new", "createdAt": stamp, "updatedAt": stamp}))
+    try:
+        everything = api.request("GET", "/api/contact").json()
+        assert ids(everything[:5]) == sorted(tied, reverse=True)
+        keys = [(contact["createdAt"], contact["id"]) for contact in everything]
+        assert keys == sorted(keys, reverse=True)
+        for limit in (1, 2, 4):
+            assert ids(walk(api, "/api/contact", limit)) == ids(everything)
+    finally:
+        for contact_id in tied:
+            api.run(api.server.storage.contacts.delete_one({"id": contact_id}))
+
+
+@pytest.mark.parametrize("path, values", [
+    ("/api/projects", ["7", "tied-1"]),  # order must be an integer
+    ("/api/projects", [7]),
+    ("/api/contact", ["2030-01-01T12:00:00", "contact-1"]),  # createdAt must be a tagged date
+    ("/api/contact", [{"$date": "2030-01-01T12:00:00+00:00"}, "contact-1"]),  # stored times are naive UTC
+    ("/api/contact", [{"$date": "not a date"}, "contact-1"]),
+])
+def test_wrongly_typed_cursor_is_rejected(api, path, values):
+    response = api.request("GET", path, params={"limit": 2, "cursor": raw_cursor(values)})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+def test_cursor_round_trips_dates_and_ids():
+    order = (("createdAt", -1), ("id", -1))
+    document = {"createdAt": datetime(2024, 5, 31, 8, 0, 0, 123456), "id": "c"}
+    assert decode_cursor(encode_cursor(document, order), order) == [document["createdAt"], "c"]
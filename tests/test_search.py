@@ -0,0 +1,121 @@
+import asyncio
+import base64
+import json
+from datetime import datetime, timedelta
+
+from search import SearchIndex, tokenize
+from storage import MemoryStorage
+
+
+def project(project_id, title, description="", tools=(), updated_at=None):
+    return {"id": project_id, "title": title, "description": description, "tools": list(tools),
+            "problem": "", "solution": "", "impact": "", "updatedAt": updated_at or datetime.utcnow()}
+
+
+def ids(hits):
+    return [hit["id"] for hit in hits]
+
+
+def test_tokenize_keeps_tool_names_and_drops_stop_words():
+    assert tokenize("The Node.js and C++ dashboards, in SQL") == ["node.js", "c++", "dashboards", "sql"]
+
+
+def test_every_term_must_match_and_the_last_is_a_prefix():
+    index = SearchIndex()
+    index.add("projects", project("sales", "Sales dashboard", "Revenue by region", ["Tableau"]))
+    index.add("projects", project("churn", "Churn model", "Predicting customer churn", ["Python"]))
+
+    assert ids(index.search("dashboard")) == ["sales"]
+    assert ids(index.search("dash")) == ["sales"]
+    assert ids(index.search("churn pyth")) == ["churn"]
+    assert index.search("churn tableau") == []
+    assert index.search("the") == []
+
+
+def test_title_matches_rank_above_description_matches():
+    index = SearchIndex()
+    index.add("projects", project("described", "Forecasting", "Built a revenue model"))
+    index.add("projects", project("titled", "Revenue model", "Forecasting"))
+    assert ids(index.search("revenue")) == ["titled", "described"]
+
+
+def test_updates_and_removals_replace_indexed_terms():
+    index = SearchIndex()
+    index.add("projects", project("p", "Sales dashboard"))
+    assert ids(index.search("sales")) == ["p"]  # cached until the next write
+
+    index.add("projects", project("p", "Inventory dashboard"))
+    assert index.search("sales") == []
+    assert ids(index.search("inventory")) == ["p"]
+    assert index.stats() == {"documents": 1, "terms": 2}
+
+    index.remove("projects", "p")
+    assert index.search("dashboard") == []
+    assert index.stats() == {"documents": 0, "terms": 0}
+    index.remove("projects", "p")  # removing twice is harmless
+
+
+def test_pages_follow_each_other_without_gaps_or_repeats():
+    index = SearchIndex()
+    for number in range(25):
+        index.add("projects", project(f"p{number:02d}", f"Dashboard {number}", "dashboard " * (number % 4)))
+    everything = index.search("dashboard", limit=100)
+    assert len(everything) == 25
+
+    pages, after = [], None
+    while True:
+        page = index.search("dashboard", limit=7, after=after)
+        if not page:
+            break
+        pages.extend(page)
+        last = page[-1]
+        after = (last["score"], last["collection"], last["id"])
+    assert pages == everything
+
+
+def test_collections_can_be_searched_separately():
+    index = SearchIndex()
+    index.add("projects", project("p", "Survey analysis"))
+    index.add("contacts", {"id": "c", "subject": "Survey question", "message": "About your survey"})
+
+    assert sorted(ids(index.search("survey"))) == ["c", "p"]
+    assert ids(index.search("survey", ["contacts"])) == ["c"]
+    assert index.search("survey", ["contacts"])[0]["title"] == "Survey question"
+
+
+def test_catch_up_applies_writes_made_elsewhere():
+    async def scenario():
+        storage = MemoryStorage()
+        started = datetime.utcnow() - timedelta(minutes=1)
+        await storage.projects.insert_many([
+            project("kept", "Sales dashboard", updated_at=started),
+            project("edited", "Churn model", updated_at=started),
+            project("deleted", "Inventory report", updated_at=started),
+        ])
+        index = SearchIndex()
+        await index.build(storage)
+        assert len(index) == 3
+
+        # Written by another worker: one update, one insert and one deletion with its tombstone
+        now = datetime.utcnow()
+        await storage.projects.update_one({"id": "edited"}, {"title": "Retention model", "updatedAt": now})
+        await storage.projects.insert_one(project("added", "Pricing experiment", updated_at=now))
+        await storage.projects.delete_one({"id": "deleted"})
+        await storage.tombstones.insert_one({"id": "deleted", "collection": "projects", "deletedAt": now})
+
+        await index.catch_up(storage, "projects")
+        assert ids(index.search("retention")) == ["edited"]
+        assert index.search("churn") == []
+        assert ids(index.search("pricing")) == ["added"]
+        assert index.search("inventory") == []
+        assert ids(index.search("sales")) == ["kept"]
+        assert len(index) == 3
+
+    asyncio.run(scenario())
+
+
+def test_malformed_search_cursor_is_rejected(api):
+    cursor = base64.urlsafe_b64encode(json.dumps(["x", "projects", "a"]).encode()).decode().rstrip("=")
+    response = api.request("GET", "/api/search", params={"q": "data", "cursor": cursor})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
@@ -0,0 +1,127 @@
+import asyncio
+from datetime import datetime
+
+from cache import SingleFlight
+from compression import CompressedBody
+from snapshots import REVALIDATION_FAILED, STALE, SnapshotCache
+
+
+class Source:
+    """A load function that counts its calls and can be made to fail or wait."""
+
+    def __init__(self, value="v1"):
+        self.value = value
+        self.calls = 0
+        self.error = None
+        self.gate = None
+
+    async def __call__(self):
+        self.calls += 1
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+def test_snapshot_is_served_when_storage_fails():
+    async def scenario():
+        cache = SnapshotCache(SingleFlight())
+        source = Source()
+        assert (await cache.read(("projects",), source)).value == "v1"
+
+        cache.invalidate("projects")
+        cache._entries[("projects",)].stored_at -= 42
+        source.error = ConnectionError("database unreachable")
+        snapshot = await cache.read(("projects",), source)
+        assert snapshot.value == "v1"
+        assert snapshot.headers() == {"Age": "42", "Warning": REVALIDATION_FAILED}
+        assert cache.stats()["errors"] == 1
+
+        # Without a snapshot the error is raised
+        try:
+            await cache.read(("skills",), source)
+        except ConnectionError:
+            pass
+        else:
+            raise AssertionError("expected the load error")
+
+    asyncio.run(scenario())
+
+
+def test_past_the_soft_ttl_the_snapshot_is_served_while_it_refreshes():
+    async def scenario():
+        cache = SnapshotCache(SingleFlight(), soft_ttl=10, max_stale=100)
+        source = Source()
+        await cache.read(("projects",), source)
+        cache._entries[("projects",)].stored_at -= 20
+        source.value = "v2"
+
+        snapshot = await cache.read(("projects",), source)
+        assert snapshot.value == "v1"
+        assert snapshot.headers()["Warning"] == STALE
+        await cache._refreshing[("projects",)]
+        fresh = await cache.read(("projects",), source)
+        assert fresh.value == "v2" and fresh.headers() == {}
+        assert source.calls == 2
+
+        # Too old to serve: readers wait for the load
+        cache._entries[("projects",)].stored_at -= 200
+        source.value = "v3"
+        assert (await cache.read(("projects",), source)).value == "v3"
+
+    asyncio.run(scenario())
+
+
+def test_load_overlapping_an_invalidation_is_answered_but_not_kept():
+    async def scenario():
+        cache = SnapshotCache(SingleFlight())
+        source = Source()
+        source.gate = asyncio.Event()
+        reading = asyncio.create_task(cache.read(("projects",), source))
+        await asyncio.sleep(0)
+        cache.invalidate("projects")  # a write lands while the load is in flight
+        source.gate.set()
+        assert (await reading).value == "v1"
+        assert ("projects",) not in cache._entries
+
+        source.gate = None
+        source.value = "v2"
+        assert (await cache.read(("projects",), source)).value == "v2"
+        assert ("projects",) in cache._entries
+
+    asyncio.run(scenario())
+
+
+def test_snapshots_survive_a_restart(tmp_path):
+    path = tmp_path / "snapshots.json"
+    stamp = datetime(2024, 5, 31, 8, 30, 15, 123456)
+    values = {
+        ("projects", None, ("python", "sql"), 20): [{"id": "p", "updatedAt": stamp}],
+        ("bootstrap",): ('"etag"', stamp, CompressedBody(b'{"version":"x"}')),
+    }
+
+    async def save():
+        cache = SnapshotCache(SingleFlight(), path=str(path))
+        for key, value in values.items():
+            await cache.read(key, lambda value=value: asyncio.sleep(0, value))
+        await cache.flush()
+
+    asyncio.run(save())
+
+    async def restore():
+        cache = SnapshotCache(SingleFlight(), path=str(path))
+        cache.load()
+        assert set(cache._entries) == set(values)
+        assert cache._entries[("projects", None, ("python", "sql"), 20)].value == values[("projects", None, ("python", "sql"), 20)]
+        etag, modified, body = cache._entries[("bootstrap",)].value
+        assert (etag, modified, body.raw) == ('"etag"', stamp, b'{"version":"x"}')
+
+        # Restored snapshots are only a fallback: the first read reloads
+        failing = Source()
+        failing.error = ConnectionError("database unreachable")
+        snapshot = await cache.read(("bootstrap",), failing)
+        assert failing.calls == 1
+        assert snapshot.headers()["Warning"] == REVALIDATION_FAILED
+
+    asyncio.run(restore())
@@ -0,0 +1,60 @@
+import asyncio
+
+from storage import PROJECT_ORDER, MemoryRepository
+
+
+def project(project_id, order):
+    return {"id": project_id, "title": project_id, "order": order}
+
+
+def test_update_that_cannot_be_ordered_leaves_the_document_in_place():
+    async def scenario():
+        projects = MemoryRepository("projects", PROJECT_ORDER)
+        await projects.insert_many([project("a", 1), project("b", 2)])
+        try:
+            await projects.update_one({"id": "a"}, {"order": None})
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("expected a ValueError")
+        assert [document["id"] for document in await projects.find_all()] == ["a", "b"]
+        assert (await projects.find_one({"id": "a"}))["order"] == 1
+        assert len(projects._index) == 2
+
+        # A lone document has nothing to be ordered with
+        alone = MemoryRepository("projects", PROJECT_ORDER)
+        await alone.insert_one(project("a", None))
+        assert (await alone.update_one({"id": "a"}, {"order": 1}))["order"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_bulk_write_reports_each_failed_operation_and_runs_the_rest():
+    async def scenario():
+        projects = MemoryRepository("projects", PROJECT_ORDER)
+        await projects.insert_many([project("a", 1), project("b", 2)])
+        errors = await projects.bulk_write([
+            ("insert", project("a", 5)),
+            ("update", "a", {"order": "first"}),
+            ("insert", project("c", 0)),
+            ("update", "a", {"order": 3}),
+        ])
+        assert sorted(errors) == [0, 1]
+        assert [(document["id"], document["order"]) for document in await projects.find_all()] == [("c", 0), ("b", 2), ("a", 3)]
+
+    asyncio.run(scenario())
+
+
+def test_required_fields_cannot_be_set_to_null(api):
+    project_id = api.request("GET", "/api/projects").json()[0]["id"]
+    response = api.request("PUT", f"/api/projects/{project_id}", json={"title": None})
+    assert response.status_code == 422
+    assert api.request("GET", f"/api/projects/{project_id}").json()["title"] is not None
+
+    # Optional links can be cleared
+    assert api.request("PUT", f"/api/projects/{project_id}", json={"liveUrl": None}).status_code == 200
+
+    result = api.request("POST", "/api/projects/bulk", json={"operations": [
+        {"op": "update", "id": project_id, "data": {"order": None}},
+    ]}).json()
+    assert result["results"][0]["status"] == "invalid"